@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+矢量数据并行批量入库工具
+按清单(manifest)在进程池中并行执行VectorToPostGIS.process_vector_data，
+支持并发数与单库并发任务数上限配置，并汇总每个文件的耗时与失败信息；
+写入同一矢量数据表的任务由VectorToPostGIS以表级咨询锁协调建表与推迟的索引重建
+
+清单格式（JSON）：
+{
+    "defaults": {"source_crs": "EPSG:4326", "target_crs": "EPSG:4326",
+                 "vector_table": "vector_data", "metadata_table": "vector_metadata"},
+    "jobs": [
+        {"file_path": "/path/to/cities.shp"},
+        {"file_path": "/path/to/rivers.geojson", "encoding": "gbk"}
+    ]
+}
+也可以直接是任务列表。
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from vector_to_postgis import VectorToPostGIS
+
+
+# 任务中可传给process_vector_data的参数
+JOB_ARGUMENTS = (
+    'file_path', 'source_crs', 'target_crs', 'vector_table', 'metadata_table',
+    'encoding', 'batch_size', 'load_method', 'chunk_size', 'defer_indexes',
+    'staging', 'resume', 'skip_unchanged', 'merge_key', 'storage_mode', 'spatial_order', 'cluster',
+    'partition_by'
+)
+REQUIRED_JOB_ARGUMENTS = ('file_path', 'source_crs', 'target_crs', 'vector_table', 'metadata_table')
+
+# 每个工作进程各自持有的工具实例，按数据库区分
+_worker_tools: Dict[str, VectorToPostGIS] = {}
+
+
+def load_manifest(manifest_path: str) -> List[Dict[str, Any]]:
+    """
+    读取任务清单，并将defaults合并到每个任务
+
+    Args:
+        manifest_path: 清单文件路径
+
+    Returns:
+        任务字典列表
+    """
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+
+    if isinstance(manifest, list):
+        defaults, jobs = {}, manifest
+    else:
+        defaults, jobs = manifest.get('defaults', {}), manifest.get('jobs', [])
+
+    merged_jobs = []
+    for job in jobs:
+        merged = dict(defaults, **job)
+        missing = [key for key in REQUIRED_JOB_ARGUMENTS if key not in merged]
+        if missing:
+            raise ValueError(f"任务缺少参数 {missing}: {job}")
+        merged_jobs.append(merged)
+    return merged_jobs
+
+
+def database_key(db_config: Dict[str, Any]) -> str:
+    """数据库标识，用于按库限制并发任务数"""
+    return f"{db_config['host']}:{db_config['port']}/{db_config['database']}"
+
+
+def _get_worker_tool(config: Dict[str, Any]) -> VectorToPostGIS:
+    """获取当前工作进程中对应数据库的工具实例（每进程每库只创建一次）"""
+    key = database_key(config['database'])
+    if key not in _worker_tools:
+        _worker_tools[key] = VectorToPostGIS(config)
+    return _worker_tools[key]
+
+
+def run_job(config: Dict[str, Any], job: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    在工作进程中执行单个文件入库任务
+
+    Args:
+        config: 工具配置（job中的database会覆盖配置中的数据库）
+        job: 任务字典
+
+    Returns:
+        任务结果：文件、状态（success / skipped / failed）、耗时、错误信息
+    """
+    if 'database' in job:
+        config = dict(config, database=job['database'])
+
+    result = {
+        'file_path': job['file_path'],
+        'vector_table': job['vector_table'],
+        'database': database_key(config['database']),
+        'pid': os.getpid(),
+        'start_time': datetime.now().isoformat(timespec='seconds'),
+    }
+    start = time.perf_counter()
+    try:
+        tool = _get_worker_tool(config)
+        outcome = tool.process_vector_data(**{key: job[key] for key in JOB_ARGUMENTS if key in job})
+        result['status'] = 'skipped' if outcome['status'] == 'skipped' else 'success'
+        result['metadata_id'] = outcome['metadata_id']
+        result['error'] = None
+    except Exception as e:
+        result['status'] = 'failed'
+        result['error'] = f"{type(e).__name__}: {e}"
+    result['elapsed'] = round(time.perf_counter() - start, 3)
+    result['file_size'] = os.path.getsize(job['file_path']) if os.path.exists(job['file_path']) else None
+    return result
+
+
+def run_batch_import(config: Dict[str, Any], jobs: List[Dict[str, Any]],
+                     max_workers: int = 4,
+                     max_jobs_per_db: Optional[int] = None) -> Dict[str, Any]:
+    """
+    并行执行批量入库
+
+    Args:
+        config: 工具配置（含database、log_level、log_dir等）
+        jobs: 任务列表，见load_manifest
+        max_workers: 进程池大小
+        max_jobs_per_db: 同一数据库同时执行的任务数上限，默认不超过max_workers；
+                         每个任务占用多个数据库连接（写入连接、表级咨询锁连接，
+                         推迟建索引时每个索引另占一个），按任务数而非连接数计
+
+    Returns:
+        汇总报告：总数、成功数、跳过数（文件未变化）、失败数、总耗时以及每个任务的结果
+    """
+    max_jobs_per_db = max_jobs_per_db or max_workers
+    pending = list(enumerate(jobs))
+    running = {}
+    running_per_db: Dict[str, int] = {}
+    results: List[Optional[Dict[str, Any]]] = [None] * len(jobs)
+
+    def job_db(job):
+        return database_key(job.get('database', config['database']))
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        while pending or running:
+            # 在不超过单库并发任务数上限的前提下提交任务
+            for item in list(pending):
+                if len(running) >= max_workers:
+                    break
+                index, job = item
+                db = job_db(job)
+                if running_per_db.get(db, 0) >= max_jobs_per_db:
+                    continue
+                pending.remove(item)
+                future = executor.submit(run_job, config, job)
+                running[future] = (index, db)
+                running_per_db[db] = running_per_db.get(db, 0) + 1
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                index, db = running.pop(future)
+                running_per_db[db] -= 1
+                try:
+                    results[index] = future.result()
+                except Exception as e:
+                    # 工作进程异常退出等无法在run_job中捕获的错误
+                    results[index] = {
+                        'file_path': jobs[index]['file_path'],
+                        'vector_table': jobs[index]['vector_table'],
+                        'database': db,
+                        'status': 'failed',
+                        'error': f"{type(e).__name__}: {e}",
+                        'elapsed': None,
+                    }
+                print(f"[{results[index]['status']}] {results[index]['file_path']} "
+                      f"({results[index]['elapsed']}s)")
+
+    succeeded = sum(1 for r in results if r['status'] == 'success')
+    skipped = sum(1 for r in results if r['status'] == 'skipped')
+    return {
+        'total': len(jobs),
+        'succeeded': succeeded,
+        'skipped': skipped,
+        'failed': len(jobs) - succeeded - skipped,
+        'max_workers': max_workers,
+        'max_jobs_per_db': max_jobs_per_db,
+        'elapsed': round(time.perf_counter() - start, 3),
+        'jobs': results,
+    }
+
+
+def print_summary(report: Dict[str, Any]):
+    """打印批量入库汇总"""
+    print("=" * 70)
+    print("批量入库汇总")
+    print("=" * 70)
+    print(f"任务总数: {report['total']}, 成功: {report['succeeded']}, "
+          f"跳过(未变化): {report['skipped']}, 失败: {report['failed']}")
+    print(f"并发进程数: {report['max_workers']}, 单库并发任务数上限: {report['max_jobs_per_db']}")
+    print(f"总耗时: {report['elapsed']}s")
+    print()
+    for result in sorted(report['jobs'], key=lambda r: -(r['elapsed'] or 0)):
+        print(f"  {result['status']:<8} {str(result['elapsed']):>10}s  {result['file_path']}")
+        if result['error']:
+            print(f"           错误: {result['error']}")
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='矢量数据并行批量入库工具')
+    parser.add_argument('manifest', help='任务清单JSON文件')
+    parser.add_argument('--config', default='config.json', help='配置文件（数据库连接等）')
+    parser.add_argument('--workers', default=os.cpu_count() or 4, type=int, help='并发进程数')
+    parser.add_argument('--max_jobs_per_db', default=None, type=int,
+                        help='同一数据库同时执行的任务数上限（每个任务占用写入与咨询锁两个连接，'
+                             '推迟建索引时每个索引另占一个连接）')
+    parser.add_argument('--report', default=None, help='汇总报告输出路径(JSON)')
+    args = parser.parse_args()
+
+    try:
+        with open(args.config, 'r', encoding='utf-8') as f:
+            file_config = json.load(f)
+        jobs = load_manifest(args.manifest)
+    except Exception as e:
+        print(f"配置或清单加载失败: {e}")
+        sys.exit(1)
+
+    logging_config = file_config.get('logging', {})
+    config = {
+        'database': file_config['database'],
+        'log_level': file_config.get('log_level', logging_config.get('level', 'INFO')),
+        'log_dir': file_config.get('log_dir', logging_config.get('directory', 'logs')),
+    }
+    for key in ('load_method', 'chunk_size', 'defer_indexes', 'staging', 'resume',
+                'skip_unchanged', 'maintenance_work_mem', 'reproject_workers',
+                'storage_mode', 'jsonb_overflow', 'hot_properties', 'hot_property_mode',
+                'spatial_order', 'cluster', 'partition_by', 'partition_grid_level',
+                'index_plan', 'brin_pages_per_range', 'tile_cache', 'lod_tolerances', 'lod_workers',
+                'subdivide_max_vertices'):
+        if key in file_config:
+            config[key] = file_config[key]
+
+    print(f"共 {len(jobs)} 个任务，并发进程数: {args.workers}")
+    report = run_batch_import(config, jobs, args.workers, args.max_jobs_per_db)
+    print_summary(report)
+
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"汇总报告已写入: {args.report}")
+
+    if report['failed']:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
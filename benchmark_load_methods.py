@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+入库方式性能对比脚本
+对比 insert / copy_csv / copy_binary 三种入库方式的写入速度(条/秒)
+使用方法：python benchmark_load_methods.py --file_path s2_shandong.shp
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+from sqlalchemy import text
+from vector_to_postgis import VectorToPostGIS
+from pg_copy_writer import LOAD_METHODS
+
+
+def load_config(config_path='config.json'):
+    """加载配置文件"""
+    try:
+        with open(config_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except Exception as e:
+        print(f"配置文件加载失败: {e}")
+        sys.exit(1)
+
+
+def benchmark_method(tool, gdf, metadata, method, batch_size, table_prefix):
+    """使用指定入库方式写入一次，返回(写入条数, 耗时秒)"""
+    vector_table = f"{table_prefix}_{method}_data"
+    metadata_table = f"{table_prefix}_{method}_metadata"
+
+    with tool.engine.connect() as conn:
+        conn.execute(text(f"DROP TABLE IF EXISTS {vector_table}"))
+        conn.execute(text(f"DROP TABLE IF EXISTS {metadata_table}"))
+        conn.commit()
+    tool.create_tables(vector_table, metadata_table)
+
+    start = time.perf_counter()
+    tool.insert_data(gdf, vector_table, metadata, metadata_table, batch_size, method)
+    elapsed = time.perf_counter() - start
+
+    with tool.engine.connect() as conn:
+        count = conn.execute(text(f"SELECT COUNT(*) FROM {vector_table}")).fetchone()[0]
+    return count, elapsed
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='入库方式性能对比')
+    parser.add_argument('--file_path', default='s2_shandong.shp', help='测试矢量文件路径')
+    parser.add_argument('--source_crs', default='EPSG:4326', help='源坐标系')
+    parser.add_argument('--target_crs', default='EPSG:4326', help='目标坐标系')
+    parser.add_argument('--batch_size', default=5000, type=int, help='批量大小')
+    parser.add_argument('--methods', nargs='+', default=list(LOAD_METHODS),
+                        choices=LOAD_METHODS, help='参与对比的入库方式')
+    parser.add_argument('--table_prefix', default='bench_load', help='测试表名前缀')
+    parser.add_argument('--keep_tables', action='store_true', help='保留测试表')
+    args = parser.parse_args()
+
+    if not os.path.exists(args.file_path):
+        print(f"❌ 错误：文件 {args.file_path} 不存在")
+        sys.exit(1)
+
+    config = load_config()
+    tool = VectorToPostGIS(config)
+
+    print("=" * 60)
+    print("入库方式性能对比")
+    print("=" * 60)
+
+    gdf = tool.read_vector_data(args.file_path)
+    gdf = tool.transform_coordinate_system(gdf, args.source_crs, args.target_crs)
+    metadata = tool.extract_metadata(gdf, args.file_path, args.source_crs, args.target_crs)
+    print(f"测试文件: {args.file_path}")
+    print(f"要素数量: {len(gdf)}, 属性字段数: {len(gdf.columns) - 1}")
+    print(f"批量大小: {args.batch_size}")
+    print()
+
+    results = {}
+    for method in args.methods:
+        count, elapsed = benchmark_method(tool, gdf, metadata, method,
+                                          args.batch_size, args.table_prefix)
+        results[method] = (count, elapsed)
+        print(f"  {method:<12} {count:>10} 条  {elapsed:8.2f}s  {count / elapsed:10.0f} 条/秒")
+
+    if 'insert' in results:
+        base_rate = results['insert'][0] / results['insert'][1]
+        print("\n相对insert的加速比:")
+        for method, (count, elapsed) in results.items():
+            print(f"  {method:<12} {count / elapsed / base_rate:6.2f}x")
+
+    if not args.keep_tables:
+        with tool.engine.connect() as conn:
+            for method in args.methods:
+                conn.execute(text(f"DROP TABLE IF EXISTS {args.table_prefix}_{method}_data"))
+                conn.execute(text(f"DROP TABLE IF EXISTS {args.table_prefix}_{method}_metadata"))
+            conn.commit()
+
+    print("=" * 60)
+    print("测试完成！")
+    print("=" * 60)
+
+
+if __name__ == '__main__':
+    main()
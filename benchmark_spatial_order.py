@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+空间排序效果对比脚本
+同一文件分别按文件顺序、Hilbert、Z-order（可选再CLUSTER）入库，
+用一组固定的随机范围查询统计读取的数据页数
+使用方法：python benchmark_spatial_order.py --file_path s2_shandong.shp --queries 200
+"""
+
+import argparse
+import json
+import os
+import sys
+
+import numpy as np
+from sqlalchemy import text
+from vector_to_postgis import VectorToPostGIS
+from spatial_order import SPATIAL_ORDERS
+
+
+def load_config(config_path='config.json'):
+    """加载配置文件"""
+    try:
+        with open(config_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except Exception as e:
+        print(f"配置文件加载失败: {e}")
+        sys.exit(1)
+
+
+def benchmark_boxes(bounds, count, box_fraction, seed):
+    """在数据范围内生成固定的随机查询框，边长为数据范围的box_fraction"""
+    minx, miny, maxx, maxy = bounds
+    width, height = (maxx - minx) * box_fraction, (maxy - miny) * box_fraction
+    rng = np.random.default_rng(seed)
+    xs = rng.uniform(minx, maxx - width, count)
+    ys = rng.uniform(miny, maxy - height, count)
+    return [(x, y, x + width, y + height) for x, y in zip(xs.tolist(), ys.tolist())]
+
+
+def load_table(tool, gdf, metadata, vector_table, metadata_table, spatial_order, cluster):
+    """按指定顺序写入一张测试表"""
+    with tool.engine.connect() as conn:
+        conn.execute(text(f"DROP TABLE IF EXISTS {vector_table}"))
+        conn.execute(text(f"DROP TABLE IF EXISTS {metadata_table}"))
+        conn.commit()
+    tool.create_tables(vector_table, metadata_table)
+    tool.insert_data(gdf, vector_table, metadata, metadata_table, load_method='copy_binary',
+                     spatial_order=spatial_order or 'none')
+    if cluster:
+        tool.cluster_table(vector_table)
+    with tool.engine.connect() as conn:
+        conn.execute(text(f"ANALYZE {vector_table}"))
+        conn.commit()
+
+
+def measure_pages(tool, vector_table, boxes, srid):
+    """
+    统计范围查询读取的页数
+
+    Returns:
+        (命中要素总数, 涉及的数据页总数, 共享缓冲区访问页数总数)
+    """
+    total_rows = total_heap_pages = total_buffers = 0
+    with tool.engine.connect() as conn:
+        for box in boxes:
+            params = {'minx': box[0], 'miny': box[1], 'maxx': box[2], 'maxy': box[3], 'srid': srid}
+            envelope = "ST_MakeEnvelope(:minx, :miny, :maxx, :maxy, :srid)"
+            rows, heap_pages = conn.execute(text(f"""
+                SELECT COUNT(*), COUNT(DISTINCT (ctid::text::point)[0])
+                FROM {vector_table} WHERE geometry && {envelope}
+            """), params).fetchone()
+            plan = conn.execute(text(f"""
+                EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON)
+                SELECT id FROM {vector_table} WHERE geometry && {envelope}
+            """), params).scalar()
+            top = plan[0]['Plan']
+            total_rows += rows
+            total_heap_pages += heap_pages
+            total_buffers += top.get('Shared Hit Blocks', 0) + top.get('Shared Read Blocks', 0)
+    return total_rows, total_heap_pages, total_buffers
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='空间排序效果对比')
+    parser.add_argument('--file_path', default='s2_shandong.shp', help='测试矢量文件路径')
+    parser.add_argument('--source_crs', default='EPSG:4326', help='源坐标系')
+    parser.add_argument('--target_crs', default='EPSG:4326', help='目标坐标系')
+    parser.add_argument('--queries', default=200, type=int, help='范围查询数量')
+    parser.add_argument('--box_fraction', default=0.02, type=float, help='查询框边长占数据范围的比例')
+    parser.add_argument('--seed', default=42, type=int, help='查询框随机种子')
+    parser.add_argument('--cluster', action='store_true', help='额外对比Hilbert排序后再CLUSTER')
+    parser.add_argument('--table_prefix', default='bench_order', help='测试表名前缀')
+    parser.add_argument('--keep_tables', action='store_true', help='保留测试表')
+    args = parser.parse_args()
+
+    if not os.path.exists(args.file_path):
+        print(f"❌ 错误：文件 {args.file_path} 不存在")
+        sys.exit(1)
+
+    config = load_config()
+    tool = VectorToPostGIS(config)
+
+    print("=" * 60)
+    print("空间排序效果对比")
+    print("=" * 60)
+
+    gdf = tool.read_vector_data(args.file_path)
+    gdf = tool.transform_coordinate_system(gdf, args.source_crs, args.target_crs)
+    metadata = tool.extract_metadata(gdf, args.file_path, args.source_crs, args.target_crs)
+    srid = gdf.crs.to_epsg() or 4326
+    boxes = benchmark_boxes(gdf.total_bounds, args.queries, args.box_fraction, args.seed)
+    print(f"测试文件: {args.file_path}")
+    print(f"要素数量: {len(gdf)}, 查询数量: {len(boxes)}, 查询框边长比例: {args.box_fraction}")
+    print()
+
+    variants = [('file', None, False)] + [(order, order, False) for order in SPATIAL_ORDERS]
+    if args.cluster:
+        variants.append(('hilbert_cluster', 'hilbert', True))
+
+    results = {}
+    for name, spatial_order, cluster in variants:
+        vector_table = f"{args.table_prefix}_{name}_data"
+        load_table(tool, gdf, metadata, vector_table, f"{args.table_prefix}_{name}_metadata",
+                   spatial_order, cluster)
+        rows, heap_pages, buffers = measure_pages(tool, vector_table, boxes, srid)
+        results[name] = heap_pages
+        print(f"  {name:<16} 命中 {rows:>10} 条  数据页 {heap_pages:>10}  缓冲区访问 {buffers:>10}")
+
+    base_pages = results['file']
+    if base_pages:
+        print("\n相对文件顺序的数据页读取比例:")
+        for name, heap_pages in results.items():
+            print(f"  {name:<16} {heap_pages / base_pages:6.2%}")
+
+    if not args.keep_tables:
+        with tool.engine.connect() as conn:
+            for name, _, _ in variants:
+                conn.execute(text(f"DROP TABLE IF EXISTS {args.table_prefix}_{name}_data"))
+                conn.execute(text(f"DROP TABLE IF EXISTS {args.table_prefix}_{name}_metadata"))
+            conn.commit()
+
+    print("=" * 60)
+    print("测试完成！")
+    print("=" * 60)
+
+
+if __name__ == '__main__':
+    main()
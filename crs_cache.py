@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+坐标系与坐标转换器缓存
+进程内按坐标系对以LRU方式缓存Transformer，批量处理多个文件时不重复构建PROJ转换管线；
+坐标系等价判断使用pyproj.CRS.equals，而不是比较字符串
+"""
+
+from functools import lru_cache
+from typing import Union
+
+from pyproj import CRS, Transformer
+
+# 进程内缓存的Transformer数量上限
+TRANSFORMER_CACHE_SIZE = 32
+
+CRSLike = Union[CRS, str, int]
+
+
+@lru_cache(maxsize=128)
+def _parse_crs(user_input: str) -> CRS:
+    """解析坐标系字符串（如EPSG:4326、WKT、PROJ字符串）"""
+    return CRS.from_user_input(user_input)
+
+
+def get_crs(value: CRSLike) -> CRS:
+    """将坐标系字符串、EPSG代码或CRS对象统一为CRS对象"""
+    if isinstance(value, CRS):
+        return value
+    return _parse_crs(str(value) if not isinstance(value, int) else f"EPSG:{value}")
+
+
+def crs_equals(first: CRSLike, second: CRSLike) -> bool:
+    """
+    判断两个坐标系是否等价（忽略轴顺序，如EPSG:4326与OGC:CRS84）
+
+    坐标转换均使用always_xy，仅轴顺序不同的坐标系之间转换结果与原坐标相同
+    """
+    return get_crs(first).equals(get_crs(second), ignore_axis_order=True)
+
+
+@lru_cache(maxsize=TRANSFORMER_CACHE_SIZE)
+def _cached_transformer(source_wkt: str, target_wkt: str) -> Transformer:
+    """按坐标系WKT缓存Transformer"""
+    return Transformer.from_crs(CRS.from_wkt(source_wkt), CRS.from_wkt(target_wkt), always_xy=True)
+
+
+def get_transformer(source: CRSLike, target: CRSLike) -> Transformer:
+    """
+    获取坐标转换器（always_xy，与GeoDataFrame.to_crs一致），同一坐标系对只构建一次
+
+    Args:
+        source: 源坐标系
+        target: 目标坐标系
+
+    Returns:
+        pyproj.Transformer
+    """
+    return _cached_transformer(get_crs(source).to_wkt(), get_crs(target).to_wkt())
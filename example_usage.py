@@ -6,6 +6,7 @@
 
 import json
 from vector_to_postgis import VectorToPostGIS
+from batch_import import run_batch_import, print_summary
 
 
 def example_import_shapefile():
@@ -196,6 +197,44 @@ def example_with_config_file():
     )
 
 
+def example_parallel_batch_import():
+    """示例：多进程并行批量导入"""
+    print("=" * 50)
+    print("示例6：多进程并行批量导入")
+    print("=" * 50)
+    
+    config = {
+        'database': {
+            'host': 'localhost',
+            'port': 5432,
+            'database': 'gis_db',
+            'username': 'postgres',
+            'password': 'your_password'
+        },
+        'log_level': 'INFO',
+        'log_dir': 'logs'
+    }
+    
+    jobs = [
+        {
+            'file_path': f'/path/to/delivery/block_{i:03d}.shp',
+            'source_crs': 'EPSG:4527',
+            'target_crs': 'EPSG:4326',
+            'vector_table': 'delivery_data',
+            'metadata_table': 'delivery_metadata',
+            'encoding': 'utf-8',
+            'load_method': 'copy_binary'
+        }
+        for i in range(100)
+    ]
+    
+    # 8个工作进程，同一数据库最多同时4个入库任务
+    report = run_batch_import(config, jobs, max_workers=8, max_jobs_per_db=4)
+    print_summary(report)
+    
+    # 命令行方式：python batch_import.py manifest.json --workers 8 --max_jobs_per_db 4
+
+
 if __name__ == '__main__':
     # 运行示例
     print("矢量数据入库PostGIS工具使用示例")
@@ -208,5 +247,6 @@ if __name__ == '__main__':
     # example_import_csv()
     # example_batch_import()
     # example_with_config_file()
+    # example_parallel_batch_import()
     
     print("示例代码已准备就绪，请根据实际情况修改参数后运行。") 
\ No newline at end of file
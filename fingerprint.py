@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+矢量数据文件指纹
+由数据文件（含Shapefile附属文件、GDB目录内文件）的大小、修改时间与内容哈希组成，
+用于判断文件自上次入库以来是否变化
+"""
+
+import hashlib
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+# Shapefile的附属数据文件（.shp之外）
+SHAPEFILE_SIDECARS = ('.shx', '.dbf', '.prj', '.cpg')
+
+
+def data_files(file_path: str) -> List[str]:
+    """
+    列出构成一个矢量数据集的全部文件
+
+    Args:
+        file_path: 数据文件路径（GDB为目录）
+
+    Returns:
+        按名称排序的文件路径列表
+    """
+    if os.path.isdir(file_path):
+        files = []
+        for root, _, names in os.walk(file_path):
+            files.extend(os.path.join(root, name) for name in names)
+        return sorted(files)
+
+    files = [file_path]
+    stem, ext = os.path.splitext(file_path)
+    if ext.lower() == '.shp':
+        for sidecar in SHAPEFILE_SIDECARS:
+            for candidate in (stem + sidecar, stem + sidecar.upper()):
+                if os.path.exists(candidate):
+                    files.append(candidate)
+                    break
+    return files
+
+
+def file_stats(file_path: str) -> Dict[str, List[int]]:
+    """
+    数据文件的大小与修改时间，只读取文件系统元信息
+
+    Returns:
+        {相对文件名: [大小, 修改时间(ns)]}
+    """
+    base_dir = file_path if os.path.isdir(file_path) else os.path.dirname(file_path)
+    stats = {}
+    for path in data_files(file_path):
+        file_stat = os.stat(path)
+        stats[os.path.relpath(path, base_dir)] = [int(file_stat.st_size), int(file_stat.st_mtime_ns)]
+    return stats
+
+
+def content_hash(file_path: str, block_size: int = 1 << 20) -> str:
+    """
+    数据文件内容的流式BLAKE2b哈希（文件名参与哈希，按块读取不占用额外内存）
+
+    Args:
+        file_path: 数据文件路径
+        block_size: 每次读取的字节数
+
+    Returns:
+        十六进制哈希值
+    """
+    base_dir = file_path if os.path.isdir(file_path) else os.path.dirname(file_path)
+    digest = hashlib.blake2b(digest_size=20)
+    for path in data_files(file_path):
+        digest.update(os.path.relpath(path, base_dir).encode('utf-8'))
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(block_size), b''):
+                digest.update(block)
+    return digest.hexdigest()
+
+
+def compute_fingerprint(file_path: str) -> Dict[str, Any]:
+    """计算完整指纹：文件大小、修改时间与内容哈希"""
+    return {
+        'files': file_stats(file_path),
+        'hash': content_hash(file_path),
+    }
+
+
+def with_content_hash(fingerprint: Dict[str, Any], file_path: str) -> Dict[str, Any]:
+    """
+    补充内容哈希后的指纹，用于入库完成时记录
+
+    记录的指纹必须含内容哈希，之后仅修改时间变化（touch）的文件才能凭哈希判定未变化；
+    入库本身要完整读取文件，计算哈希的开销与之相当
+
+    Args:
+        fingerprint: check_fingerprint返回的当前指纹（可能不含hash）
+        file_path: 数据文件路径
+
+    Returns:
+        含files与hash的指纹
+    """
+    if 'hash' in fingerprint:
+        return fingerprint
+    return {**fingerprint, 'hash': content_hash(file_path)}
+
+
+def check_fingerprint(stored: Optional[Dict[str, Any]], file_path: str) -> Tuple[bool, Dict[str, Any]]:
+    """
+    判断文件与已记录的指纹是否一致，并返回当前文件的指纹
+
+    先比较大小与修改时间（只读取文件系统元信息），都一致时直接判定未变化；
+    只有大小一致、修改时间不同（如文件被复制或touch）时才计算内容哈希，
+    大小不同的文件必然已变化，不读取文件内容
+
+    Args:
+        stored: 已记录的指纹，未入库过时为None
+        file_path: 数据文件路径
+
+    Returns:
+        (是否未变化, 当前指纹)；未计算内容哈希时当前指纹不含hash，记录前用with_content_hash补充
+    """
+    current = {'files': file_stats(file_path)}
+    if not stored or 'files' not in stored:
+        return False, current
+    if current['files'] == stored['files']:
+        return True, dict(stored)
+    stored_sizes = {name: values[0] for name, values in stored['files'].items()}
+    sizes = {name: values[0] for name, values in current['files'].items()}
+    if sizes != stored_sizes:
+        return False, current
+    current['hash'] = content_hash(file_path)
+    return current['hash'] == stored.get('hash'), current
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+可续传入库的检查点
+检查点表按metadata_id记录已提交的要素条数与文件指纹，
+与每个批次的数据在同一事务中提交，失败后可从断点继续而不重复写入
+"""
+
+import json
+from typing import Any, Dict, Optional
+
+from sqlalchemy import text
+
+
+class ImportCheckpoint:
+    """单次入库的检查点（对应一条元数据记录）"""
+
+    def __init__(self, table: str, metadata_id: int, rows_committed: int = 0,
+                 accumulated_rows: int = 0, accumulator_state: Optional[Dict[str, Any]] = None):
+        """
+        Args:
+            table: 检查点表名
+            metadata_id: 元数据ID
+            rows_committed: 已提交的要素条数
+            accumulated_rows: 元数据累加器状态覆盖的要素条数（分块入库时使用）
+            accumulator_state: 元数据累加器状态
+        """
+        self.table = table
+        self.metadata_id = metadata_id
+        self.rows_committed = rows_committed
+        self.accumulated_rows = accumulated_rows
+        self.accumulator_state = accumulator_state
+
+    @staticmethod
+    def ensure_table(conn, table: str):
+        """创建检查点表（如果不存在）"""
+        conn.execute(text(f"""
+            CREATE TABLE IF NOT EXISTS {table} (
+                metadata_id INTEGER PRIMARY KEY,
+                file_path TEXT NOT NULL,
+                vector_table VARCHAR(255) NOT NULL,
+                fingerprint JSONB,
+                rows_committed BIGINT DEFAULT 0,
+                accumulated_rows BIGINT DEFAULT 0,
+                accumulator_state JSONB,
+                status VARCHAR(20) DEFAULT 'running',
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """))
+
+    @classmethod
+    def find(cls, conn, table: str, file_path: str, vector_table: str,
+             fingerprint: Dict[str, Any]) -> Optional['ImportCheckpoint']:
+        """
+        查找同一文件、同一目标表且指纹一致的未完成检查点
+
+        Returns:
+            找到时返回检查点，否则返回None
+        """
+        row = conn.execute(text(f"""
+            SELECT metadata_id, rows_committed, accumulated_rows, accumulator_state, fingerprint
+            FROM {table}
+            WHERE file_path = :file_path AND vector_table = :vector_table AND status = 'running'
+            ORDER BY updated_at DESC
+            LIMIT 1
+        """), {'file_path': file_path, 'vector_table': vector_table}).fetchone()
+
+        if row is None:
+            return None
+        stored_fingerprint = row.fingerprint
+        if isinstance(stored_fingerprint, str):
+            stored_fingerprint = json.loads(stored_fingerprint)
+        if stored_fingerprint != fingerprint:
+            return None
+
+        state = row.accumulator_state
+        if isinstance(state, str):
+            state = json.loads(state)
+        return cls(table, row.metadata_id, int(row.rows_committed),
+                   int(row.accumulated_rows), state)
+
+    @classmethod
+    def create(cls, conn, table: str, metadata_id: int, file_path: str,
+               vector_table: str, fingerprint: Dict[str, Any]) -> 'ImportCheckpoint':
+        """新建检查点（不提交，由调用方与元数据记录一起提交）"""
+        conn.execute(text(f"""
+            INSERT INTO {table} (metadata_id, file_path, vector_table, fingerprint)
+            VALUES (:metadata_id, :file_path, :vector_table, :fingerprint)
+        """), {
+            'metadata_id': metadata_id,
+            'file_path': file_path,
+            'vector_table': vector_table,
+            'fingerprint': json.dumps(fingerprint),
+        })
+        return cls(table, metadata_id)
+
+    def advance(self, conn, rows: int):
+        """记录新写入的条数（不提交，与该批次数据同一事务提交）"""
+        self.rows_committed += rows
+        conn.execute(text(f"""
+            UPDATE {self.table}
+            SET rows_committed = :rows_committed, updated_at = CURRENT_TIMESTAMP
+            WHERE metadata_id = :metadata_id
+        """), {'rows_committed': self.rows_committed, 'metadata_id': self.metadata_id})
+
+    def save_accumulator(self, conn, state: Dict[str, Any]):
+        """在分块边界保存元数据累加器状态（不提交）"""
+        self.accumulated_rows = self.rows_committed
+        self.accumulator_state = state
+        conn.execute(text(f"""
+            UPDATE {self.table}
+            SET accumulated_rows = :accumulated_rows, accumulator_state = :state
+            WHERE metadata_id = :metadata_id
+        """), {
+            'accumulated_rows': self.accumulated_rows,
+            'state': json.dumps(state, ensure_ascii=False),
+            'metadata_id': self.metadata_id,
+        })
+
+    def complete(self, conn):
+        """标记入库完成（不提交）"""
+        conn.execute(text(f"""
+            UPDATE {self.table}
+            SET status = 'completed', accumulator_state = NULL, updated_at = CURRENT_TIMESTAMP
+            WHERE metadata_id = :metadata_id
+        """), {'metadata_id': self.metadata_id})
@@ -167,6 +167,7 @@ def verify_imported_data(config):
     
     try:
         from sqlalchemy import create_engine, text
+        from vector_query import VectorQuery
         
         # 连接数据库
         connection_string = (
@@ -206,16 +207,14 @@ def verify_imported_data(config):
             
             # 3. 检查样本数据
             print("\n3. 样本数据检查:")
-            sample_query = f"SELECT properties, ST_AsText(geometry) as geom_text FROM {vector_table} LIMIT 3"
-            result = conn.execute(text(sample_query))
-            samples = result.fetchall()
+            samples, _ = VectorQuery(engine, vector_table).page(limit=3)
             
             for i, sample in enumerate(samples, 1):
-                properties = json.loads(sample.properties)
+                properties = sample['properties']
                 print(f"   ✓ 样本 {i}:")
                 print(f"     属性字段数: {len(properties)}")
                 print(f"     属性字段: {list(properties.keys())}")
-                print(f"     几何数据: {sample.geom_text[:100]}...")
+                print(f"     几何数据: {json.dumps(sample['geometry'])[:100]}...")
                 
                 # 显示属性值
                 for key, value in properties.items():
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+按图层数据特征选择索引类型
+根据几何类型为几何列选择GIST / SP-GiST，推迟建索引时按入库后全表的写入顺序空间局部性改用BRIN；
+根据写入properties列的属性的区分度为properties列选择GIN / GIN(jsonb_path_ops) / 不建索引；
+配置项index_plan可覆盖自动选择
+"""
+
+import json
+from typing import Any, Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+import geopandas as gpd
+from sqlalchemy import text
+
+# 几何列可选的索引类型
+SPATIAL_INDEX_METHODS = ('gist', 'spgist', 'brin')
+
+# properties列可选的索引类型：gin_path为jsonb_path_ops（只支持@>，体积更小）
+PROPERTY_INDEX_METHODS = ('gin', 'gin_path', 'none')
+
+# 选择BRIN的最小要素数与最小空间局部性
+BRIN_MIN_ROWS = 1000000
+BRIN_MIN_LOCALITY = 0.9
+
+# 属性区分度：任取两个非空值相等的概率，不高于该值的属性做等值过滤时值得走索引
+GIN_MAX_SELECTIVITY = 0.05
+
+# 分块入库时用于画像的样本要素数
+PROFILE_SAMPLE_SIZE = 100000
+
+_POINT_TYPES = {'Point', 'MultiPoint'}
+
+
+def _is_nested(value) -> bool:
+    """属性值是否为对象或数组"""
+    return isinstance(value, (dict, list, tuple))
+
+
+def attribute_selectivity(values: pd.Series) -> Optional[float]:
+    """
+    属性的区分度：任取两个非空值相等的概率（各取值占比的平方和），
+    即等值过滤平均命中的比例；全为空值时返回None
+
+    Args:
+        values: 属性列
+
+    Returns:
+        0~1之间的区分度，越小越适合走索引
+    """
+    values = values.dropna()
+    if values.empty:
+        return None
+    if values.dtype == object:
+        # 对象 / 数组按JSON文本计数
+        values = values.map(lambda v: json.dumps(v, sort_keys=True, default=str) if _is_nested(v) else v)
+    shares = values.value_counts(normalize=True).to_numpy()
+    return float((shares ** 2).sum())
+
+
+def profile_layer(gdf: gpd.GeoDataFrame, feature_count: Optional[int] = None,
+                  property_columns: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+    """
+    图层数据画像
+
+    Args:
+        gdf: 图层数据（分块入库时为首个样本分块）
+        feature_count: 图层要素总数，默认为gdf的条数
+        property_columns: 写入properties列的属性，默认为全部属性字段
+
+    Returns:
+        geometry_types / point_only / feature_count / attribute_count /
+        attribute_selectivity（写入properties列的属性的区分度）/ nested_attributes（取值含对象或数组的属性）
+    """
+    geometry_types = sorted(set(gdf.geometry.geom_type.dropna()))
+    attributes = [col for col in gdf.columns if col != gdf.geometry.name]
+    if property_columns is None:
+        property_columns = attributes
+    selectivity = {}
+    nested = []
+    for name in property_columns:
+        value = attribute_selectivity(gdf[name])
+        if value is not None:
+            selectivity[str(name)] = round(value, 4)
+        if gdf[name].dtype == object and gdf[name].map(_is_nested).any():
+            nested.append(str(name))
+    return {
+        'geometry_types': geometry_types,
+        'point_only': bool(geometry_types) and set(geometry_types) <= _POINT_TYPES,
+        'feature_count': int(feature_count if feature_count is not None else len(gdf)),
+        'attribute_count': len(attributes),
+        'attribute_selectivity': selectivity,
+        'nested_attributes': nested,
+    }
+
+
+def choose_index_plan(profile: Dict[str, Any],
+                      overrides: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+    """
+    根据画像选择索引类型
+
+    - 纯点图层：SP-GiST（建索引与查询均快于GIST），其他：GIST；
+      BRIN需要全表的写入顺序，在入库后由revise_index_plan按全表统计选择
+    - 没有写入properties列的属性，或各属性的区分度都高于GIN_MAX_SELECTIVITY（等值过滤命中比例高，
+      顺序扫描更快）时不建properties索引
+    - 属性取值含对象或数组时用GIN（jsonb_path_ops对空对象 / 空数组的包含查询需扫描整个索引），
+      否则用GIN(jsonb_path_ops)（属性过滤只用@>）
+
+    Args:
+        profile: profile_layer的结果
+        overrides: 配置覆盖，如 {"geometry": "gist", "properties": "none"}
+
+    Returns:
+        geometry / properties 索引类型、选择依据reason与画像profile
+    """
+    overrides = overrides or {}
+    reasons = []
+
+    geometry = overrides.get('geometry')
+    if geometry:
+        reasons.append('几何索引由配置指定')
+    elif profile['point_only']:
+        geometry = 'spgist'
+        reasons.append('纯点图层')
+    else:
+        geometry = 'gist'
+
+    properties = overrides.get('properties')
+    selectivity = profile['attribute_selectivity']
+    selective = sorted(name for name, value in selectivity.items() if value <= GIN_MAX_SELECTIVITY)
+    nested = [name for name in selective if name in profile['nested_attributes']]
+    if properties:
+        reasons.append('属性索引由配置指定')
+    elif not selectivity:
+        properties = 'none'
+        reasons.append('没有写入properties列的属性')
+    elif not selective:
+        properties = 'none'
+        reasons.append(f"属性区分度均高于{GIN_MAX_SELECTIVITY}")
+    elif nested:
+        properties = 'gin'
+        reasons.append(f"属性含对象或数组: {', '.join(nested)}")
+    else:
+        properties = 'gin_path'
+        reasons.append(f"可按索引过滤的属性: {', '.join(selective)}")
+
+    if geometry not in SPATIAL_INDEX_METHODS:
+        raise ValueError(f"不支持的几何索引类型: {geometry}，可选: {', '.join(SPATIAL_INDEX_METHODS)}")
+    if properties not in PROPERTY_INDEX_METHODS:
+        raise ValueError(f"不支持的属性索引类型: {properties}，可选: {', '.join(PROPERTY_INDEX_METHODS)}")
+    return {
+        'geometry': geometry,
+        'properties': properties,
+        'reason': '；'.join(reasons),
+        'profile': profile,
+    }
+
+
+def range_locality(boxes: np.ndarray) -> float:
+    """
+    写入顺序的空间局部性：1减去各块范围外包框边长占总范围比例的均值；
+    按空间顺序写入时接近1，随机顺序接近0
+
+    Args:
+        boxes: 各块范围的外包框 (minx, miny, maxx, maxy)
+
+    Returns:
+        0~1之间的局部性指标
+    """
+    boxes = np.asarray(boxes, dtype=float).reshape(-1, 4)
+    boxes = boxes[~np.isnan(boxes).any(axis=1)]
+    if len(boxes) < 2:
+        return 0.0
+    total = np.array([boxes[:, 2].max() - boxes[:, 0].min(), boxes[:, 3].max() - boxes[:, 1].min()])
+    axes = total > 0
+    if not axes.any():
+        return 1.0
+    spans = np.column_stack([boxes[:, 2] - boxes[:, 0], boxes[:, 3] - boxes[:, 1]])
+    ratios = spans[:, axes] / total[axes]
+    return float(np.clip(1.0 - ratios.mean(), 0.0, 1.0))
+
+
+def table_statistics(conn, vector_table: str, pages_per_range: int) -> Dict[str, Any]:
+    """
+    入库后的全表统计（先ANALYZE，不提交）
+
+    要素数取各子表ANALYZE后的reltuples；geometry列的pg_stats不含correlation
+    （PostGIS只收集外包框直方图），局部性按BRIN的块范围（每pages_per_range个数据页）
+    分组计算外包框，要素数不足BRIN_MIN_ROWS时不扫描全表
+
+    Args:
+        conn: 数据库连接
+        vector_table: 矢量数据表名
+        pages_per_range: BRIN每个块范围的数据页数
+
+    Returns:
+        row_count / locality（未计算时为None）
+    """
+    conn.execute(text(f"ANALYZE {vector_table}"))
+    row_count = conn.execute(text("""
+        SELECT COALESCE(sum(GREATEST(c.reltuples, 0)), 0)
+        FROM pg_partition_tree(to_regclass(:table)) p
+        JOIN pg_class c ON c.oid = p.relid
+        WHERE p.isleaf
+    """), {'table': vector_table}).scalar()
+    statistics = {'row_count': int(row_count), 'locality': None}
+    if statistics['row_count'] < BRIN_MIN_ROWS:
+        return statistics
+    boxes = conn.execute(text(f"""
+        SELECT ST_XMin(box), ST_YMin(box), ST_XMax(box), ST_YMax(box)
+        FROM (
+            SELECT ST_Extent(geometry) AS box
+            FROM {vector_table}
+            WHERE NOT ST_IsEmpty(geometry)
+            GROUP BY tableoid, (ctid::text::point)[0]::bigint / :pages_per_range
+        ) ranges
+    """), {'pages_per_range': pages_per_range}).fetchall()
+    statistics['locality'] = round(range_locality(np.array(boxes, dtype=float)), 4)
+    return statistics
+
+
+def revise_index_plan(index_plan: Dict[str, Any], statistics: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    按入库后的全表统计修订几何索引：要素数不少于BRIN_MIN_ROWS且局部性不低于BRIN_MIN_LOCALITY时用BRIN
+
+    Args:
+        index_plan: choose_index_plan的结果（几何索引由配置指定时不应修订）
+        statistics: table_statistics的结果
+
+    Returns:
+        修订后的索引计划（statistics记录在table_statistics中）
+    """
+    revised = dict(index_plan, table_statistics=statistics)
+    locality = statistics['locality']
+    if statistics['row_count'] >= BRIN_MIN_ROWS and locality is not None and locality >= BRIN_MIN_LOCALITY:
+        revised['geometry'] = 'brin'
+        reason = f"全表要素数{statistics['row_count']}且写入顺序空间局部性{locality}"
+        revised['reason'] = '；'.join(filter(None, [index_plan.get('reason'), reason]))
+        if 'applied' in index_plan:
+            revised['applied'] = dict(index_plan['applied'], geometry='brin')
+    return revised
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+图层元信息快速检查
+只读取图层头信息（要素数、几何类型、坐标系、字段、范围），不解码要素，
+GPKG的这些信息来自gpkg_contents/gpkg_geometry_columns等系统表
+"""
+
+from typing import Any, Dict, List
+
+import fiona
+
+try:
+    import pyogrio
+except ImportError:  # 未安装pyogrio时使用fiona读取图层头信息
+    pyogrio = None
+
+
+# 图层头中未声明具体几何类型时的取值
+_UNKNOWN_GEOMETRY_TYPES = (None, 'Unknown', 'Geometry', 'GeometryCollection')
+
+
+def list_layers(file_path: str) -> List[str]:
+    """列出数据源中的所有图层名"""
+    if pyogrio is not None:
+        return [str(name) for name in pyogrio.list_layers(file_path)[:, 0]]
+    return list(fiona.listlayers(file_path))
+
+
+def _first_geometry_type(file_path: str, layer_name: str) -> str:
+    """图层头未声明几何类型时，只读取第一个要素确定几何类型"""
+    with fiona.open(file_path, layer=layer_name) as src:
+        for feature in src:
+            if feature['geometry'] is not None:
+                return feature['geometry']['type']
+    return 'Unknown'
+
+
+def inspect_layer(file_path: str, layer_name: str) -> Dict[str, Any]:
+    """
+    读取单个图层的元信息
+
+    Args:
+        file_path: 数据源路径（GPKG/GDB等）
+        layer_name: 图层名
+
+    Returns:
+        与原analyze_gpkg_file结构一致的图层信息：
+        feature_count, geometry_type, crs, columns（含geometry）, bbox
+    """
+    if pyogrio is not None:
+        info = pyogrio.read_info(file_path, layer=layer_name,
+                                 force_feature_count=True, force_total_bounds=True)
+        feature_count = int(info['features'])
+        geometry_type = info['geometry_type']
+        crs = info['crs'] or 'Unknown'
+        columns = [str(name) for name in info['fields']]
+        bbox = [float(v) for v in info['total_bounds']] if feature_count > 0 else None
+    else:
+        with fiona.open(file_path, layer=layer_name) as src:
+            feature_count = len(src)
+            geometry_type = src.schema.get('geometry')
+            crs = str(src.crs) if src.crs else 'Unknown'
+            columns = list(src.schema['properties'].keys())
+            bbox = list(src.bounds) if feature_count > 0 else None
+
+    if feature_count == 0:
+        geometry_type = 'Unknown'
+    elif geometry_type in _UNKNOWN_GEOMETRY_TYPES:
+        geometry_type = _first_geometry_type(file_path, layer_name)
+    else:
+        # 去掉维度后缀，如 "MultiPolygon Z" / "3D MultiPolygon"
+        geometry_type = geometry_type.replace('3D ', '').split(' ')[0]
+
+    return {
+        'feature_count': feature_count,
+        'geometry_type': geometry_type,
+        'crs': crs,
+        'columns': columns + ['geometry'],
+        'bbox': bbox
+    }
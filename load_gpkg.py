@@ -9,6 +9,8 @@ import json
 import logging
 import os
 import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime
 from pathlib import Path
 
@@ -18,6 +20,9 @@ from psycopg2.extras import RealDictCursor
 from sqlalchemy import create_engine, text
 import pandas as pd
 
+from layer_inspector import list_layers, inspect_layer
+from pg_copy_writer import copy_geodataframe
+
 # 配置日志
 def setup_logging(config):
     """设置日志配置"""
@@ -52,12 +57,16 @@ def load_config(config_path='config.json'):
         logging.error(f"配置文件格式错误: {e}")
         sys.exit(1)
 
+def build_connection_string(config):
+    """构建数据库连接字符串"""
+    db_config = config['database']
+    return f"postgresql://{db_config['username']}:{db_config['password']}@{db_config['host']}:{db_config['port']}/{db_config['database']}"
+
 def create_database_connection(config):
     """创建数据库连接"""
-    db_config = config['database']
     try:
         # 创建SQLAlchemy引擎
-        connection_string = f"postgresql://{db_config['username']}:{db_config['password']}@{db_config['host']}:{db_config['port']}/{db_config['database']}"
+        connection_string = build_connection_string(config)
         engine = create_engine(connection_string)
         
         # 测试连接
@@ -71,22 +80,14 @@ def create_database_connection(config):
         sys.exit(1)
 
 def analyze_gpkg_file(file_path):
-    """分析GPKG文件"""
+    """分析GPKG文件（只读取图层头信息，不解码要素）"""
     try:
-        # 读取GPKG文件的所有图层
-        layers = gpd.read_file(file_path, layer=None)
+        layers = list_layers(file_path)
         logging.info(f"GPKG文件分析完成: {file_path}")
         
         layer_info = {}
         for layer_name in layers:
-            gdf = gpd.read_file(file_path, layer=layer_name)
-            layer_info[layer_name] = {
-                'feature_count': len(gdf),
-                'geometry_type': str(gdf.geometry.geom_type.iloc[0]) if len(gdf) > 0 else 'Unknown',
-                'crs': str(gdf.crs) if gdf.crs else 'Unknown',
-                'columns': list(gdf.columns),
-                'bbox': gdf.total_bounds.tolist() if len(gdf) > 0 else None
-            }
+            layer_info[layer_name] = inspect_layer(file_path, layer_name)
             logging.info(f"图层 {layer_name}: {layer_info[layer_name]['feature_count']} 个要素, 几何类型: {layer_info[layer_name]['geometry_type']}")
         
         return layer_info
@@ -111,70 +112,100 @@ def generate_table_name(filename, layer_name, timestamp=None):
     table_name = f"{timestamp}_{clean_filename}_{clean_layer}_{uuid}"
     return table_name
 
-def create_vector_tables(engine, layer_info, filename, timestamp):
-    """创建向量数据表"""
-    tables_created = {}
+def load_layer(engine, gpkg_file, layer_name, info, table_name):
+    """
+    加载单个图层到独立的表
+    
+    Returns:
+        成功时返回表信息字典，图层为空或写入失败时返回None
+    """
+    start_time = time.perf_counter()
     
-    for layer_name, info in layer_info.items():
-        table_name = generate_table_name(filename, layer_name, timestamp)
+    # 读取图层数据
+    gdf = gpd.read_file(gpkg_file, layer=layer_name)
+    
+    # 转换坐标系到WGS84（如果需要）
+    if gdf.crs and gdf.crs != 'EPSG:4326':
+        try:
+            gdf = gdf.to_crs('EPSG:4326')
+            logging.info(f"坐标系转换成功: {layer_name} -> EPSG:4326")
+        except Exception as e:
+            logging.warning(f"坐标系转换失败，使用原始坐标系: {e}")
+    
+    if len(gdf) == 0:
+        return None
         
-        # 读取图层数据
-        gdf = gpd.read_file(f"testGdb.gpkg", layer=layer_name)
+    # 以COPY流式写入：geom为geometry(类型, 4326)列，属性写入JSONB列attributes
+    try:
+        stats = copy_geodataframe(engine, table_name, gdf)
         
-        # 转换坐标系到WGS84（如果需要）
-        if gdf.crs and gdf.crs != 'EPSG:4326':
-            try:
-                gdf = gdf.to_crs('EPSG:4326')
-                logging.info(f"坐标系转换成功: {layer_name} -> EPSG:4326")
-            except Exception as e:
-                logging.warning(f"坐标系转换失败，使用原始坐标系: {e}")
+        # 创建空间索引
+        with engine.connect() as conn:
+            conn.execute(text(f'CREATE INDEX "idx_{table_name}_geom" ON "{table_name}" USING GIST (geom)'))
+            conn.execute(text(f'CREATE INDEX "idx_{table_name}_created" ON "{table_name}" USING BTREE (create_time)'))
+            conn.execute(text(f'CREATE INDEX "idx_{table_name}_attributes" ON "{table_name}" USING GIN (attributes)'))
+            conn.commit()
         
-        # 准备属性数据
-        if len(gdf) > 0:
-            # 移除几何列，保留属性列
-            attributes_df = gdf.drop(columns=['geometry'])
-            
-            # 将属性数据转换为JSONB格式
-            attributes_json = attributes_df.to_dict('records')
-            
-            # 创建包含几何和属性的DataFrame
-            import pandas as pd
-            result_df = pd.DataFrame({
-                'geom': gdf.geometry,
-                'attributes': attributes_json,
-                'create_time': datetime.now(),
-                'update_time': datetime.now()
-            })
-            
-            # 写入数据库
-            try:
-                result_df.to_sql(
-                    table_name, 
-                    engine, 
-                    if_exists='replace', 
-                    index=False,
-                    method='multi',
-                    chunksize=1000
-                )
-                
-                # 创建空间索引
-                with engine.connect() as conn:
-                    conn.execute(text(f"CREATE INDEX idx_{table_name}_geom ON {table_name} USING GIST (geom)"))
-                    conn.execute(text(f"CREATE INDEX idx_{table_name}_created ON {table_name} USING BTREE (create_time)"))
-                    conn.execute(text(f"CREATE INDEX idx_{table_name}_attributes ON {table_name} USING GIN (attributes)"))
-                    conn.commit()
-                
-                tables_created[layer_name] = {
-                    'table_name': table_name,
-                    'feature_count': len(result_df),
-                    'geometry_type': info['geometry_type']
-                }
-                
-                logging.info(f"表 {table_name} 创建成功，包含 {len(result_df)} 个要素")
-                
-            except Exception as e:
-                logging.error(f"表 {table_name} 创建失败: {e}")
-                continue
+        logging.info(f"表 {table_name} 创建成功，包含 {stats['feature_count']} 个要素，"
+                     f"写入耗时 {stats['elapsed']}s，{stats['rows_per_second']} 条/秒")
+        return {
+            'table_name': table_name,
+            'feature_count': stats['feature_count'],
+            'geometry_type': info['geometry_type'],
+            'elapsed': round(time.perf_counter() - start_time, 3),
+            'load_rows_per_second': stats['rows_per_second'],
+            'worker_pid': os.getpid()
+        }
+        
+    except Exception as e:
+        logging.error(f"表 {table_name} 创建失败: {e}")
+        return None
+
+def _load_layer_worker(config, gpkg_file, layer_name, info, table_name):
+    """工作进程入口：每个进程使用独立的数据库引擎"""
+    engine = create_engine(build_connection_string(config))
+    try:
+        return load_layer(engine, gpkg_file, layer_name, info, table_name)
+    finally:
+        engine.dispose()
+
+def create_vector_tables(engine, layer_info, filename, timestamp,
+                         config=None, max_workers=1, gpkg_file="testGdb.gpkg"):
+    """
+    创建向量数据表
+    
+    max_workers大于1时各图层在独立进程中并发入库（需提供config用于各进程建立连接），
+    结果按图层顺序合并到tables_created
+    """
+    table_names = {layer_name: generate_table_name(filename, layer_name, timestamp)
+                   for layer_name in layer_info}
+    results = {}
+    
+    if max_workers <= 1 or len(layer_info) <= 1:
+        for layer_name, info in layer_info.items():
+            results[layer_name] = load_layer(engine, gpkg_file, layer_name, info,
+                                             table_names[layer_name])
+    else:
+        logging.info(f"并行加载 {len(layer_info)} 个图层，并行度: {max_workers}")
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(_load_layer_worker, config, gpkg_file, layer_name, info,
+                                table_names[layer_name]): layer_name
+                for layer_name, info in layer_info.items()
+            }
+            for future in as_completed(futures):
+                layer_name = futures[future]
+                try:
+                    results[layer_name] = future.result()
+                except Exception as e:
+                    logging.error(f"图层 {layer_name} 加载失败: {e}")
+                    results[layer_name] = None
+    
+    # 按原图层顺序合并结果
+    tables_created = {}
+    for layer_name in layer_info:
+        if results.get(layer_name):
+            tables_created[layer_name] = results[layer_name]
     
     return tables_created
 
@@ -286,12 +317,17 @@ def create_metadata_tables(engine, config, layer_info, tables_created, filename,
             layer_insert_sql = """
             INSERT INTO oge_vector_layer 
             (product_id, layer_name, table_name, geometry_type, feature_count, bbox_minx, bbox_miny, bbox_maxx, bbox_maxy,
-             coordinate_system, attribute_schema, uuid, create_time)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s);
+             coordinate_system, attribute_schema, processing_info, uuid, create_time)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s);
             """
             
             bbox = layer_info_data.get('bbox', [0, 0, 0, 0])
             attribute_schema = json.dumps({col: 'text' for col in layer_info_data.get('columns', []) if col != 'geometry'})
+            processing_info = json.dumps({
+                'elapsed': table_info.get('elapsed'),
+                'load_rows_per_second': table_info.get('load_rows_per_second'),
+                'worker_pid': table_info.get('worker_pid')
+            })
             
             with engine.connect() as conn:
                 conn.execute(text(layer_insert_sql), (
@@ -303,6 +339,7 @@ def create_metadata_tables(engine, config, layer_info, tables_created, filename,
                     bbox[0], bbox[1], bbox[2], bbox[3],
                     layer_info_data['crs'],
                     attribute_schema,
+                    processing_info,
                     uuid,
                     datetime.now()
                 ))
@@ -337,7 +374,10 @@ def main():
     
     # 创建向量数据表
     logging.info("开始创建向量数据表...")
-    tables_created = create_vector_tables(engine, layer_info, "testGdb", timestamp)
+    layer_workers = config.get('processing', {}).get('layer_workers', 1)
+    tables_created = create_vector_tables(engine, layer_info, "testGdb", timestamp,
+                                          config=config, max_workers=layer_workers,
+                                          gpkg_file=gpkg_file)
     
     # 创建元数据表
     logging.info("开始创建元数据表...")
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+多分辨率化简几何（LOD金字塔）
+入库后按一组容差对该次入库的几何做保持拓扑的化简（shapely 2向量化，多进程并行），
+写入与矢量数据表按要素id关联的伴随表 {vector_table}_lod{n}；
+小比例尺的查询与瓦片生成读取化简后的几何，只需处理原始顶点数的一小部分
+"""
+
+import io
+import json
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import shapely
+from sqlalchemy import text
+
+from parallel_reproject import PARALLEL_MIN_COORDINATES
+
+# 默认化简容差（度，约10米、100米、1公里）
+DEFAULT_LOD_TOLERANCES = (0.0001, 0.001, 0.01)
+
+# 每次从数据库读取并化简的要素数
+LOD_CHUNK_SIZE = 20000
+
+# 伴随表的COPY列
+LOD_COLUMNS = ('id', 'metadata_id', 'geometry')
+
+# 按WKB字节数估计坐标点数（二维坐标每点16字节）
+_BYTES_PER_COORDINATE = 16
+
+# COPY文本格式的NULL
+_COPY_NULL = '\\N'
+
+
+def lod_table_name(vector_table: str, level: int) -> str:
+    """第level级（从1开始，容差递增）伴随表的表名"""
+    return f"{vector_table}_lod{level}"
+
+
+def _simplify_wkb(geometries_wkb: Sequence[Optional[bytes]],
+                  tolerances: Sequence[float]) -> Tuple[List[List[Optional[str]]], np.ndarray]:
+    """
+    化简一块WKB几何（在工作进程中执行）
+
+    各级都从原始几何化简，与原始几何的偏差不超过该级容差
+    （在上一级结果上逐级化简时误差会累加，与伴随表注释中的容差不符）
+
+    Returns:
+        (各级的十六进制WKB列表, [原始顶点数, 各级顶点数])
+    """
+    geometries = shapely.from_wkb(np.asarray(geometries_wkb, dtype=object))
+    counts = [int(shapely.get_num_coordinates(geometries).sum())]
+    levels = []
+    for tolerance in tolerances:
+        simplified = shapely.simplify(geometries, tolerance, preserve_topology=True)
+        counts.append(int(shapely.get_num_coordinates(simplified).sum()))
+        levels.append(list(shapely.to_wkb(simplified, hex=True)))
+    return levels, np.array(counts, dtype=np.int64)
+
+
+def _simplify_parallel(executor: Optional[ProcessPoolExecutor], geometries_wkb: List[Optional[bytes]],
+                       tolerances: Sequence[float],
+                       workers: int) -> Tuple[List[List[Optional[str]]], np.ndarray]:
+    """将一块几何切分为workers份并行化简，按原顺序拼接（executor为None时串行化简）"""
+    size = sum(len(wkb) for wkb in geometries_wkb if wkb is not None)
+    if executor is None or size < PARALLEL_MIN_COORDINATES * _BYTES_PER_COORDINATE:
+        return _simplify_wkb(geometries_wkb, tolerances)
+    bounds = np.linspace(0, len(geometries_wkb), workers + 1).astype(int)
+    futures = [executor.submit(_simplify_wkb, geometries_wkb[start:end], tolerances)
+               for start, end in zip(bounds[:-1], bounds[1:]) if end > start]
+    results = [future.result() for future in futures]
+    levels = [sum((result[0][i] for result in results), []) for i in range(len(tolerances))]
+    return levels, sum(result[1] for result in results)
+
+
+def simplify_chunks(chunks: Iterable[Tuple[List[int], List[Optional[bytes]]]],
+                    tolerances: Sequence[float],
+                    workers: int = 1) -> Iterator[Tuple[List[int], List[List[Optional[str]]], np.ndarray]]:
+    """
+    逐块化简几何，进程池在整个迭代期间复用
+
+    Args:
+        chunks: (要素id列表, WKB列表) 的迭代器
+        tolerances: 递增的化简容差
+        workers: 进程数，为1时串行
+
+    Yields:
+        (要素id列表, 各级的十六进制WKB列表, [原始顶点数, 各级顶点数])
+    """
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        for ids, geometries_wkb in chunks:
+            levels, counts = _simplify_parallel(executor, geometries_wkb, tolerances, workers)
+            yield ids, levels, counts
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+
+def iter_geometry_chunks(raw_connection, vector_table: str, metadata_id: int,
+                         chunk_size: int = LOD_CHUNK_SIZE) -> Iterator[Tuple[List[int], List[Optional[bytes]]]]:
+    """
+    以服务端游标分块读取一次入库的要素id与WKB几何（内存占用与总要素数无关）
+
+    Args:
+        raw_connection: psycopg2原生连接（游标在其事务内有效，迭代结束前不能提交）
+        vector_table: 矢量数据表名
+        metadata_id: 元数据ID
+        chunk_size: 每块要素数
+
+    Yields:
+        (要素id列表, WKB字节串列表)
+    """
+    with raw_connection.cursor(name=f"lod_source_{metadata_id}") as cursor:
+        cursor.itersize = chunk_size
+        cursor.execute(f"SELECT id, ST_AsBinary(geometry) FROM {vector_table} WHERE metadata_id = %s",
+                       (metadata_id,))
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            yield ([row[0] for row in rows],
+                   [bytes(row[1]) if row[1] is not None else None for row in rows])
+
+
+def build_lod_buffer(ids: Sequence[int], geometries_hex: Sequence[Optional[str]],
+                     metadata_id: int) -> io.StringIO:
+    """构建伴随表的COPY文本格式缓冲区（id, metadata_id, geometry）"""
+    buffer = io.StringIO()
+    buffer.writelines(f"{feature_id}\t{metadata_id}\t{_COPY_NULL if geometry is None else geometry}\n"
+                      for feature_id, geometry in zip(ids, geometries_hex))
+    buffer.seek(0)
+    return buffer
+
+
+def ensure_lod_table(conn, vector_table: str, level: int, tolerance: float) -> str:
+    """
+    创建第level级伴随表（已存在时跳过，不提交），容差记录在表注释中
+
+    并行入库的任务可能同时为同一矢量数据表建伴随表，调用前应在同一事务中
+    持有该表的建表咨询锁（pg_advisory_xact_lock）
+
+    Raises:
+        ValueError: 已有伴随表的容差与tolerance不一致
+    """
+    table = lod_table_name(vector_table, level)
+    comment = conn.execute(text("SELECT obj_description(to_regclass(:table), 'pg_class')"),
+                           {'table': table}).scalar()
+    if comment is not None:
+        existing = json.loads(comment).get('tolerance')
+        if existing != tolerance:
+            raise ValueError(f"伴随表 {table} 的化简容差为 {existing}，与本次指定的 {tolerance} 不一致")
+        return table
+    conn.execute(text(f"""
+        CREATE TABLE IF NOT EXISTS {table} (
+            id INTEGER PRIMARY KEY,
+            metadata_id INTEGER NOT NULL,
+            geometry GEOMETRY(GEOMETRY, 4326)
+        )
+    """))
+    conn.execute(text(f"CREATE INDEX IF NOT EXISTS idx_{table}_geometry ON {table} USING GIST (geometry)"))
+    conn.execute(text(f"CREATE INDEX IF NOT EXISTS idx_{table}_metadata_id ON {table} (metadata_id)"))
+    conn.execute(text(f"COMMENT ON TABLE {table} IS '{json.dumps({'tolerance': tolerance})}'"))
+    return table
+
+
+def lod_levels(conn, vector_table: str) -> List[Tuple[str, float]]:
+    """
+    矢量数据表已有的伴随表
+
+    Returns:
+        [(伴随表名, 化简容差)]，按容差递增
+    """
+    rows = conn.execute(text("""
+        SELECT c.relname, obj_description(c.oid, 'pg_class')
+        FROM pg_class c
+        WHERE c.relkind = 'r' AND c.relname ~ ('^' || :table || '_lod[0-9]+$')
+          AND pg_table_is_visible(c.oid)
+    """), {'table': vector_table}).fetchall()
+    levels = [(name, json.loads(comment)['tolerance']) for name, comment in rows if comment]
+    return sorted(levels, key=lambda level: level[1])
+
+
+def tile_tolerance(zoom: int, extent: int = 4096) -> float:
+    """缩放级别zoom下一个MVT坐标单位对应的经度跨度（度），小于该值的化简误差在瓦片中不可见"""
+    return 360.0 / (1 << zoom) / extent
+
+
+def choose_lod_level(levels: Sequence[Tuple[str, float]], max_tolerance: float) -> Optional[str]:
+    """
+    选择容差不超过max_tolerance的最粗一级伴随表
+
+    Args:
+        levels: lod_levels的结果
+        max_tolerance: 可接受的最大化简误差（度）
+
+    Returns:
+        伴随表名，没有满足条件的级别时返回None（应读取原始几何）
+    """
+    table = None
+    for name, tolerance in levels:
+        if tolerance <= max_tolerance:
+            table = name
+    return table
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+矢量数据元信息增量统计
+逐块累计边界框、几何类型、空值数、字段类型与要素数，
+输出与VectorToPostGIS.extract_metadata相同结构的元数据字典
+"""
+
+import json
+import os
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+import geopandas as gpd
+
+
+def widen_dtype(current: Optional[np.dtype], new: np.dtype):
+    """
+    合并两个分块中同一字段的类型
+
+    数值类型按numpy提升规则放宽（如int64与float64得到float64），
+    其他不一致的类型统一放宽为object
+    """
+    if current is None or current == new:
+        return new
+    if (isinstance(current, np.dtype) and isinstance(new, np.dtype)
+            and current.kind in 'biuf' and new.kind in 'biuf'):
+        return np.result_type(current, new)
+    return np.dtype(object)
+
+
+class MetadataAccumulator:
+    """可合并的元数据累加器，支持分块入库时单遍统计"""
+
+    def __init__(self, file_path: str, source_crs: str, target_crs: str,
+                 deep_memory: bool = False):
+        """
+        Args:
+            file_path: 文件路径
+            source_crs: 源坐标系
+            target_crs: 目标坐标系
+            deep_memory: 是否深度统计内存占用（会遍历object列中的每个Python对象）
+        """
+        self.file_path = file_path
+        self.source_crs = source_crs
+        self.target_crs = target_crs
+        self.deep_memory = deep_memory
+
+        self.feature_count = 0
+        self.bbox = np.array([np.nan, np.nan, np.nan, np.nan])
+        self.geometry_types: List[str] = []
+        self.dtypes: Dict[str, Any] = {}
+        self.null_counts: Dict[str, int] = {}
+        self.memory_usage = 0
+        self.crs_info: Optional[str] = None
+
+    def update(self, gdf: gpd.GeoDataFrame) -> 'MetadataAccumulator':
+        """累计一个分块的统计信息"""
+        self.feature_count += len(gdf)
+
+        bounds = gdf.total_bounds
+        # fmin/fmax忽略空分块或空几何产生的NaN
+        self.bbox[:2] = np.fmin(self.bbox[:2], bounds[:2])
+        self.bbox[2:] = np.fmax(self.bbox[2:], bounds[2:])
+
+        # 空几何（None）的geom_type为NaN，不计入几何类型
+        for geom_type in gdf.geometry.geom_type.dropna().unique():
+            if geom_type not in self.geometry_types:
+                self.geometry_types.append(geom_type)
+
+        for col in gdf.columns:
+            if col != 'geometry':
+                self.dtypes[col] = widen_dtype(self.dtypes.get(col), gdf[col].dtype)
+                self.null_counts[col] = self.null_counts.get(col, 0) + int(gdf[col].isnull().sum())
+
+        self.memory_usage += int(gdf.memory_usage(deep=self.deep_memory).sum())
+        if self.crs_info is None:
+            self.crs_info = str(gdf.crs)
+        return self
+
+    def merge(self, other: 'MetadataAccumulator') -> 'MetadataAccumulator':
+        """合并另一个累加器（如并行读取的不同分块）"""
+        self.feature_count += other.feature_count
+        self.bbox[:2] = np.fmin(self.bbox[:2], other.bbox[:2])
+        self.bbox[2:] = np.fmax(self.bbox[2:], other.bbox[2:])
+        for geom_type in other.geometry_types:
+            if geom_type not in self.geometry_types:
+                self.geometry_types.append(geom_type)
+        for col, dtype in other.dtypes.items():
+            self.dtypes[col] = widen_dtype(self.dtypes.get(col), dtype)
+            self.null_counts[col] = self.null_counts.get(col, 0) + other.null_counts[col]
+        self.memory_usage += other.memory_usage
+        if self.crs_info is None:
+            self.crs_info = other.crs_info
+        return self
+
+    def to_state(self) -> Dict[str, Any]:
+        """导出可JSON序列化的累计状态（用于检查点续传）"""
+        return {
+            'feature_count': int(self.feature_count),
+            'bbox': [None if np.isnan(v) else float(v) for v in self.bbox],
+            'geometry_types': list(self.geometry_types),
+            'dtypes': {col: str(dtype) for col, dtype in self.dtypes.items()},
+            'null_counts': dict(self.null_counts),
+            'memory_usage': int(self.memory_usage),
+            'crs_info': self.crs_info,
+        }
+
+    @classmethod
+    def from_state(cls, file_path: str, source_crs: str, target_crs: str,
+                   state: Dict[str, Any], deep_memory: bool = False) -> 'MetadataAccumulator':
+        """从to_state导出的状态恢复累加器"""
+        accumulator = cls(file_path, source_crs, target_crs, deep_memory)
+        accumulator.feature_count = state['feature_count']
+        accumulator.bbox = np.array([np.nan if v is None else v for v in state['bbox']], dtype=float)
+        accumulator.geometry_types = list(state['geometry_types'])
+        for col, dtype_name in state['dtypes'].items():
+            try:
+                accumulator.dtypes[col] = pd.api.types.pandas_dtype(dtype_name)
+            except TypeError:
+                accumulator.dtypes[col] = np.dtype(object)
+        accumulator.null_counts = dict(state['null_counts'])
+        accumulator.memory_usage = state['memory_usage']
+        accumulator.crs_info = state['crs_info']
+        return accumulator
+
+    def to_metadata(self) -> Dict[str, Any]:
+        """生成元数据字典，字段与extract_metadata一致"""
+        file_stat = os.stat(self.file_path)
+        properties_schema = {col: str(dtype) for col, dtype in self.dtypes.items()}
+
+        return {
+            'file_name': os.path.basename(self.file_path),
+            'file_path': self.file_path,
+            'file_size': int(file_stat.st_size),
+            'file_format': os.path.splitext(self.file_path)[1].lower(),
+            'source_crs': self.source_crs,
+            'target_crs': self.target_crs,
+            'feature_count': int(self.feature_count),
+            'geometry_type': ','.join(self.geometry_types),
+            'bbox_minx': float(self.bbox[0]),
+            'bbox_miny': float(self.bbox[1]),
+            'bbox_maxx': float(self.bbox[2]),
+            'bbox_maxy': float(self.bbox[3]),
+            'properties_schema': json.dumps(properties_schema, ensure_ascii=False),
+            'additional_info': json.dumps({
+                'crs_info': self.crs_info,
+                'memory_usage': int(self.memory_usage),
+                'null_counts': self.null_counts
+            }, ensure_ascii=False)
+        }
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+多进程并行坐标转换
+用shapely 2的get_coordinates/set_coordinates取出全部坐标，按块分发到进程池转换后写回，
+每个工作进程只构建一次Transformer；逐点转换与GeoDataFrame.to_crs结果一致
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+import numpy as np
+import shapely
+import geopandas as gpd
+from pyproj import CRS
+
+from crs_cache import get_crs, get_transformer
+
+# 坐标点数少于该值时串行转换（进程池启动与数据传输开销大于收益）
+PARALLEL_MIN_COORDINATES = 100000
+
+
+def _transform_coordinates(source_wkt: str, target_wkt: str, coords: np.ndarray) -> np.ndarray:
+    """转换一块坐标（N×2或N×3），Transformer取自进程内缓存"""
+    transformer = get_transformer(source_wkt, target_wkt)
+    return np.column_stack(transformer.transform(*coords.T))
+
+
+def _reproject_coordinates(executor: Optional[ProcessPoolExecutor], source_wkt: str, target_wkt: str,
+                           coords: np.ndarray, workers: int) -> np.ndarray:
+    """将坐标数组切分为workers块并行转换，按原顺序拼接（executor为None时串行转换）"""
+    if executor is None:
+        return _transform_coordinates(source_wkt, target_wkt, coords)
+    chunks = np.array_split(coords, workers)
+    futures = [executor.submit(_transform_coordinates, source_wkt, target_wkt, chunk)
+               for chunk in chunks if len(chunk)]
+    return np.concatenate([future.result() for future in futures])
+
+
+def _reproject(geometries: np.ndarray, source_crs: CRS, target_crs: CRS,
+               executor: Optional[ProcessPoolExecutor], workers: int) -> np.ndarray:
+    """二维与三维几何分别取出坐标转换后写回（与geopandas一致），输入不被修改"""
+    source_wkt, target_wkt = source_crs.to_wkt(), target_crs.to_wkt()
+    result = np.array(geometries, dtype=object, copy=True)
+    has_z = shapely.has_z(result)
+
+    for mask, include_z in ((~has_z, False), (has_z, True)):
+        if not mask.any():
+            continue
+        coords = shapely.get_coordinates(result[mask], include_z=include_z)
+        if len(coords) == 0:
+            continue
+        new_coords = _reproject_coordinates(executor, source_wkt, target_wkt, coords, workers)
+        result[mask] = shapely.set_coordinates(result[mask], new_coords)
+    return result
+
+
+def reproject_geometries(geometries: np.ndarray, source_crs: CRS, target_crs: CRS,
+                         workers: int, executor: Optional[ProcessPoolExecutor] = None) -> np.ndarray:
+    """
+    转换几何数组的坐标，workers大于1时多进程并行
+
+    Args:
+        geometries: shapely几何对象数组
+        source_crs: 源坐标系
+        target_crs: 目标坐标系
+        workers: 进程数
+        executor: 调用方持有的进程池（分块入库时整个入库复用同一个），
+                  未指定且workers大于1时为本次调用临时创建
+
+    Returns:
+        转换后的几何数组
+    """
+    if workers <= 1:
+        return _reproject(geometries, source_crs, target_crs, None, 1)
+    if executor is not None:
+        return _reproject(geometries, source_crs, target_crs, executor, workers)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return _reproject(geometries, source_crs, target_crs, executor, workers)
+
+
+def reproject_geodataframe(gdf: gpd.GeoDataFrame, target_crs, workers: int = 1,
+                           executor: Optional[ProcessPoolExecutor] = None) -> gpd.GeoDataFrame:
+    """
+    GeoDataFrame.to_crs的替代实现：使用进程内缓存的Transformer，
+    workers大于1且坐标点数较多时多进程并行转换
+
+    Args:
+        gdf: 已设置坐标系的GeoDataFrame
+        target_crs: 目标坐标系
+        workers: 进程数
+        executor: 调用方持有的进程池，见reproject_geometries
+
+    Returns:
+        转换后的GeoDataFrame
+    """
+    target_crs = get_crs(target_crs)
+    geometries = np.asarray(gdf.geometry.values)
+    if workers > 1 and shapely.get_num_coordinates(geometries).sum() < PARALLEL_MIN_COORDINATES:
+        workers = 1
+
+    reprojected = reproject_geometries(geometries, gdf.crs, target_crs, workers, executor)
+    result = gdf.copy()
+    result[gdf.geometry.name] = gpd.GeoSeries(reprojected, index=gdf.index, crs=target_crs)
+    return result.set_crs(target_crs, allow_override=True)
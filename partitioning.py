@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+矢量数据表分区
+按元数据ID（每次入库一个分区）或要素外包框中心所在的四叉树瓦片（quadkey）对矢量数据表做LIST分区；
+入库时在客户端按分区分组，每组直接写入对应的子分区（子分区的分区键列带默认值），
+不依赖服务端逐行路由；grid分区表在表注释中记录最大要素外包框半边长，
+范围查询据此附加 grid_cell = ANY(...) 条件裁剪子分区
+"""
+
+import json
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import shapely
+import geopandas as gpd
+from sqlalchemy import text
+
+# 支持的分区方式：metadata_id为每次入库一个分区，grid为按要素所在瓦片分区
+PARTITION_SCHEMES = ('metadata_id', 'grid')
+
+# grid分区的分区键列
+GRID_COLUMN = 'grid_cell'
+
+# grid分区默认的瓦片层级（层级6的瓦片约5.6°×5.6°）
+DEFAULT_GRID_LEVEL = 6
+
+# 范围覆盖的瓦片多于该数量时不附加裁剪条件（接近全表扫描，条件本身反而增加规划开销）
+MAX_PRUNE_CELLS = 1024
+
+# Web墨卡托瓦片的纬度范围
+_MAX_LATITUDE = 85.05112878
+
+
+def tile_coordinates(lon: np.ndarray, lat: np.ndarray, level: int) -> Tuple[np.ndarray, np.ndarray]:
+    """经纬度所在的瓦片行列号"""
+    n = 1 << level
+    lon = np.clip(np.nan_to_num(lon), -180.0, 180.0)
+    lat = np.radians(np.clip(np.nan_to_num(lat), -_MAX_LATITUDE, _MAX_LATITUDE))
+    tx = np.floor((lon + 180.0) / 360.0 * n)
+    ty = np.floor((1.0 - np.log(np.tan(lat) + 1.0 / np.cos(lat)) / np.pi) / 2.0 * n)
+    return (np.clip(tx, 0, n - 1).astype(np.int64),
+            np.clip(ty, 0, n - 1).astype(np.int64))
+
+
+def _quadkeys_from_tiles(tx: np.ndarray, ty: np.ndarray, level: int) -> np.ndarray:
+    """瓦片行列号转quadkey字符串数组（每位为0-3）"""
+    shifts = np.arange(level - 1, -1, -1)
+    digits = ((tx[:, None] >> shifts) & 1) + 2 * ((ty[:, None] >> shifts) & 1)
+    chars = np.ascontiguousarray((digits + ord('0')).astype(np.uint8))
+    return chars.view(f'S{level}').ravel().astype(str)
+
+
+def quadkeys(lon: np.ndarray, lat: np.ndarray, level: int = DEFAULT_GRID_LEVEL) -> np.ndarray:
+    """经纬度数组所在瓦片的quadkey"""
+    tx, ty = tile_coordinates(np.asarray(lon, dtype=float), np.asarray(lat, dtype=float), level)
+    return _quadkeys_from_tiles(tx, ty, level)
+
+
+def feature_quadkeys(geometries: np.ndarray, level: int = DEFAULT_GRID_LEVEL) -> np.ndarray:
+    """要素外包框中心（EPSG:4326）所在瓦片的quadkey，空几何归入经纬度(0, 0)所在瓦片"""
+    boxes = shapely.bounds(np.asarray(geometries, dtype=object))
+    return quadkeys((boxes[:, 0] + boxes[:, 2]) / 2, (boxes[:, 1] + boxes[:, 3]) / 2, level)
+
+
+def max_half_extent(geometries: np.ndarray) -> float:
+    """要素外包框半边长（宽、高中较大者的一半）的最大值，空几何不计"""
+    boxes = shapely.bounds(np.asarray(geometries, dtype=object))
+    if len(boxes) == 0 or np.isnan(boxes).all():
+        return 0.0
+    return float(np.nanmax(np.maximum(boxes[:, 2] - boxes[:, 0], boxes[:, 3] - boxes[:, 1]))) / 2
+
+
+def bbox_quadkeys(bbox: Sequence[float], level: int = DEFAULT_GRID_LEVEL,
+                  margin: float = 0.0) -> List[str]:
+    """
+    与范围相交的瓦片quadkey，用于grid分区表的查询裁剪（grid_cell = ANY(...)）
+
+    要素按外包框中心分区，跨瓦片的要素可能与相邻瓦片的范围相交，
+    margin（度）应不小于最大要素外包框边长的一半
+
+    Args:
+        bbox: (minx, miny, maxx, maxy)，EPSG:4326
+        level: 瓦片层级
+        margin: 范围外扩距离
+
+    Returns:
+        quadkey列表
+    """
+    minx, miny, maxx, maxy = bbox
+    tx, ty = tile_coordinates(np.array([minx - margin, maxx + margin]),
+                               np.array([maxy + margin, miny - margin]), level)
+    xs, ys = np.meshgrid(np.arange(tx[0], tx[1] + 1), np.arange(ty[0], ty[1] + 1))
+    return _quadkeys_from_tiles(xs.ravel(), ys.ravel(), level).tolist()
+
+
+def record_grid_margin(conn, table: str, margin: float) -> float:
+    """
+    在grid分区表的表注释中记录最大要素外包框半边长（只增不减，不提交）
+
+    首次记录时一并计算表中已有要素的最大值，使启用记录前入库的要素同样被覆盖；
+    读取与更新在事务级咨询锁下进行，并行入库不会互相覆盖
+
+    Returns:
+        记录后的半边长
+    """
+    conn.execute(text("SELECT pg_advisory_xact_lock(hashtext(:key))"), {'key': f"{table}:grid_margin"})
+    comment = conn.execute(text("SELECT obj_description(to_regclass(:table), 'pg_class')"),
+                           {'table': table}).scalar()
+    info = json.loads(comment) if comment else {}
+    if 'grid_margin' not in info:
+        existing = conn.execute(text(f"""
+            SELECT MAX(GREATEST(ST_XMax(geometry) - ST_XMin(geometry), ST_YMax(geometry) - ST_YMin(geometry))) / 2
+            FROM {table}
+        """)).scalar()
+        margin = max(margin, existing or 0.0)
+    elif info['grid_margin'] >= margin:
+        return info['grid_margin']
+    info['grid_margin'] = margin
+    conn.execute(text(f"COMMENT ON TABLE {table} IS '{json.dumps(info)}'"))
+    return margin
+
+
+def partition_column(scheme: str) -> str:
+    """分区方式对应的分区键列"""
+    if scheme not in PARTITION_SCHEMES:
+        raise ValueError(f"不支持的分区方式: {scheme}，可选: {', '.join(PARTITION_SCHEMES)}")
+    return 'metadata_id' if scheme == 'metadata_id' else GRID_COLUMN
+
+
+class PartitionLayout:
+    """矢量数据表的分区方式，负责创建子分区并将要素按子分区分组"""
+
+    def __init__(self, scheme: str, grid_level: int = DEFAULT_GRID_LEVEL, unlogged: bool = False,
+                 grid_margin: Optional[float] = None):
+        """
+        Args:
+            scheme: metadata_id / grid
+            grid_level: grid分区的瓦片层级
+            unlogged: 子分区是否创建为UNLOGGED表（暂存表使用）
+            grid_margin: 表中已记录的最大要素外包框半边长（度），未记录时为None（不裁剪）
+        """
+        self.scheme = scheme
+        self.column = partition_column(scheme)
+        self.grid_level = grid_level
+        self.unlogged = unlogged
+        self.grid_margin = grid_margin
+        # 本次入库写入要素的最大外包框半边长
+        self.observed_margin = 0.0
+        self._known_partitions = set()
+
+    @classmethod
+    def detect(cls, conn, table: str, grid_level: int = DEFAULT_GRID_LEVEL) -> Optional['PartitionLayout']:
+        """
+        读取已有表的分区方式
+
+        grid分区的瓦片层级以已有子分区的quadkey长度为准，最大要素外包框半边长取自表注释
+
+        Returns:
+            表不存在或不是分区表时返回None
+        """
+        column = conn.execute(text("""
+            SELECT a.attname
+            FROM pg_partitioned_table pt
+            JOIN pg_attribute a ON a.attrelid = pt.partrelid AND a.attnum = pt.partattrs[0]
+            WHERE pt.partrelid = to_regclass(:table)
+        """), {'table': table}).scalar()
+        if column is None:
+            return None
+        if column == GRID_COLUMN:
+            child = conn.execute(text("""
+                SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid
+                WHERE i.inhparent = to_regclass(:table) LIMIT 1
+            """), {'table': table}).scalar()
+            prefix = f"{table}_g"
+            if child and child.startswith(prefix):
+                grid_level = len(child) - len(prefix)
+            comment = conn.execute(text("SELECT obj_description(to_regclass(:table), 'pg_class')"),
+                                   {'table': table}).scalar()
+            grid_margin = json.loads(comment).get('grid_margin') if comment else None
+            return cls('grid', grid_level, grid_margin=grid_margin)
+        return cls('metadata_id')
+
+    def partition_name(self, table: str, value) -> str:
+        """子分区表名"""
+        if self.scheme == 'metadata_id':
+            return f"{table}_m{int(value)}"
+        return f"{table}_g{value}"
+
+    def ensure_partition(self, conn, table: str, value) -> str:
+        """创建子分区（已存在时跳过，不提交），返回子分区表名"""
+        name = self.partition_name(table, value)
+        if name in self._known_partitions:
+            return name
+        unlogged = "UNLOGGED " if self.unlogged else ""
+        if self.scheme == 'metadata_id':
+            conn.execute(text(f"""
+                CREATE {unlogged}TABLE IF NOT EXISTS {name} PARTITION OF {table}
+                FOR VALUES IN ({int(value)})
+            """))
+        else:
+            # quadkey只含数字0-3；分区键列的默认值使直接写入子分区时无需提供该列
+            conn.execute(text(f"""
+                CREATE {unlogged}TABLE IF NOT EXISTS {name} PARTITION OF {table}
+                ({GRID_COLUMN} DEFAULT '{value}') FOR VALUES IN ('{value}')
+            """))
+        self._known_partitions.add(name)
+        return name
+
+    def route(self, conn, table: str, gdf: gpd.GeoDataFrame,
+              metadata_id: int) -> List[Tuple[str, gpd.GeoDataFrame]]:
+        """
+        将要素按子分区分组，并创建缺少的子分区
+
+        Returns:
+            [(子分区表名, 该分区的要素)]，各组保持原有顺序
+        """
+        if self.scheme == 'metadata_id':
+            return [(self.ensure_partition(conn, table, metadata_id), gdf)]
+        self.observed_margin = max(self.observed_margin, max_half_extent(gdf.geometry.values))
+        cells = feature_quadkeys(gdf.geometry.values, self.grid_level)
+        unique_cells, inverse = np.unique(cells, return_inverse=True)
+        if len(unique_cells) == 1:
+            return [(self.ensure_partition(conn, table, unique_cells[0]), gdf)]
+        return [(self.ensure_partition(conn, table, cell), gdf.iloc[np.flatnonzero(inverse == i)])
+                for i, cell in enumerate(unique_cells)]
+
+    def record_margin(self, conn, table: str, margin: Optional[float] = None):
+        """
+        将本次入库的最大要素外包框半边长记录到grid分区表（只在超过已记录值时更新，不提交）
+
+        Args:
+            conn: 数据库连接
+            table: 矢量数据表名
+            margin: 要记录的半边长，默认为本布局route过的要素的最大值
+        """
+        if self.scheme != 'grid':
+            return
+        margin = self.observed_margin if margin is None else margin
+        if self.grid_margin is None or margin > self.grid_margin:
+            self.grid_margin = record_grid_margin(conn, table, margin)
+
+    def bbox_cells(self, bbox: Sequence[float]) -> Optional[List[str]]:
+        """
+        范围查询可能命中的子分区quadkey（范围按已记录的最大要素外包框半边长外扩）
+
+        Args:
+            bbox: (minx, miny, maxx, maxy)，EPSG:4326
+
+        Returns:
+            quadkey列表；不是grid分区、未记录半边长或覆盖的瓦片过多时返回None（不裁剪）
+        """
+        if self.scheme != 'grid' or self.grid_margin is None:
+            return None
+        cells = bbox_quadkeys(bbox, self.grid_level, self.grid_margin)
+        return cells if len(cells) <= MAX_PRUNE_CELLS else None
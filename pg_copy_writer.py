@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+PostGIS COPY批量写入工具
+通过psycopg2的copy_expert以 COPY ... FROM STDIN 流式写入要素，
+几何以(E)WKB传输，避免服务端再次解析WKT；
+属性按列整体序列化为JSON，避免逐行iterrows
+"""
+
+import csv
+import io
+import json
+import struct
+import time
+from json.encoder import encode_basestring
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+import shapely
+
+
+# 支持的入库方式
+LOAD_METHODS = ('insert', 'copy_csv', 'copy_binary')
+
+# 矢量数据表的COPY写入列
+COPY_COLUMNS = ('geometry', 'properties', 'metadata_id')
+
+# PGCOPY二进制格式文件头：签名 + flags(int32) + 头扩展长度(int32)
+_PGCOPY_HEADER = b'PGCOPY\n\xff\r\n\x00' + struct.pack('>ii', 0, 0)
+_PGCOPY_TRAILER = struct.pack('>h', -1)
+
+# JSONB二进制接收格式的版本号
+_JSONB_VERSION = b'\x01'
+
+
+def _json_default(value):
+    """json.dumps无法直接序列化的值：numpy标量、日期时间等"""
+    if isinstance(value, np.generic):
+        return value.item()
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return str(value)
+
+
+def _encode_json_column(values: pd.Series) -> List[str]:
+    """
+    将一列属性值整体编码为JSON片段
+
+    输出与 json.dumps(value, ensure_ascii=False) 逐值结果一致，
+    缺失值(NaN/None/NaT)编码为null
+    """
+    missing = values.isna().to_numpy()
+    kind = values.dtype.kind
+
+    if kind == 'f':
+        array = values.to_numpy(dtype='float64')
+        fragments = list(map(float.__repr__, array.tolist()))
+        infinite = np.isinf(array)
+        if infinite.any():
+            for i in np.flatnonzero(infinite):
+                fragments[i] = 'Infinity' if array[i] > 0 else '-Infinity'
+    elif kind in 'iu' and not missing.any():
+        fragments = list(map(str, values.to_numpy().tolist()))
+    elif kind == 'b' and not missing.any():
+        fragments = ['true' if v else 'false' for v in values.to_numpy().tolist()]
+    elif kind == 'M':
+        text_values = values.dt.strftime('%Y-%m-%dT%H:%M:%S').tolist()
+        fragments = [encode_basestring(v) if isinstance(v, str) else 'null' for v in text_values]
+    else:
+        fragments = []
+        for v in values.to_numpy(dtype=object).tolist():
+            if isinstance(v, str):
+                fragments.append(encode_basestring(v))
+            else:
+                fragments.append(json.dumps(v, ensure_ascii=False, default=_json_default))
+
+    if missing.any():
+        for i in np.flatnonzero(missing):
+            fragments[i] = 'null'
+    return fragments
+
+
+def serialize_properties(attributes: pd.DataFrame) -> List[str]:
+    """
+    按列向量化序列化属性表，每行得到一个JSON对象字符串
+
+    结果与逐行 json.dumps(dict, ensure_ascii=False) 字节一致
+    （键顺序为列顺序，分隔符为默认的', '与': '）
+
+    Args:
+        attributes: 不含几何列的属性DataFrame
+
+    Returns:
+        与行数等长的JSON字符串列表
+    """
+    if len(attributes.columns) == 0:
+        return ['{}'] * len(attributes)
+
+    key_prefixes = [encode_basestring(str(col)) + ': ' for col in attributes.columns]
+    columns = [
+        [prefix + fragment for fragment in _encode_json_column(attributes.iloc[:, i])]
+        for i, prefix in enumerate(key_prefixes)
+    ]
+    return ['{' + ', '.join(row) + '}' for row in zip(*columns)]
+
+
+def encode_geometries(geometries, srid: Optional[int] = None, hex: bool = False) -> List:
+    """
+    向量化编码几何为WKB/EWKB
+
+    Args:
+        geometries: GeoSeries或shapely几何数组
+        srid: 写入EWKB的SRID，为None时不写入SRID（由列定义的SRID补全）
+        hex: 是否输出十六进制字符串（CSV格式使用）
+
+    Returns:
+        与输入等长的列表，空几何对应None
+    """
+    geoms = getattr(geometries, 'values', geometries)
+    if srid is not None:
+        geoms = shapely.set_srid(geoms, srid)
+    return list(shapely.to_wkb(geoms, hex=hex, include_srid=srid is not None))
+
+
+def build_csv_buffer(geometries_hex: Sequence[Optional[str]],
+                     properties_json: Sequence[str],
+                     metadata_id: int) -> io.StringIO:
+    """
+    构建CSV格式的COPY数据缓冲区
+
+    Args:
+        geometries_hex: 十六进制EWKB字符串列表
+        properties_json: 属性JSON字符串列表
+        metadata_id: 元数据ID
+
+    Returns:
+        已定位到开头的StringIO
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\n')
+    for geom, props in zip(geometries_hex, properties_json):
+        # None在CSV中写为无引号空串，COPY将其识别为NULL
+        writer.writerow((geom, props, metadata_id))
+    buffer.seek(0)
+    return buffer
+
+
+def build_binary_buffer(geometries_wkb: Sequence[Optional[bytes]],
+                        properties_json: Sequence[str],
+                        metadata_id: Optional[int] = None) -> io.BytesIO:
+    """
+    构建PGCOPY二进制格式的COPY数据缓冲区
+
+    Args:
+        geometries_wkb: EWKB字节串列表
+        properties_json: 属性JSON字符串列表
+        metadata_id: 元数据ID，为None时每行只写几何与属性两列
+
+    Returns:
+        已定位到开头的BytesIO
+    """
+    buffer = io.BytesIO()
+    write = buffer.write
+    write(_PGCOPY_HEADER)
+
+    tuple_header = struct.pack('>h', 2 if metadata_id is None else 3)
+    null_field = struct.pack('>i', -1)
+    metadata_field = b'' if metadata_id is None else struct.pack('>ii', 4, metadata_id)
+
+    for geom, props in zip(geometries_wkb, properties_json):
+        write(tuple_header)
+        if geom is None:
+            write(null_field)
+        else:
+            write(struct.pack('>i', len(geom)))
+            write(geom)
+        props_bytes = _JSONB_VERSION + props.encode('utf-8')
+        write(struct.pack('>i', len(props_bytes)))
+        write(props_bytes)
+        write(metadata_field)
+
+    write(_PGCOPY_TRAILER)
+    buffer.seek(0)
+    return buffer
+
+
+def copy_rows(raw_connection, table: str, columns: Iterable[str],
+              buffer, copy_format: str) -> None:
+    """
+    使用copy_expert执行 COPY ... FROM STDIN（不提交事务）
+
+    Args:
+        raw_connection: psycopg2原生连接
+        table: 目标表名
+        columns: 列名
+        buffer: build_csv_buffer/build_binary_buffer生成的缓冲区
+        copy_format: 'csv' 或 'binary'
+    """
+    column_list = ', '.join(columns)
+    copy_sql = f"COPY {table} ({column_list}) FROM STDIN WITH (FORMAT {copy_format})"
+    with raw_connection.cursor() as cursor:
+        cursor.copy_expert(copy_sql, buffer)
+
+
+def uniform_dimensions(gdf):
+    """
+    二维与三维几何混合时将几何统一升为三维（二维几何的Z取0），否则原样返回
+
+    带类型修饰的几何列（包括通用的Geometry）要求全部几何的维度与列声明一致
+    """
+    geometries = gdf.geometry
+    present = ~(geometries.isna() | geometries.is_empty)
+    has_z = geometries.has_z[present]
+    if not has_z.any() or has_z.all():
+        return gdf
+    gdf = gdf.copy()
+    gdf[geometries.name] = shapely.force_3d(geometries.values)
+    return gdf
+
+
+def postgis_geometry_type(geometries) -> str:
+    """
+    根据数据确定PostGIS几何列类型，如 MultiPolygon / PointZ，
+    混合几何类型时为通用的 Geometry；全部非空几何都为三维时才声明Z
+    """
+    geom_types = list(geometries.geom_type.dropna().unique())
+    geometry_type = geom_types[0] if len(geom_types) == 1 else 'Geometry'
+    present = ~(geometries.isna() | geometries.is_empty)
+    if present.any() and geometries.has_z[present].all():
+        geometry_type += 'Z'
+    return geometry_type
+
+
+def copy_geodataframe(engine, table_name: str, gdf, batch_size: int = 10000,
+                      srid: int = 4326) -> Dict[str, Any]:
+    """
+    以COPY二进制格式将GeoDataFrame流式写入新表（已存在则替换）
+
+    表结构为 id + geom geometry(<类型>, srid) + attributes JSONB + 时间戳，
+    建表与全部数据写入在同一事务中完成；二维与三维几何混合的图层统一升为三维写入
+
+    Args:
+        engine: SQLAlchemy引擎
+        table_name: 目标表名
+        gdf: 已转换到目标坐标系的GeoDataFrame
+        batch_size: 每次COPY的行数
+        srid: 几何列SRID
+
+    Returns:
+        写入统计：feature_count, geometry_type, elapsed, rows_per_second
+    """
+    start = time.perf_counter()
+    gdf = uniform_dimensions(gdf)
+    geometry_type = postgis_geometry_type(gdf.geometry)
+    geometry_column = gdf.geometry.name
+    # 表名可能以时间戳数字开头，需加引号
+    quoted_table = f'"{table_name}"'
+
+    create_sql = f"""
+    DROP TABLE IF EXISTS {quoted_table};
+    CREATE TABLE {quoted_table} (
+        id SERIAL PRIMARY KEY,
+        geom geometry({geometry_type}, {srid}),
+        attributes JSONB,
+        create_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        update_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+    """
+
+    raw_connection = engine.raw_connection()
+    try:
+        with raw_connection.cursor() as cursor:
+            cursor.execute(create_sql)
+        for i in range(0, len(gdf), batch_size):
+            batch = gdf.iloc[i:i + batch_size]
+            buffer = build_binary_buffer(
+                encode_geometries(batch.geometry),
+                serialize_properties(batch.drop(columns=geometry_column))
+            )
+            copy_rows(raw_connection, quoted_table, ('geom', 'attributes'), buffer, 'binary')
+        raw_connection.commit()
+    except Exception:
+        raw_connection.rollback()
+        raise
+    finally:
+        raw_connection.close()
+
+    elapsed = time.perf_counter() - start
+    return {
+        'feature_count': len(gdf),
+        'geometry_type': geometry_type,
+        'elapsed': round(elapsed, 3),
+        'rows_per_second': round(len(gdf) / elapsed, 1) if elapsed > 0 else None
+    }
@@ -7,6 +7,7 @@
 
 import json
 from sqlalchemy import create_engine, text
+from vector_query import VectorQuery
 
 
 def query_nature_reserve_data():
@@ -40,29 +41,18 @@ def query_nature_reserve_data():
             count = result.fetchone()[0]
             print(f"✓ 总记录数: {count}")
             
-            # 2. 查询所有数据
-            data_query = """
-            SELECT 
-                id,
-                properties->>'OBJECTID' as objectid,
-                properties->>'mj' as area,
-                properties->>'Shape_Length' as length,
-                properties->>'Shape_Area' as shape_area,
-                ST_AsText(geometry) as geom_text
-            FROM nature_reserve_data 
-            ORDER BY CAST(properties->>'mj' AS FLOAT) DESC
-            """
-            result = conn.execute(text(data_query))
-            records = result.fetchall()
-            
+            # 2. 按面积降序查询所有数据（服务端游标流式读取，不一次性取回全表）
             print(f"\n✓ 数据详情:")
-            for record in records:
-                print(f"  ID: {record.id}")
-                print(f"    OBJECTID: {record.objectid}")
-                print(f"    面积(mj): {record.area}")
-                print(f"    长度: {record.length}")
-                print(f"    形状面积: {record.shape_area}")
-                print(f"    几何: {record.geom_text[:100]}...")
+            query = VectorQuery(engine, 'nature_reserve_data',
+                                order_by="CAST(t.properties->>'mj' AS FLOAT)", descending=True)
+            for feature in query.iter_features():
+                properties = feature['properties']
+                print(f"  ID: {feature['id']}")
+                print(f"    OBJECTID: {properties.get('OBJECTID')}")
+                print(f"    面积(mj): {properties.get('mj')}")
+                print(f"    长度: {properties.get('Shape_Length')}")
+                print(f"    形状面积: {properties.get('Shape_Area')}")
+                print(f"    几何: {json.dumps(feature['geometry'])[:100]}...")
                 print()
             
             # 3. 面积统计
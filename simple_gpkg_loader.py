@@ -16,6 +16,9 @@ import string
 import geopandas as gpd
 from sqlalchemy import create_engine, text
 
+from layer_inspector import list_layers, inspect_layer
+from pg_copy_writer import copy_geodataframe
+
 def setup_logging():
     """设置日志"""
     logging.basicConfig(
@@ -56,23 +59,15 @@ def create_database_connection(config):
         sys.exit(1)
 
 def analyze_gpkg_file(file_path):
-    """分析GPKG文件"""
+    """分析GPKG文件（只读取图层头信息，不解码要素）"""
     try:
-        # 读取GPKG文件的所有图层
-        layers = gpd.read_file(file_path, layer=None)
+        layers = list_layers(file_path)
         logging.info(f"GPKG文件分析完成: {file_path}")
         logging.info(f"发现 {len(layers)} 个图层")
         
         layer_info = {}
         for layer_name in layers:
-            gdf = gpd.read_file(file_path, layer=layer_name)
-            layer_info[layer_name] = {
-                'feature_count': len(gdf),
-                'geometry_type': str(gdf.geometry.geom_type.iloc[0]) if len(gdf) > 0 else 'Unknown',
-                'crs': str(gdf.crs) if gdf.crs else 'Unknown',
-                'columns': list(gdf.columns),
-                'bbox': gdf.total_bounds.tolist() if len(gdf) > 0 else None
-            }
+            layer_info[layer_name] = inspect_layer(file_path, layer_name)
             logging.info(f"图层 {layer_name}: {layer_info[layer_name]['feature_count']} 个要素, 几何类型: {layer_info[layer_name]['geometry_type']}")
         
         return layer_info
@@ -112,51 +107,30 @@ def create_vector_tables(engine, layer_info, filename, timestamp):
             except Exception as e:
                 logging.warning(f"坐标系转换失败，使用原始坐标系: {e}")
         
-        # 准备属性数据
+        # 以COPY流式写入：geom为geometry(类型, 4326)列，属性写入JSONB列attributes
         if len(gdf) > 0:
-            # 移除几何列，保留属性列
-            attributes_df = gdf.drop(columns=['geometry'])
-            
-            # 将属性数据转换为JSONB格式
-            attributes_json = attributes_df.to_dict('records')
-            
-            # 创建包含几何和属性的DataFrame
-            import pandas as pd
-            result_df = pd.DataFrame({
-                'geom': gdf.geometry,
-                'attributes': attributes_json,
-                'create_time': datetime.now(),
-                'update_time': datetime.now()
-            })
-            
-            # 写入数据库
             try:
-                result_df.to_sql(
-                    table_name, 
-                    engine, 
-                    if_exists='replace', 
-                    index=False,
-                    method='multi',
-                    chunksize=1000
-                )
+                stats = copy_geodataframe(engine, table_name, gdf)
                 
                 # 创建索引
                 with engine.connect() as conn:
                     # 空间索引
-                    conn.execute(text(f"CREATE INDEX idx_{table_name}_geom ON {table_name} USING GIST (geom)"))
+                    conn.execute(text(f'CREATE INDEX "idx_{table_name}_geom" ON "{table_name}" USING GIST (geom)'))
                     # 时间索引
-                    conn.execute(text(f"CREATE INDEX idx_{table_name}_created ON {table_name} USING BTREE (create_time)"))
+                    conn.execute(text(f'CREATE INDEX "idx_{table_name}_created" ON "{table_name}" USING BTREE (create_time)'))
                     # 属性索引
-                    conn.execute(text(f"CREATE INDEX idx_{table_name}_attributes ON {table_name} USING GIN (attributes)"))
+                    conn.execute(text(f'CREATE INDEX "idx_{table_name}_attributes" ON "{table_name}" USING GIN (attributes)'))
                     conn.commit()
                 
                 tables_created[layer_name] = {
                     'table_name': table_name,
-                    'feature_count': len(result_df),
-                    'geometry_type': info['geometry_type']
+                    'feature_count': stats['feature_count'],
+                    'geometry_type': info['geometry_type'],
+                    'load_rows_per_second': stats['rows_per_second']
                 }
                 
-                logging.info(f"表 {table_name} 创建成功，包含 {len(result_df)} 个要素")
+                logging.info(f"表 {table_name} 创建成功，包含 {stats['feature_count']} 个要素，"
+                             f"写入耗时 {stats['elapsed']}s，{stats['rows_per_second']} 条/秒")
                 
             except Exception as e:
                 logging.error(f"表 {table_name} 创建失败: {e}")
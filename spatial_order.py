@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+要素空间排序
+按几何外包框中心的Hilbert曲线或Z-order（Morton）编码对要素排序后再写入，
+空间上相近的要素落在相邻的数据页中，范围查询读取的页数更少；编码以numpy向量化计算
+"""
+
+from typing import Optional, Sequence
+
+import numpy as np
+import shapely
+import geopandas as gpd
+
+from crs_cache import CRSLike, get_crs, get_transformer
+
+# 支持的空间排序方式
+SPATIAL_ORDERS = ('hilbert', 'zorder')
+
+# 每个坐标轴的网格位数（2^16 × 2^16 网格）
+CURVE_ORDER = 16
+
+
+def _grid_coordinates(x: np.ndarray, y: np.ndarray, bounds: Sequence[float],
+                      order: int) -> np.ndarray:
+    """将坐标映射为 [0, 2^order - 1] 的整数网格坐标（范围外的坐标截断到边界）"""
+    minx, miny, maxx, maxy = bounds
+    cells = (1 << order) - 1
+    result = []
+    for values, low, high in ((x, minx, maxx), (y, miny, maxy)):
+        width = high - low
+        scaled = (values - low) / width * cells if width > 0 else np.zeros_like(values)
+        result.append(np.clip(scaled, 0, cells).astype(np.uint64))
+    return result
+
+
+def _spread_bits(values: np.ndarray) -> np.ndarray:
+    """将32位整数的各位间隔一位展开到64位（Morton编码）"""
+    values = values & np.uint64(0xFFFFFFFF)
+    for shift, mask in ((16, 0x0000FFFF0000FFFF), (8, 0x00FF00FF00FF00FF),
+                        (4, 0x0F0F0F0F0F0F0F0F), (2, 0x3333333333333333),
+                        (1, 0x5555555555555555)):
+        values = (values | (values << np.uint64(shift))) & np.uint64(mask)
+    return values
+
+
+def zorder_key(ix: np.ndarray, iy: np.ndarray) -> np.ndarray:
+    """网格坐标的Z-order编码"""
+    return _spread_bits(ix) | (_spread_bits(iy) << np.uint64(1))
+
+
+def hilbert_key(ix: np.ndarray, iy: np.ndarray, order: int = CURVE_ORDER) -> np.ndarray:
+    """网格坐标的Hilbert曲线编码（逐位旋转，循环次数为order）"""
+    x = ix.astype(np.uint64)
+    y = iy.astype(np.uint64)
+    last = np.uint64((1 << order) - 1)
+    key = np.zeros(len(x), dtype=np.uint64)
+    for bit in range(order - 1, -1, -1):
+        s = np.uint64(1 << bit)
+        rx = (x & s) > 0
+        ry = (y & s) > 0
+        key += s * s * ((rx.astype(np.uint64) * np.uint64(3)) ^ ry.astype(np.uint64))
+        # 旋转象限，使子曲线首尾相接
+        flip = ~ry & rx
+        x = np.where(flip, last - x, x)
+        y = np.where(flip, last - y, y)
+        swap = ~ry
+        x, y = np.where(swap, y, x), np.where(swap, x, y)
+    return key
+
+
+def spatial_sort_keys(geometries: np.ndarray, method: str = 'hilbert',
+                      bounds: Optional[Sequence[float]] = None,
+                      order: int = CURVE_ORDER) -> np.ndarray:
+    """
+    计算几何数组的空间排序编码
+
+    Args:
+        geometries: shapely几何对象数组
+        method: hilbert / zorder
+        bounds: 编码网格范围 (minx, miny, maxx, maxy)，默认取数据的总外包框；
+                分块写入时应使用固定范围，使各分块的编码可比较
+        order: 每个坐标轴的网格位数
+
+    Returns:
+        uint64编码数组，空几何排在最后
+    """
+    if method not in SPATIAL_ORDERS:
+        raise ValueError(f"不支持的空间排序方式: {method}，可选: {', '.join(SPATIAL_ORDERS)}")
+    geometries = np.asarray(geometries, dtype=object)
+    boxes = shapely.bounds(geometries)
+    x = (boxes[:, 0] + boxes[:, 2]) / 2
+    y = (boxes[:, 1] + boxes[:, 3]) / 2
+    valid = ~(np.isnan(x) | np.isnan(y))
+    keys = np.full(len(geometries), np.iinfo(np.uint64).max, dtype=np.uint64)
+    if not valid.any():
+        return keys
+
+    if bounds is None:
+        bounds = (x[valid].min(), y[valid].min(), x[valid].max(), y[valid].max())
+    ix, iy = _grid_coordinates(x[valid], y[valid], bounds, order)
+    keys[valid] = hilbert_key(ix, iy, order) if method == 'hilbert' else zorder_key(ix, iy)
+    return keys
+
+
+def sort_geodataframe(gdf: gpd.GeoDataFrame, method: str = 'hilbert',
+                      bounds: Optional[Sequence[float]] = None) -> gpd.GeoDataFrame:
+    """
+    按空间排序编码重排GeoDataFrame（稳定排序，同一数据的结果确定）
+
+    Args:
+        gdf: GeoDataFrame对象
+        method: hilbert / zorder
+        bounds: 编码网格范围，默认取数据的总外包框
+
+    Returns:
+        重排后的GeoDataFrame
+    """
+    if len(gdf) < 2:
+        return gdf
+    keys = spatial_sort_keys(gdf.geometry.values, method, bounds)
+    return gdf.iloc[np.argsort(keys, kind='stable')]
+
+
+def crs_extent(crs: CRSLike) -> Optional[Sequence[float]]:
+    """
+    坐标系适用范围在该坐标系下的外包框，作为分块写入时固定的编码网格范围
+
+    Returns:
+        (minx, miny, maxx, maxy)，坐标系未定义适用范围时返回None
+    """
+    crs = get_crs(crs)
+    area = crs.area_of_use
+    if area is None:
+        return None
+    if crs.is_geographic:
+        return area.bounds
+    transformer = get_transformer('EPSG:4326', crs)
+    return transformer.transform_bounds(*area.bounds)
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+大面要素的ST_Subdivide伴随表
+顶点数很多的面（省界、开发区边界等）外包框大、空间谓词计算慢，
+入库后将每个要素用ST_Subdivide切分为顶点数不超过max_vertices的小块，
+写入与矢量数据表按要素id关联的伴随表 {vector_table}_subdivided；
+相交/包含判断先在小块上完成，只有无法由单个小块确定的要素才回到原始几何；
+伴随表建立后的每次入库都按表注释中的max_vertices切分，伴随表中没有小块的入库
+（建立伴随表之前的入库）由查询辅助函数直接在矢量数据表上判断
+"""
+
+import json
+from typing import List, Optional, Union
+
+import shapely
+from shapely.geometry.base import BaseGeometry
+from sqlalchemy import text
+
+from partitioning import GRID_COLUMN, PartitionLayout
+
+# 默认每块的最大顶点数
+DEFAULT_MAX_VERTICES = 256
+
+# ST_Subdivide要求的最小顶点数
+_MIN_MAX_VERTICES = 5
+
+GeometryLike = Union[str, BaseGeometry]
+
+
+def subdivided_table_name(vector_table: str) -> str:
+    """矢量数据表的切分伴随表表名"""
+    return f"{vector_table}_subdivided"
+
+
+def ensure_subdivided_table(conn, vector_table: str, max_vertices: int = DEFAULT_MAX_VERTICES) -> str:
+    """
+    创建切分伴随表（已存在时跳过，不提交），max_vertices记录在表注释中
+
+    Raises:
+        ValueError: max_vertices小于5，或已有伴随表的max_vertices与之不一致
+    """
+    if max_vertices < _MIN_MAX_VERTICES:
+        raise ValueError(f"ST_Subdivide的最大顶点数不能小于{_MIN_MAX_VERTICES}: {max_vertices}")
+    table = subdivided_table_name(vector_table)
+    comment = conn.execute(text("SELECT obj_description(to_regclass(:table), 'pg_class')"),
+                           {'table': table}).scalar()
+    if comment is not None:
+        existing = json.loads(comment).get('max_vertices')
+        if existing != max_vertices:
+            raise ValueError(f"伴随表 {table} 的最大顶点数为 {existing}，与本次指定的 {max_vertices} 不一致")
+        return table
+    conn.execute(text(f"""
+        CREATE TABLE IF NOT EXISTS {table} (
+            id BIGSERIAL PRIMARY KEY,
+            feature_id INTEGER NOT NULL,
+            metadata_id INTEGER NOT NULL,
+            geometry GEOMETRY(GEOMETRY, 4326)
+        )
+    """))
+    conn.execute(text(f"CREATE INDEX IF NOT EXISTS idx_{table}_geometry ON {table} USING GIST (geometry)"))
+    conn.execute(text(f"CREATE INDEX IF NOT EXISTS idx_{table}_feature_id ON {table} (feature_id)"))
+    conn.execute(text(f"CREATE INDEX IF NOT EXISTS idx_{table}_metadata_id ON {table} (metadata_id)"))
+    conn.execute(text(f"COMMENT ON TABLE {table} IS '{json.dumps({'max_vertices': max_vertices})}'"))
+    return table
+
+
+def subdivided_max_vertices(conn, vector_table: str) -> Optional[int]:
+    """已有切分伴随表的max_vertices（表注释），没有伴随表时返回None"""
+    comment = conn.execute(text("SELECT obj_description(to_regclass(:table), 'pg_class')"),
+                           {'table': subdivided_table_name(vector_table)}).scalar()
+    return json.loads(comment).get('max_vertices') if comment else None
+
+
+def subdivide_import(conn, vector_table: str, metadata_id: int,
+                     max_vertices: int = DEFAULT_MAX_VERTICES) -> int:
+    """
+    将一次入库的要素切分写入伴随表（先删除该次入库已有的小块，不提交）
+
+    顶点数不超过max_vertices的要素按原几何写入一块，使伴随表覆盖全部要素；
+    无效几何先以ST_MakeValid修复再切分
+
+    Returns:
+        写入的小块数
+    """
+    table = ensure_subdivided_table(conn, vector_table, max_vertices)
+    conn.execute(text(f"DELETE FROM {table} WHERE metadata_id = :metadata_id"), {'metadata_id': metadata_id})
+    return conn.execute(text(f"""
+        INSERT INTO {table} (feature_id, metadata_id, geometry)
+        SELECT t.id, t.metadata_id,
+               ST_Subdivide(CASE WHEN ST_IsValid(t.geometry) THEN t.geometry
+                                 ELSE ST_MakeValid(t.geometry) END, :max_vertices)
+        FROM {vector_table} t
+        WHERE t.metadata_id = :metadata_id AND t.geometry IS NOT NULL AND NOT ST_IsEmpty(t.geometry)
+    """), {'metadata_id': metadata_id, 'max_vertices': max_vertices}).rowcount
+
+
+def has_subdivided_table(conn, vector_table: str) -> bool:
+    """矢量数据表是否有切分伴随表"""
+    return conn.execute(text("SELECT to_regclass(:table) IS NOT NULL"),
+                        {'table': subdivided_table_name(vector_table)}).scalar()
+
+
+def _query_params(geometry: GeometryLike, srid: int, metadata_id: Optional[int]) -> dict:
+    """查询几何（WKT或shapely几何）与过滤条件的绑定参数"""
+    wkt = geometry if isinstance(geometry, str) else geometry.wkt
+    return {'wkt': wkt, 'srid': srid, 'metadata_id': metadata_id}
+
+
+def _grid_filter(conn, vector_table: str, params: dict, alias: str) -> str:
+    """
+    grid分区表按查询几何的外包框裁剪子分区的条件（写入params['grid_cells']）
+
+    查询几何不是EPSG:4326或表不能裁剪时返回空字符串
+    """
+    if params['srid'] != 4326:
+        return ""
+    layout = PartitionLayout.detect(conn, vector_table)
+    if layout is None:
+        return ""
+    cells = layout.bbox_cells(shapely.from_wkt(params['wkt']).bounds)
+    if cells is None:
+        return ""
+    params['grid_cells'] = cells
+    return f"AND {alias}.{GRID_COLUMN} = ANY(:grid_cells)"
+
+
+def query_intersects(conn, vector_table: str, geometry: GeometryLike, srid: int = 4326,
+                     metadata_id: Optional[int] = None) -> List[int]:
+    """
+    与查询几何相交的要素id
+
+    有切分伴随表时在小块上判断（任一小块相交即要素相交），伴随表中没有小块的入库
+    以及没有伴随表时直接查询矢量数据表
+
+    Args:
+        conn: 数据库连接
+        vector_table: 矢量数据表名
+        geometry: 查询几何，WKT字符串或shapely几何
+        srid: 查询几何的坐标系，与数据表不同时转换到EPSG:4326
+        metadata_id: 只查询该次入库的要素
+
+    Returns:
+        按id排序的要素id列表
+    """
+    params = _query_params(geometry, srid, metadata_id)
+    query_geometry = "ST_Transform(ST_GeomFromText(:wkt, :srid), 4326)"
+    if has_subdivided_table(conn, vector_table):
+        table = subdivided_table_name(vector_table)
+        metadata_filter = "AND s.metadata_id = :metadata_id" if metadata_id is not None else ""
+        base_metadata_filter = "AND t.metadata_id = :metadata_id" if metadata_id is not None else ""
+        sql = f"""
+            SELECT s.feature_id
+            FROM {table} s
+            WHERE ST_Intersects(s.geometry, {query_geometry}) {metadata_filter}
+            UNION
+            SELECT t.id FROM {vector_table} t
+            WHERE ST_Intersects(t.geometry, {query_geometry}) {base_metadata_filter}
+              {_grid_filter(conn, vector_table, params, 't')}
+              AND NOT EXISTS (SELECT 1 FROM {table} s WHERE s.metadata_id = t.metadata_id)
+            ORDER BY 1
+        """
+    else:
+        metadata_filter = "AND t.metadata_id = :metadata_id" if metadata_id is not None else ""
+        grid_filter = _grid_filter(conn, vector_table, params, 't')
+        sql = f"""
+            SELECT t.id FROM {vector_table} t
+            WHERE ST_Intersects(t.geometry, {query_geometry}) {metadata_filter} {grid_filter}
+            ORDER BY t.id
+        """
+    return [row[0] for row in conn.execute(text(sql), params)]
+
+
+def query_contains(conn, vector_table: str, geometry: GeometryLike, srid: int = 4326,
+                   metadata_id: Optional[int] = None) -> List[int]:
+    """
+    包含查询几何的要素id（ST_Contains(要素, 查询几何)，如点落在哪个行政区）
+
+    有切分伴随表时：某个小块包含查询几何则要素必然包含；
+    查询几何跨越多个小块时，只对这些候选要素用原始几何判断；
+    伴随表中没有小块的入库直接用原始几何判断
+
+    Args:
+        conn: 数据库连接
+        vector_table: 矢量数据表名
+        geometry: 查询几何，WKT字符串或shapely几何
+        srid: 查询几何的坐标系
+        metadata_id: 只查询该次入库的要素
+
+    Returns:
+        按id排序的要素id列表
+    """
+    params = _query_params(geometry, srid, metadata_id)
+    query_geometry = "ST_Transform(ST_GeomFromText(:wkt, :srid), 4326)"
+    if has_subdivided_table(conn, vector_table):
+        table = subdivided_table_name(vector_table)
+        metadata_filter = "AND s.metadata_id = :metadata_id" if metadata_id is not None else ""
+        base_metadata_filter = "AND t.metadata_id = :metadata_id" if metadata_id is not None else ""
+        grid_filter = _grid_filter(conn, vector_table, params, 't')
+        sql = f"""
+            WITH q AS (SELECT {query_geometry} AS geom),
+            candidates AS (
+                SELECT s.feature_id, bool_or(ST_Contains(s.geometry, q.geom)) AS inside
+                FROM {table} s, q
+                WHERE ST_Intersects(s.geometry, q.geom) {metadata_filter}
+                GROUP BY s.feature_id
+            )
+            SELECT c.feature_id FROM candidates c WHERE c.inside
+            UNION
+            SELECT c.feature_id
+            FROM candidates c JOIN {vector_table} t ON t.id = c.feature_id, q
+            WHERE NOT c.inside AND ST_Contains(t.geometry, q.geom) {grid_filter}
+            UNION
+            SELECT t.id FROM {vector_table} t, q
+            WHERE ST_Contains(t.geometry, q.geom) {base_metadata_filter} {grid_filter}
+              AND NOT EXISTS (SELECT 1 FROM {table} s WHERE s.metadata_id = t.metadata_id)
+            ORDER BY 1
+        """
+    else:
+        metadata_filter = "AND t.metadata_id = :metadata_id" if metadata_id is not None else ""
+        grid_filter = _grid_filter(conn, vector_table, params, 't')
+        sql = f"""
+            SELECT t.id FROM {vector_table} t
+            WHERE ST_Contains(t.geometry, {query_geometry}) {metadata_filter} {grid_filter}
+            ORDER BY t.id
+        """
+    return [row[0] for row in conn.execute(text(sql), params)]
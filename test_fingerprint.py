@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+文件指纹测试脚本
+验证 fingerprint 模块对未变化、仅修改时间变化与内容变化文件的判断，以及内容哈希只在需要时计算（不需要数据库）
+使用方法：python test_fingerprint.py
+"""
+
+import os
+import sys
+import tempfile
+
+import fingerprint
+from fingerprint import check_fingerprint, data_files, with_content_hash
+
+
+def compare(name, actual, expected):
+    """比较一项结果，返回失败数"""
+    if actual == expected:
+        print(f"  ✓ {name}")
+        return 0
+    print(f"  ✗ {name}: {actual} != {expected}")
+    return 1
+
+
+def write(path, content):
+    """写入文件内容"""
+    with open(path, 'wb') as f:
+        f.write(content)
+
+
+def test_fingerprint(directory):
+    """指纹比较"""
+    failures = 0
+    shp = os.path.join(directory, 'roads.shp')
+    for ext, content in (('.shp', b'shp'), ('.shx', b'shx'), ('.dbf', b'dbf'), ('.prj', b'prj')):
+        write(os.path.join(directory, 'roads' + ext), content)
+    failures += compare("Shapefile附属文件计入数据集",
+                        [os.path.basename(path) for path in data_files(shp)],
+                        ['roads.shp', 'roads.shx', 'roads.dbf', 'roads.prj'])
+
+    # 与入库流程相同：首次入库时check_fingerprint返回的指纹不含hash，记录前补充内容哈希
+    unchanged, current = check_fingerprint(None, shp)
+    failures += compare("未入库过", (unchanged, sorted(current)), (False, ['files']))
+    stored = with_content_hash(current, shp)
+    failures += compare("入库记录的指纹含内容哈希", sorted(stored), ['files', 'hash'])
+    failures += compare("未变化", check_fingerprint(stored, shp)[0], True)
+
+    # 记录内容哈希的调用次数，验证只在大小一致、修改时间不同时计算
+    calls = []
+    original_hash = fingerprint.content_hash
+
+    def counting_hash(file_path, *args, **kwargs):
+        calls.append(file_path)
+        return original_hash(file_path, *args, **kwargs)
+
+    fingerprint.content_hash = counting_hash
+    try:
+        unchanged, current = check_fingerprint(stored, shp)
+        failures += compare("大小与修改时间一致时不计算哈希", (unchanged, len(calls)), (True, 0))
+        failures += compare("未变化时沿用已记录的指纹", current, stored)
+
+        dbf = os.path.join(directory, 'roads.dbf')
+        stat = os.stat(dbf)
+        os.utime(dbf, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+        unchanged, current = check_fingerprint(stored, shp)
+        failures += compare("仅修改时间变化（touch）时比较哈希并判定未变化", (unchanged, len(calls)), (True, 1))
+        failures += compare("计算哈希后的指纹含hash", 'hash' in current, True)
+
+        write(dbf, b'DBF')
+        calls.clear()
+        failures += compare("大小一致、内容变化", check_fingerprint(stored, shp)[0], False)
+        failures += compare("大小一致时计算了哈希", len(calls), 1)
+
+        write(dbf, b'dbf with more rows')
+        calls.clear()
+        unchanged, current = check_fingerprint(stored, shp)
+        failures += compare("大小变化时判定已变化且不计算哈希", (unchanged, len(calls)), (False, 0))
+        failures += compare("大小变化时的指纹只含文件大小与修改时间", sorted(current), ['files'])
+    finally:
+        fingerprint.content_hash = original_hash
+
+    failures += compare("缺少files的旧记录视为已变化", check_fingerprint({'hash': stored['hash']}, shp)[0], False)
+
+    # 旧版本记录的指纹不含hash：touch后无法确认内容，按已变化重新入库，重新记录的指纹含hash
+    write(dbf, b'dbf')
+    legacy = {'files': check_fingerprint(None, shp)[1]['files']}
+    stat = os.stat(dbf)
+    os.utime(dbf, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    unchanged, current = check_fingerprint(legacy, shp)
+    failures += compare("不含hash的旧记录在touch后重新入库", unchanged, False)
+    stored = with_content_hash(current, shp)
+    os.utime(dbf, ns=(stat.st_atime_ns, stat.st_mtime_ns + 2 * 10 ** 9))
+    failures += compare("重新入库后再次touch时跳过", check_fingerprint(stored, shp)[0], True)
+    return failures
+
+
+def main():
+    """主函数"""
+    print("=" * 60)
+    print("文件指纹测试（fingerprint）")
+    print("=" * 60)
+    with tempfile.TemporaryDirectory() as directory:
+        failures = test_fingerprint(directory)
+    print("=" * 60)
+    if failures:
+        print(f"❌ {failures} 项检查失败")
+        sys.exit(1)
+    print("✅ 全部检查通过")
+
+
+if __name__ == '__main__':
+    main()
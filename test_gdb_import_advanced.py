@@ -160,6 +160,7 @@ def verify_imported_data(config):
     
     try:
         from sqlalchemy import create_engine, text
+        from vector_query import VectorQuery
         
         # 连接数据库
         connection_string = (
@@ -196,14 +197,12 @@ def verify_imported_data(config):
             
             # 3. 检查样本数据
             print("\n3. 样本数据检查:")
-            sample_query = f"SELECT properties, ST_AsText(geometry) as geom_text FROM {vector_table} LIMIT 1"
-            result = conn.execute(text(sample_query))
-            sample = result.fetchone()
+            samples, _ = VectorQuery(engine, vector_table).page(limit=1)
             
-            if sample:
-                properties = json.loads(sample.properties)
+            if samples:
+                properties = samples[0]['properties']
                 print(f"   ✓ 属性字段数: {len(properties)}")
-                print(f"   ✓ 几何数据: {sample.geom_text[:100]}...")
+                print(f"   ✓ 几何数据: {json.dumps(samples[0]['geometry'])[:100]}...")
                 
                 # 显示属性字段
                 print("   ✓ 属性字段:")
@@ -223,16 +222,11 @@ def verify_imported_data(config):
             
             # 5. 属性查询测试
             print("\n5. 属性查询测试:")
-            prop_query = f"""
-            SELECT properties->>'BSM' as bsm, properties->>'XZQMC' as xzqmc
-            FROM {vector_table} 
-            LIMIT 3
-            """
-            result = conn.execute(text(prop_query))
-            props = result.fetchall()
+            features, _ = VectorQuery(engine, vector_table).page(limit=3)
             print(f"   ✓ 属性查询结果:")
-            for prop in props:
-                print(f"      BSM: {prop.bsm}, 行政区: {prop.xzqmc}")
+            for feature in features:
+                properties = feature['properties']
+                print(f"      BSM: {properties.get('BSM')}, 行政区: {properties.get('XZQMC')}")
         
         return True
         
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+索引选择测试脚本
+验证 index_strategy 模块的属性区分度、图层画像、索引类型选择与入库后按全表统计改用BRIN（不需要数据库）
+使用方法：python test_index_strategy.py
+"""
+
+import sys
+
+import numpy as np
+import pandas as pd
+import geopandas as gpd
+from shapely.geometry import LineString, Point
+
+from index_strategy import (BRIN_MIN_ROWS, attribute_selectivity, choose_index_plan, profile_layer,
+                            range_locality, revise_index_plan)
+from spatial_order import spatial_sort_keys
+
+
+def compare(name, actual, expected):
+    """比较一项结果，返回失败数"""
+    if actual == expected:
+        print(f"  ✓ {name}")
+        return 0
+    print(f"  ✗ {name}: {actual} != {expected}")
+    return 1
+
+
+def sample_profile(**values):
+    """构造图层画像，未指定的项取一般面图层的值"""
+    profile = {'geometry_types': ['Polygon'], 'point_only': False, 'feature_count': 1000,
+               'attribute_count': 2, 'attribute_selectivity': {'DM': 0.001, 'LX': 0.5},
+               'nested_attributes': []}
+    profile.update(values)
+    return profile
+
+
+def range_boxes(points, pages):
+    """按写入顺序每pages条要素为一个块范围，返回各块范围的外包框"""
+    boxes = np.array([point.bounds for point in points])
+    starts = np.arange(0, len(boxes), pages)
+    return np.column_stack([np.minimum.reduceat(boxes[:, 0], starts), np.minimum.reduceat(boxes[:, 1], starts),
+                            np.maximum.reduceat(boxes[:, 2], starts), np.maximum.reduceat(boxes[:, 3], starts)])
+
+
+def test_range_locality():
+    """块范围的空间局部性"""
+    failures = 0
+    rng = np.random.default_rng(0)
+    points = np.array([Point(x, y) for x, y in rng.uniform(0, 100, (20000, 2))], dtype=object)
+    ordered = points[np.argsort(spatial_sort_keys(points, 'hilbert'), kind='stable')]
+
+    failures += compare("随机顺序的局部性接近0", range_locality(range_boxes(points, 128)) < 0.1, True)
+    failures += compare("Hilbert排序后的局部性不低于0.9", range_locality(range_boxes(ordered, 128)) >= 0.9, True)
+    failures += compare("只有一个块范围时为0", range_locality(range_boxes(ordered[:100], 128)), 0.0)
+    same = np.array([[1, 1, 1, 1]] * 10 + [[np.nan] * 4])
+    failures += compare("所有要素重合时为1（忽略空范围）", range_locality(same), 1.0)
+    return failures
+
+
+def test_profile_layer():
+    """图层画像"""
+    failures = 0
+    failures += compare("区分度为各取值占比的平方和（忽略空值）",
+                        round(attribute_selectivity(pd.Series(['a', 'a', 'b', None, 'c', 'd'])), 4), 0.28)
+    failures += compare("全为空值时没有区分度", attribute_selectivity(pd.Series([None, None])), None)
+    failures += compare("对象与数组按JSON文本计数",
+                        attribute_selectivity(pd.Series([{'a': 1}, {'a': 1}, [1, 2], None], dtype=object)), 5 / 9)
+
+    gdf = gpd.GeoDataFrame({'name': ['a', 'b', 'c'], 'kind': ['x', 'x', 'x'],
+                            'tags': [[1], None, [1, 2]], 'empty': [None, None, None]},
+                           geometry=[Point(0, 0), None, Point(1, 1)], crs='EPSG:4326')
+    profile = profile_layer(gdf, feature_count=5000000)
+    failures += compare("纯点图层（忽略空几何）", (profile['geometry_types'], profile['point_only']),
+                        (['Point'], True))
+    failures += compare("要素总数与属性字段数", (profile['feature_count'], profile['attribute_count']),
+                        (5000000, 4))
+    failures += compare("各属性的区分度（全为空值的属性不计）", profile['attribute_selectivity'],
+                        {'name': 0.3333, 'kind': 1.0, 'tags': 0.5})
+    failures += compare("取值含对象或数组的属性", profile['nested_attributes'], ['tags'])
+    failures += compare("只统计写入properties列的属性",
+                        sorted(profile_layer(gdf, property_columns=['kind'])['attribute_selectivity']), ['kind'])
+
+    mixed = gpd.GeoDataFrame(geometry=[Point(0, 0), LineString([(0, 0), (1, 1)])], crs='EPSG:4326')
+    profile = profile_layer(mixed)
+    failures += compare("含线要素时不是纯点图层", (profile['point_only'], profile['attribute_count']), (False, 0))
+    return failures
+
+
+def test_choose_index_plan():
+    """索引类型选择"""
+    failures = 0
+    plan = choose_index_plan(sample_profile(feature_count=BRIN_MIN_ROWS * 10))
+    failures += compare("入库前不按样本选择BRIN", plan['geometry'], 'gist')
+    plan = choose_index_plan(sample_profile(geometry_types=['Point'], point_only=True))
+    failures += compare("纯点图层用SP-GiST", plan['geometry'], 'spgist')
+
+    failures += compare("有区分度高的属性时用jsonb_path_ops",
+                        choose_index_plan(sample_profile())['properties'], 'gin_path')
+    failures += compare("区分度高的属性含对象或数组时用GIN",
+                        choose_index_plan(sample_profile(nested_attributes=['DM', 'LX']))['properties'], 'gin')
+    failures += compare("只有区分度低的属性含数组时仍用jsonb_path_ops",
+                        choose_index_plan(sample_profile(nested_attributes=['LX']))['properties'], 'gin_path')
+    failures += compare("属性区分度均低时不建属性索引",
+                        choose_index_plan(sample_profile(attribute_selectivity={'LX': 0.5}))['properties'], 'none')
+    failures += compare("没有写入properties列的属性时不建属性索引",
+                        choose_index_plan(sample_profile(attribute_selectivity={}))['properties'], 'none')
+
+    plan = choose_index_plan(sample_profile(point_only=True), {'geometry': 'gist', 'properties': 'gin'})
+    failures += compare("配置覆盖自动选择", (plan['geometry'], plan['properties']), ('gist', 'gin'))
+    failures += compare("选择依据记录配置来源", plan['reason'], '几何索引由配置指定；属性索引由配置指定')
+
+    for overrides in ({'geometry': 'hash'}, {'properties': 'btree'}):
+        try:
+            choose_index_plan(sample_profile(), overrides)
+            failures += compare(f"不支持的索引类型抛出ValueError {overrides}", False, True)
+        except ValueError:
+            failures += compare(f"不支持的索引类型抛出ValueError {overrides}", True, True)
+    return failures
+
+
+def test_revise_index_plan():
+    """入库后按全表统计修订几何索引"""
+    failures = 0
+    plan = dict(choose_index_plan(sample_profile()), applied={'geometry': 'gist', 'properties': 'gin_path'})
+    revised = revise_index_plan(plan, {'row_count': BRIN_MIN_ROWS, 'locality': 0.95})
+    failures += compare("全表要素多且局部性高时改用BRIN",
+                        (revised['geometry'], revised['applied']['geometry']), ('brin', 'brin'))
+    failures += compare("全表统计记录在索引计划中", revised['table_statistics'],
+                        {'row_count': BRIN_MIN_ROWS, 'locality': 0.95})
+    revised = revise_index_plan(plan, {'row_count': BRIN_MIN_ROWS, 'locality': 0.5})
+    failures += compare("局部性低时保持原计划", revised['geometry'], 'gist')
+    revised = revise_index_plan(plan, {'row_count': BRIN_MIN_ROWS - 1, 'locality': None})
+    failures += compare("要素数不足时保持原计划", revised['geometry'], 'gist')
+    return failures
+
+
+def main():
+    """主函数"""
+    print("=" * 60)
+    print("索引选择测试（index_strategy）")
+    print("=" * 60)
+    failures = (test_range_locality() + test_profile_layer() + test_choose_index_plan()
+                + test_revise_index_plan())
+    print("=" * 60)
+    if failures:
+        print(f"❌ {failures} 项检查失败")
+        sys.exit(1)
+    print("✅ 全部检查通过")
+
+
+if __name__ == '__main__':
+    main()
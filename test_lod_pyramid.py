@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+多级化简几何测试脚本
+验证 lod_pyramid 模块各级都从原始几何化简、偏差不超过该级容差，以及按可接受误差选择伴随表（不需要数据库）
+使用方法：python test_lod_pyramid.py
+"""
+
+import sys
+
+import numpy as np
+import shapely
+from shapely.geometry import LineString, Polygon
+
+from lod_pyramid import _simplify_wkb, choose_lod_level, tile_tolerance
+
+
+def compare(name, actual, expected):
+    """比较一项结果，返回失败数"""
+    if actual == expected:
+        print(f"  ✓ {name}")
+        return 0
+    print(f"  ✗ {name}: {actual} != {expected}")
+    return 1
+
+
+def test_simplify_levels():
+    """各级化简几何"""
+    failures = 0
+    # 随机游走折线：在上一级结果上逐级化简时，第2级与直接从原始几何化简的结果不同
+    line = LineString(np.cumsum(np.random.default_rng(17).normal(0, 1, (30, 2)), axis=0))
+    ring = Polygon([(0, 0), (5, 0.1), (10, 0), (10, 10), (0, 10)])
+    geometries = [line, None, ring]
+    tolerances = [0.5, 1.0, 2.0]
+
+    levels, counts = _simplify_wkb([g.wkb if g is not None else None for g in geometries], tolerances)
+    failures += compare("各级结果与要素一一对应（空几何保持为空）",
+                        [len(level) for level in levels] + [levels[0][1]], [3, 3, 3, None])
+
+    expected = [shapely.simplify(np.array(geometries, dtype=object), tolerance, preserve_topology=True)
+                for tolerance in tolerances]
+    failures += compare("各级都从原始几何化简",
+                        all(shapely.equals_exact(shapely.from_wkb(level[0]), direct[0], 0)
+                            for level, direct in zip(levels, expected)), True)
+    failures += compare("各级与原始几何的偏差不超过该级容差",
+                        [line.hausdorff_distance(shapely.from_wkb(level[0])) <= tolerance
+                         for level, tolerance in zip(levels, tolerances)], [True, True, True])
+    failures += compare("顶点数随容差递减", counts.tolist() == sorted(counts.tolist(), reverse=True), True)
+    failures += compare("原始顶点数", int(counts[0]), len(line.coords) + len(ring.exterior.coords))
+    return failures
+
+
+def test_choose_lod_level():
+    """按可接受误差选择伴随表"""
+    failures = 0
+    levels = [('vector_data_lod1', 0.0001), ('vector_data_lod2', 0.001), ('vector_data_lod3', 0.01)]
+    failures += compare("选择容差不超过可接受误差的最粗一级", choose_lod_level(levels, 0.005), 'vector_data_lod2')
+    failures += compare("误差要求小于所有级别时读取原始几何", choose_lod_level(levels, 0.00005), None)
+    failures += compare("低缩放级别选择最粗一级", choose_lod_level(levels, tile_tolerance(2)), 'vector_data_lod3')
+    return failures
+
+
+def main():
+    """主函数"""
+    print("=" * 60)
+    print("多级化简几何测试（lod_pyramid）")
+    print("=" * 60)
+    failures = test_simplify_levels() + test_choose_lod_level()
+    print("=" * 60)
+    if failures:
+        print(f"❌ {failures} 项检查失败")
+        sys.exit(1)
+    print("✅ 全部检查通过")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+元数据增量统计测试脚本
+验证 metadata_accumulator.MetadataAccumulator 分块累计、合并与检查点状态恢复的结果与整体统计一致（不需要数据库）
+使用方法：python test_metadata_accumulator.py
+"""
+
+import json
+import os
+import sys
+import tempfile
+
+import numpy as np
+import geopandas as gpd
+from shapely.geometry import LineString, Point, Polygon
+
+from metadata_accumulator import MetadataAccumulator, widen_dtype
+
+
+def sample_chunks():
+    """两个分块：第二块的整数字段出现NaN（放宽为浮点），并含空几何与另一种几何类型"""
+    first = gpd.GeoDataFrame({
+        'OBJECTID': [1, 2, 3],
+        'XZQMC': ['济南市', None, '青岛市'],
+        'geometry': [Point(116, 36), Point(117, 37), Polygon([(118, 35), (119, 35), (119, 36)])],
+    }, crs='EPSG:4326')
+    second = gpd.GeoDataFrame({
+        'OBJECTID': [4.0, np.nan],
+        'XZQMC': ['烟台市', '威海市'],
+        'geometry': [LineString([(115, 34), (120, 38)]), None],
+    }, crs='EPSG:4326')
+    return first, second
+
+
+def compare(name, actual, expected):
+    """比较一项结果，返回失败数"""
+    if actual == expected:
+        print(f"  ✓ {name}")
+        return 0
+    print(f"  ✗ {name}: {actual} != {expected}")
+    return 1
+
+
+def test_accumulator(file_path):
+    """分块累计、合并与状态恢复"""
+    failures = 0
+    first, second = sample_chunks()
+    chunked = MetadataAccumulator(file_path, 'EPSG:4326', 'EPSG:4326')
+    chunked.update(first).update(second)
+    metadata = chunked.to_metadata()
+
+    failures += compare("要素数", metadata['feature_count'], 5)
+    failures += compare("边界框（忽略空几何）",
+                        [metadata[key] for key in ('bbox_minx', 'bbox_miny', 'bbox_maxx', 'bbox_maxy')],
+                        [115.0, 34.0, 120.0, 38.0])
+    failures += compare("几何类型（按出现顺序去重）", metadata['geometry_type'], 'Point,Polygon,LineString')
+    failures += compare("字段类型放宽", json.loads(metadata['properties_schema']),
+                        {'OBJECTID': 'float64', 'XZQMC': str(first['XZQMC'].dtype)})
+    failures += compare("空值数", json.loads(metadata['additional_info'])['null_counts'],
+                        {'OBJECTID': 1, 'XZQMC': 1})
+
+    left = MetadataAccumulator(file_path, 'EPSG:4326', 'EPSG:4326').update(first)
+    right = MetadataAccumulator(file_path, 'EPSG:4326', 'EPSG:4326').update(second)
+    failures += compare("合并两个累加器与顺序累计一致", left.merge(right).to_metadata(), metadata)
+
+    state = json.loads(json.dumps(MetadataAccumulator(file_path, 'EPSG:4326', 'EPSG:4326')
+                                  .update(first).to_state()))
+    restored = MetadataAccumulator.from_state(file_path, 'EPSG:4326', 'EPSG:4326', state)
+    failures += compare("检查点状态恢复后继续累计", restored.update(second).to_metadata(), metadata)
+
+    empty_state = MetadataAccumulator(file_path, 'EPSG:4326', 'EPSG:4326').to_state()
+    failures += compare("空累加器的边界框状态为null", empty_state['bbox'], [None, None, None, None])
+    return failures
+
+
+def test_widen_dtype():
+    """字段类型放宽规则"""
+    failures = 0
+    failures += compare("首个分块直接采用", widen_dtype(None, np.dtype('int64')), np.dtype('int64'))
+    failures += compare("int64与float64放宽为float64",
+                        widen_dtype(np.dtype('int64'), np.dtype('float64')), np.dtype('float64'))
+    failures += compare("int32与int64放宽为int64",
+                        widen_dtype(np.dtype('int32'), np.dtype('int64')), np.dtype('int64'))
+    failures += compare("数值与文本放宽为object",
+                        widen_dtype(np.dtype('int64'), np.dtype(object)), np.dtype(object))
+    return failures
+
+
+def main():
+    """主函数"""
+    print("=" * 60)
+    print("元数据增量统计测试（metadata_accumulator）")
+    print("=" * 60)
+    with tempfile.TemporaryDirectory() as directory:
+        # to_metadata读取文件大小，用一个临时文件代替数据文件
+        file_path = os.path.join(directory, 'sample.geojson')
+        with open(file_path, 'w', encoding='utf-8') as f:
+            f.write('{}')
+        failures = test_accumulator(file_path)
+    failures += test_widen_dtype()
+    print("=" * 60)
+    if failures:
+        print(f"❌ {failures} 项检查失败")
+        sys.exit(1)
+    print("✅ 全部检查通过")
+
+
+if __name__ == '__main__':
+    main()
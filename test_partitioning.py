@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+分区裁剪测试脚本
+验证 partitioning 模块的quadkey计算，以及范围查询的裁剪瓦片覆盖所有相交要素所在的子分区（不需要数据库）
+使用方法：python test_partitioning.py
+"""
+
+import math
+import sys
+
+import numpy as np
+from shapely.geometry import Point, box
+
+from partitioning import (MAX_PRUNE_CELLS, PartitionLayout, bbox_quadkeys, feature_quadkeys,
+                          max_half_extent, quadkeys)
+
+
+def compare(name, actual, expected):
+    """比较一项结果，返回失败数"""
+    if actual == expected:
+        print(f"  ✓ {name}")
+        return 0
+    print(f"  ✗ {name}: {actual} != {expected}")
+    return 1
+
+
+def reference_quadkey(lon, lat, level):
+    """逐点计算quadkey的参考实现（Web墨卡托瓦片行列号逐位交错）"""
+    n = 1 << level
+    lat = max(min(lat, 85.05112878), -85.05112878)
+    tx = min(max(int(math.floor((lon + 180.0) / 360.0 * n)), 0), n - 1)
+    rad = math.radians(lat)
+    ty = min(max(int(math.floor((1.0 - math.asinh(math.tan(rad)) / math.pi) / 2.0 * n)), 0), n - 1)
+    digits = []
+    for i in range(level, 0, -1):
+        mask = 1 << (i - 1)
+        digits.append(str((1 if tx & mask else 0) + (2 if ty & mask else 0)))
+    return ''.join(digits)
+
+
+def test_quadkeys():
+    """quadkey计算"""
+    failures = 0
+    failures += compare("层级1的四个象限", quadkeys([-90, 90, -90, 90], [45, 45, -45, -45], 1).tolist(),
+                        ['0', '1', '2', '3'])
+
+    rng = np.random.default_rng(0)
+    lon = rng.uniform(-180, 180, 500)
+    lat = rng.uniform(-89, 89, 500)
+    for level in (1, 6, 12):
+        failures += compare(f"层级{level}与参考实现一致", quadkeys(lon, lat, level).tolist(),
+                            [reference_quadkey(x, y, level) for x, y in zip(lon, lat)])
+
+    geometries = np.array([box(116, 36, 118, 38), Point(-100, 40), None], dtype=object)
+    failures += compare("要素按外包框中心取quadkey，空几何归入(0, 0)",
+                        feature_quadkeys(geometries).tolist(),
+                        [reference_quadkey(117, 37, 6), reference_quadkey(-100, 40, 6), reference_quadkey(0, 0, 6)])
+    return failures
+
+
+def test_bbox_quadkeys():
+    """范围查询的裁剪瓦片"""
+    failures = 0
+    failures += compare("最大外包框半边长（空几何不计）",
+                        max_half_extent(np.array([box(0, 0, 4, 1), Point(1, 1), None], dtype=object)), 2.0)
+    failures += compare("无要素时半边长为0", max_half_extent(np.array([], dtype=object)), 0.0)
+
+    # 随机要素与查询范围：所有与范围相交的要素所在瓦片都应在裁剪列表中
+    rng = np.random.default_rng(1)
+    centers = np.column_stack([rng.uniform(70, 135, 2000), rng.uniform(15, 55, 2000)])
+    sizes = rng.uniform(0, 3, (2000, 2))
+    geometries = np.array([box(x - w, y - h, x + w, y + h) for (x, y), (w, h) in zip(centers, sizes)],
+                          dtype=object)
+    cells = feature_quadkeys(geometries)
+    margin = max_half_extent(geometries)
+    missed = 0
+    for _ in range(50):
+        x, y = rng.uniform(70, 130), rng.uniform(15, 50)
+        query = box(x, y, x + rng.uniform(0, 5), y + rng.uniform(0, 5))
+        allowed = set(bbox_quadkeys(query.bounds, margin=margin))
+        missed += sum(1 for geometry, cell in zip(geometries, cells)
+                      if geometry.intersects(query) and cell not in allowed)
+    failures += compare("外扩最大半边长后覆盖所有相交要素的子分区", missed, 0)
+
+    point_cells = bbox_quadkeys((116.5, 38.0, 116.6, 38.1))
+    failures += compare("范围落在单个瓦片内", point_cells, [reference_quadkey(116.5, 38.0, 6)])
+    return failures
+
+
+def test_bbox_cells():
+    """分区布局的裁剪条件"""
+    failures = 0
+    bbox = (116, 36, 118, 38)
+    failures += compare("metadata_id分区不裁剪", PartitionLayout('metadata_id').bbox_cells(bbox), None)
+    failures += compare("未记录半边长时不裁剪", PartitionLayout('grid').bbox_cells(bbox), None)
+    layout = PartitionLayout('grid', grid_margin=0.5)
+    failures += compare("已记录半边长时按外扩范围裁剪", layout.bbox_cells(bbox),
+                        bbox_quadkeys(bbox, margin=0.5))
+    world = PartitionLayout('grid', grid_margin=0.0).bbox_cells((-180, -85, 180, 85))
+    failures += compare(f"覆盖超过{MAX_PRUNE_CELLS}个瓦片时不裁剪", world, None)
+    return failures
+
+
+def main():
+    """主函数"""
+    print("=" * 60)
+    print("分区裁剪测试（partitioning）")
+    print("=" * 60)
+    failures = test_quadkeys() + test_bbox_quadkeys() + test_bbox_cells()
+    print("=" * 60)
+    if failures:
+        print(f"❌ {failures} 项检查失败")
+        sys.exit(1)
+    print("✅ 全部检查通过")
+
+
+if __name__ == '__main__':
+    main()
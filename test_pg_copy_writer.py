@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+属性序列化测试脚本
+验证 pg_copy_writer.serialize_properties 的按列序列化结果与逐行 json.dumps 一致，
+以及二维与三维几何混合图层的几何列类型（不需要数据库）
+使用方法：python test_pg_copy_writer.py
+"""
+
+import json
+import struct
+import sys
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import geopandas as gpd
+from shapely.geometry import LineString, Point
+
+from pg_copy_writer import encode_geometries, postgis_geometry_type, serialize_properties, uniform_dimensions
+
+
+def compare(name, actual, expected):
+    """比较一项结果，返回失败数"""
+    if actual == expected:
+        print(f"  ✓ {name}")
+        return 0
+    print(f"  ✗ {name}: {actual} != {expected}")
+    return 1
+
+
+def row_by_row(attributes: pd.DataFrame):
+    """逐行序列化（对照实现）：缺失值为null，numpy标量与日期转换为Python值"""
+    rows = []
+    for row in attributes.astype(object).to_dict('records'):
+        properties = {}
+        for key, value in row.items():
+            if value is None or (not isinstance(value, (list, dict, str)) and pd.isna(value)):
+                properties[key] = None
+            elif isinstance(value, np.generic):
+                properties[key] = value.item()
+            elif isinstance(value, pd.Timestamp):
+                properties[key] = value.strftime('%Y-%m-%dT%H:%M:%S')
+            elif isinstance(value, date):
+                properties[key] = value.isoformat()
+            else:
+                properties[key] = value
+        rows.append(json.dumps(properties, ensure_ascii=False))
+    return rows
+
+
+def test_serialize_properties():
+    """各类型列的序列化结果"""
+    failures = 0
+    cases = {
+        '整数列': pd.DataFrame({'OBJECTID': [1, 2, 3]}),
+        '浮点列（含NaN）': pd.DataFrame({'mj': [1.5, np.nan, 0.1]}),
+        '可空整数列': pd.DataFrame({'DM': pd.array([370100, None, 370102], dtype='Int64')}),
+        '中文与转义字符': pd.DataFrame({'XZQMC': ['济南市', '引号"与\\反斜杠', None]}),
+        '布尔列': pd.DataFrame({'flag': [True, False, True]}),
+        '时间列（含NaT）': pd.DataFrame({'t': pd.to_datetime(['2024-01-02 03:04:05', None, '2024-12-31 00:00:00'])}),
+        '日期对象列': pd.DataFrame({'d': [date(2024, 1, 2), None, date(2024, 3, 4)]}),
+        '多列混合': pd.DataFrame({'a': [1, 2, 3], 'b': ['x', None, 'z'], 'c': [0.5, 1.0, np.nan]}),
+    }
+    for name, attributes in cases.items():
+        result = serialize_properties(attributes)
+        expected = row_by_row(attributes)
+        if result == expected:
+            print(f"  ✓ {name}")
+        else:
+            failures += 1
+            print(f"  ✗ {name}")
+            print(f"    按列: {result}")
+            print(f"    逐行: {expected}")
+
+    infinite = serialize_properties(pd.DataFrame({'v': [np.inf, -np.inf]}))
+    if infinite == ['{"v": Infinity}', '{"v": -Infinity}']:
+        print("  ✓ 无穷大编码为Infinity")
+    else:
+        failures += 1
+        print(f"  ✗ 无穷大编码: {infinite}")
+
+    empty = serialize_properties(pd.DataFrame(index=range(2)))
+    if empty == ['{}', '{}']:
+        print("  ✓ 无属性列时每行为{}")
+    else:
+        failures += 1
+        print(f"  ✗ 无属性列: {empty}")
+
+    parsed = [json.loads(row) for row in serialize_properties(cases['多列混合'])]
+    if list(parsed[0]) == ['a', 'b', 'c']:
+        print("  ✓ 键顺序与列顺序一致")
+    else:
+        failures += 1
+        print(f"  ✗ 键顺序: {list(parsed[0])}")
+    return failures
+
+
+def test_geometry_dimensions():
+    """几何列类型与二维、三维混合图层"""
+    failures = 0
+    flat = gpd.GeoSeries([Point(1, 2), Point(3, 4), None])
+    solid = gpd.GeoSeries([Point(1, 2, 3), Point(3, 4, 5)])
+    mixed = gpd.GeoDataFrame({'name': ['a', 'b', 'c']},
+                             geometry=[Point(1, 2), Point(3, 4, 5), None], crs='EPSG:4326')
+    lines = gpd.GeoSeries([LineString([(0, 0), (1, 1)]), Point(0, 0)])
+
+    results = {
+        '二维图层': postgis_geometry_type(flat),
+        '三维图层': postgis_geometry_type(solid),
+        '混合几何类型': postgis_geometry_type(lines),
+        '二维与三维混合（统一前）': postgis_geometry_type(mixed.geometry),
+    }
+    expected = {'二维图层': 'Point', '三维图层': 'PointZ', '混合几何类型': 'Geometry',
+                '二维与三维混合（统一前）': 'Point'}
+    for name in results:
+        failures += compare(f"几何列类型：{name}", results[name], expected[name])
+
+    uniform = uniform_dimensions(mixed)
+    failures += compare("混合图层统一升为三维后声明Z", postgis_geometry_type(uniform.geometry), 'PointZ')
+    # ISO/EWKB点类型码：三维为1001或带Z标志位（0x80000000）
+    type_codes = [struct.unpack('<I', wkb[1:5])[0] for wkb in encode_geometries(uniform.geometry) if wkb]
+    failures += compare("写入的几何均为三维", [bool(code & 0x80000000 or code > 1000) for code in type_codes],
+                        [True, True])
+    failures += compare("二维几何的Z取0、属性与坐标系不变",
+                        (uniform.geometry.iloc[0].z, list(uniform['name']), uniform.crs),
+                        (0.0, ['a', 'b', 'c'], mixed.crs))
+    failures += compare("非混合图层原样返回", uniform_dimensions(gpd.GeoDataFrame(geometry=flat)).geometry.has_z.any(),
+                        False)
+    return failures
+
+
+def main():
+    """主函数"""
+    print("=" * 60)
+    print("属性序列化与几何列类型测试（pg_copy_writer）")
+    print("=" * 60)
+    failures = test_serialize_properties() + test_geometry_dimensions()
+    print("=" * 60)
+    if failures:
+        print(f"❌ {failures} 项检查失败")
+        sys.exit(1)
+    print("✅ 全部检查通过")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+空间排序测试脚本
+验证 spatial_order 模块的Hilbert / Z-order编码与要素排序，以及经暂存表入库时分块附带的编码列（不需要数据库）
+使用方法：python test_spatial_order.py
+"""
+
+import os
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+import geopandas as gpd
+from shapely.geometry import Point, Polygon
+
+from spatial_order import crs_extent, hilbert_key, sort_geodataframe, spatial_sort_keys, zorder_key
+from typed_schema import BIGINT, build_typed_text_buffer
+from vector_to_postgis import STAGING_SORT_COLUMN, VectorToPostGIS
+
+
+def compare(name, actual, expected):
+    """比较一项结果，返回失败数"""
+    if actual == expected:
+        print(f"  ✓ {name}")
+        return 0
+    print(f"  ✗ {name}: {actual} != {expected}")
+    return 1
+
+
+def reference_hilbert(x, y, order):
+    """Hilbert曲线编码的逐点参考实现（xy2d）"""
+    n = 1 << order
+    key = 0
+    s = n // 2
+    while s > 0:
+        rx = 1 if x & s else 0
+        ry = 1 if y & s else 0
+        key += s * s * ((3 * rx) ^ ry)
+        if ry == 0:
+            if rx == 1:
+                x, y = n - 1 - x, n - 1 - y
+            x, y = y, x
+        s //= 2
+    return key
+
+
+def reference_zorder(x, y):
+    """Z-order编码的逐位参考实现（x占偶数位，y占奇数位）"""
+    key = 0
+    for bit in range(32):
+        key |= ((x >> bit) & 1) << (2 * bit) | ((y >> bit) & 1) << (2 * bit + 1)
+    return key
+
+
+def test_curve_keys():
+    """编码与参考实现一致，Hilbert曲线相邻编码的网格相邻"""
+    failures = 0
+    order = 4
+    side = 1 << order
+    ix, iy = np.meshgrid(np.arange(side, dtype=np.uint64), np.arange(side, dtype=np.uint64))
+    ix, iy = ix.ravel(), iy.ravel()
+
+    keys = hilbert_key(ix, iy, order)
+    expected = [reference_hilbert(int(x), int(y), order) for x, y in zip(ix, iy)]
+    failures += compare(f"Hilbert编码与参考实现一致（{side}×{side}网格）", keys.tolist(), expected)
+    failures += compare("Hilbert编码为网格的一一映射", sorted(keys.tolist()), list(range(side * side)))
+    path = np.argsort(keys)
+    steps = np.abs(np.diff(ix[path].astype(np.int64))) + np.abs(np.diff(iy[path].astype(np.int64)))
+    failures += compare("Hilbert曲线上相邻编码的网格相邻", set(steps.tolist()), {1})
+
+    rng = np.random.default_rng(0)
+    x = rng.integers(0, 1 << 16, 1000).astype(np.uint64)
+    y = rng.integers(0, 1 << 16, 1000).astype(np.uint64)
+    failures += compare("Z-order编码与参考实现一致", zorder_key(x, y).tolist(),
+                        [reference_zorder(int(a), int(b)) for a, b in zip(x, y)])
+    return failures
+
+
+def test_sorting():
+    """要素排序"""
+    failures = 0
+    points = [Point(0, 0), Point(10, 10), Point(0.1, 0.1), Point(10, 0), None, Point(9.9, 9.9)]
+    keys = spatial_sort_keys(np.array(points, dtype=object), 'hilbert')
+    failures += compare("空几何排在最后", int(keys[4]), int(np.iinfo(np.uint64).max))
+
+    gdf = gpd.GeoDataFrame({'name': list('abcdef')}, geometry=points, crs='EPSG:4326')
+    for method in ('hilbert', 'zorder'):
+        ordered = sort_geodataframe(gdf, method)
+        failures += compare(f"{method}排序为原数据的重排", sorted(ordered['name']), list('abcdef'))
+        position = {name: i for i, name in enumerate(ordered['name'])}
+        failures += compare(f"{method}排序后相近要素相邻",
+                            (abs(position['a'] - position['c']), abs(position['b'] - position['f'])), (1, 1))
+        failures += compare(f"{method}排序结果确定", list(sort_geodataframe(gdf, method)['name']),
+                            list(ordered['name']))
+
+    # 编码按外包框中心计算，默认范围为所有中心点的外包框
+    geometries = np.array([Polygon([(0, 0), (2, 0), (2, 2), (0, 2)]), Point(4, 4), Point(3, 1)], dtype=object)
+    whole = spatial_sort_keys(geometries, 'hilbert')
+    chunks = [spatial_sort_keys(chunk, 'hilbert', bounds=(1, 1, 4, 4)) for chunk in (geometries[:1], geometries[1:])]
+    failures += compare("固定编码范围时分块编码与整体编码一致", np.concatenate(chunks).tolist(), whole.tolist())
+
+    try:
+        spatial_sort_keys(np.array(points, dtype=object), 'peano')
+        failures += compare("不支持的排序方式抛出ValueError", False, True)
+    except ValueError:
+        failures += compare("不支持的排序方式抛出ValueError", True, True)
+    return failures
+
+
+def test_staging_sort_key():
+    """经暂存表入库：各分块附带的编码列与整体排序一致，编码随要素写入暂存表"""
+    failures = 0
+    points = [Point(116.9, 36.6), Point(117.1, 36.7), None, Point(116.95, 36.65), Point(120.3, 36.1)]
+    gdf = gpd.GeoDataFrame({'name': list('abcde')}, geometry=points, crs='EPSG:4326')
+    bounds = crs_extent('EPSG:4326')
+    with tempfile.TemporaryDirectory() as directory:
+        # 只创建数据库引擎，不连接数据库
+        tool = VectorToPostGIS({
+            'database': {'username': 'postgres', 'password': '', 'host': 'localhost', 'port': 5432,
+                         'database': 'gis_db'},
+            'log_dir': os.path.join(directory, 'logs'),
+            'log_level': 'ERROR',
+        })
+        chunks = [tool._with_sort_key(chunk, 'hilbert', bounds) for chunk in (gdf.iloc[:2], gdf.iloc[2:])]
+    staged = pd.concat(chunks)
+    failures += compare("空几何的编码为空值", staged[STAGING_SORT_COLUMN].isna().tolist(),
+                        [False, False, True, False, False])
+    # 与发布时的 ORDER BY 编码列一致：升序，空值排在最后
+    published = staged.sort_values(STAGING_SORT_COLUMN, na_position='last', kind='stable')
+    failures += compare("按编码列发布的顺序与整体排序一致", list(published['name']),
+                        list(sort_geodataframe(gdf, 'hilbert', bounds)['name']))
+
+    buffer = build_typed_text_buffer(['00'] * 3, chunks[1].drop(columns='geometry'),
+                                     {STAGING_SORT_COLUMN: BIGINT}, ['name'], 1)
+    rows = [line.split('\t') for line in buffer.getvalue().splitlines()]
+    failures += compare("编码列以bigint写入暂存表，属性写入properties",
+                        [(row[1], row[3]) for row in rows],
+                        [('{"name": "c"}', '\\N')]
+                        + [(f'{{"name": "{name}"}}', str(key)) for name, key in
+                           zip('de', chunks[1][STAGING_SORT_COLUMN].iloc[1:])])
+    return failures
+
+
+def test_crs_extent():
+    """坐标系适用范围"""
+    failures = 0
+    failures += compare("EPSG:4326的适用范围为全球", tuple(crs_extent('EPSG:4326')), (-180.0, -90.0, 180.0, 90.0))
+    minx, miny, maxx, maxy = crs_extent('EPSG:4527')
+    failures += compare("投影坐标系的适用范围转换到该坐标系",
+                        minx < 39500000 < maxx and 0 < miny < maxy, True)
+    return failures
+
+
+def main():
+    """主函数"""
+    print("=" * 60)
+    print("空间排序测试（spatial_order）")
+    print("=" * 60)
+    failures = test_curve_keys() + test_sorting() + test_staging_sort_key() + test_crs_extent()
+    print("=" * 60)
+    if failures:
+        print(f"❌ {failures} 项检查失败")
+        sys.exit(1)
+    print("✅ 全部检查通过")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+类型化列存储测试脚本
+验证 typed_schema 模块的列类型推断与COPY文本格式，以及分块入库时后续分块的值超出首个分块推断的列类型时
+放宽列类型或写入properties溢出列、不中断入库（不需要数据库，以记录SQL的连接代替）
+使用方法：python test_typed_schema.py
+"""
+
+import json
+import os
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+import geopandas as gpd
+from shapely.geometry import Point
+
+from typed_schema import BIGINT, DOUBLE, TEXT, build_typed_text_buffer, fits_column, infer_column_types
+from vector_to_postgis import VectorToPostGIS
+
+
+def compare(name, actual, expected):
+    """比较一项结果，返回失败数"""
+    if actual == expected:
+        print(f"  ✓ {name}")
+        return 0
+    print(f"  ✗ {name}: {actual} != {expected}")
+    return 1
+
+
+class RecordingConnection:
+    """代替数据库连接：记录执行的SQL，查询表结构时返回当前列类型"""
+
+    def __init__(self, column_types):
+        self.column_types = dict(column_types)
+        self.statements = []
+
+    def execute(self, statement, params=None):
+        sql = ' '.join(str(statement).split())
+        self.statements.append(sql)
+        if sql.startswith('ALTER TABLE') and 'ALTER COLUMN' in sql:
+            name = sql.split('ALTER COLUMN ')[1].split(' TYPE ')[0].strip('"')
+            self.column_types[name] = sql.split(' TYPE ')[1]
+        return self
+
+    def fetchall(self):
+        return list(self.column_types.items())
+
+
+def chunk(dm, mj, name, start):
+    """构造一个分块"""
+    return gpd.GeoDataFrame({'DM': dm, 'mj': mj, 'XZQMC': name},
+                            geometry=[Point(116 + i, 36) for i in range(start, start + len(name))],
+                            crs='EPSG:4326')
+
+
+def copy_rows(buffer):
+    """COPY文本格式的行拆分为字段"""
+    return [line.split('\t') for line in buffer.getvalue().splitlines()]
+
+
+def test_fits_column():
+    """后续分块的值能否写入已有列"""
+    failures = 0
+    cases = [
+        ('整数写入bigint', pd.Series([1, 2]), BIGINT, True),
+        ('含NaN的整数值浮点列写入bigint', pd.Series([1.0, np.nan]), BIGINT, True),
+        ('小数不能写入bigint', pd.Series([1.5, 2.0]), BIGINT, False),
+        ('超出范围的无符号整数不能写入bigint', pd.Series(np.array([2 ** 63], dtype='uint64')), BIGINT, False),
+        ('超出范围的整数值浮点不能写入bigint', pd.Series([1e19]), BIGINT, False),
+        ('文本不能写入bigint', pd.Series(['370100']), BIGINT, False),
+        ('整数写入double precision', pd.Series([1, 2]), DOUBLE, True),
+        ('任意类型写入text', pd.Series([1, 2]), TEXT, True),
+        ('混合类型不能写入text', pd.Series([1, 'a'], dtype=object), TEXT, False),
+        ('全为空值总能写入', pd.Series([None, None], dtype=object), BIGINT, True),
+    ]
+    for name, values, column_type, expected in cases:
+        failures += compare(name, fits_column(values, column_type), expected)
+    return failures
+
+
+def test_streaming_widen(tool):
+    """分块入库：第2块的值放宽列类型，第3块的值写入溢出列"""
+    failures = 0
+    chunks = [
+        chunk([370100, 370102], [10, 20], ['济南市', '历下区'], 0),
+        chunk([370103, 370104], [12.5, np.nan], ['市中区', '槐荫区'], 2),
+        chunk(['37010X', None], [7, 8], ['天桥区', '历城区'], 4),
+    ]
+    column_types = {name: column_type
+                    for name, column_type in infer_column_types(chunks[0].drop(columns='geometry')).items()}
+    failures += compare("首个分块推断的列类型", column_types, {'DM': BIGINT, 'mj': BIGINT, 'XZQMC': TEXT})
+
+    conn = RecordingConnection(column_types)
+    written = []
+    try:
+        for index, data in enumerate(chunks):
+            chunk_types = tool._fit_typed_columns(conn, ['typed_data'], data, column_types)
+            buffer = build_typed_text_buffer(['00'] * len(data), data.drop(columns='geometry'), chunk_types,
+                                             [col for col in data.columns if col not in chunk_types and col != 'geometry'],
+                                             index + 1)
+            written.append((chunk_types, copy_rows(buffer)))
+    except ValueError as e:
+        return failures + compare("后续分块不中断入库", str(e), None)
+    failures += compare("后续分块不中断入库", len(written), 3)
+
+    alters = [sql for sql in conn.statements if sql.startswith('ALTER TABLE')]
+    failures += compare("第2块含小数时bigint列放宽为double precision",
+                        alters, ['ALTER TABLE typed_data ALTER COLUMN "mj" TYPE double precision'])
+    failures += compare("放宽后的列类型计入column_types", column_types['mj'], DOUBLE)
+    failures += compare("第2块的小数写入类型化列", [row[4] for row in written[1][1]], ['12.5', '\\N'])
+
+    chunk_types, rows = written[2]
+    failures += compare("第3块中与列类型不一致的字段不写入类型化列", sorted(chunk_types), ['XZQMC', 'mj'])
+    failures += compare("不一致的值写入properties溢出列", [json.loads(row[1]) for row in rows],
+                        [{'DM': '37010X'}, {'DM': None}])
+    failures += compare("其余字段照常写入类型化列", [row[3:] for row in rows], [['7.0', '天桥区'], ['8.0', '历城区']])
+    return failures
+
+
+def main():
+    """主函数"""
+    print("=" * 60)
+    print("类型化列存储测试（typed_schema）")
+    print("=" * 60)
+    with tempfile.TemporaryDirectory() as directory:
+        # 只创建数据库引擎，不连接数据库
+        tool = VectorToPostGIS({
+            'database': {'username': 'postgres', 'password': '', 'host': 'localhost', 'port': 5432,
+                         'database': 'gis_db'},
+            'log_dir': os.path.join(directory, 'logs'),
+            'log_level': 'ERROR',
+        })
+        failures = test_fits_column() + test_streaming_widen(tool)
+    print("=" * 60)
+    if failures:
+        print(f"❌ {failures} 项检查失败")
+        sys.exit(1)
+    print("✅ 全部检查通过")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+导出格式测试脚本
+验证 vector_export 模块的格式判断、属性字段类型归类与取值整理、GeoParquet几何类型与ISO WKB编码（不需要数据库）
+使用方法：python test_vector_export.py
+"""
+
+import struct
+import sys
+
+import shapely
+from shapely.geometry import Point, Polygon
+
+from vector_export import _field_value, _geoparquet_geometry_type, detect_format, field_kind
+
+
+def compare(name, actual, expected):
+    """比较一项结果，返回失败数"""
+    if actual == expected:
+        print(f"  ✓ {name}")
+        return 0
+    print(f"  ✗ {name}: {actual} != {expected}")
+    return 1
+
+
+def test_detect_format():
+    """按扩展名判断导出格式"""
+    failures = 0
+    failures += compare("扩展名判断（不区分大小写）",
+                        [detect_format(path) for path in ('out.gpkg', 'out.FGB', 'out.parquet', 'a/b.geoparquet')],
+                        ['gpkg', 'fgb', 'parquet', 'parquet'])
+    try:
+        detect_format('out.shp')
+        failures += compare("不支持的扩展名抛出ValueError", False, True)
+    except ValueError:
+        failures += compare("不支持的扩展名抛出ValueError", True, True)
+    return failures
+
+
+def test_field_kind():
+    """属性字段类型归类与取值整理"""
+    failures = 0
+    cases = {
+        'integer': 'int', 'bigint': 'int', 'number': 'float', 'double precision': 'float',
+        'numeric': 'float', 'numeric(12,2)': 'float', 'boolean': 'bool', 'date': 'date',
+        'timestamp with time zone': 'datetime', 'text': 'str', 'jsonb': 'str', 'array': 'str',
+    }
+    failures += compare("属性类型归类", {t: field_kind(t) for t in cases}, cases)
+
+    failures += compare("空值保持为None", _field_value(None, 'int'), None)
+    failures += compare("字符串字段中的对象序列化为JSON",
+                        _field_value({'名称': '济南', 'dm': [1, 2]}, 'str'), '{"名称": "济南", "dm": [1, 2]}')
+    failures += compare("字符串字段中的数值转为文本", _field_value(370100, 'str'), '370100')
+    failures += compare("numeric文本转为浮点", _field_value('12.50', 'float'), 12.5)
+    failures += compare("其他类型原样保留", _field_value(7, 'int'), 7)
+    return failures
+
+
+def test_geoparquet():
+    """GeoParquet几何类型与ISO WKB"""
+    failures = 0
+    failures += compare("GeometryType转为GeoParquet几何类型",
+                        [_geoparquet_geometry_type(t) for t in
+                         ('POINT', 'MULTIPOLYGON', 'POLYGON Z', 'GEOMETRYCOLLECTION', 'MULTILINESTRING Z')],
+                        ['Point', 'MultiPolygon', 'Polygon Z', 'GeometryCollection', 'MultiLineString Z'])
+
+    # 与_ParquetWriter.write相同的编码方式：三维几何的类型码为1000+，不带EWKB的Z标志位
+    wkb = shapely.to_wkb([Point(1, 2, 3), Polygon([(0, 0, 1), (1, 0, 1), (1, 1, 1)]), Point(1, 2)],
+                         flavor='iso')
+    type_codes = [struct.unpack('<I' if data[0] == 1 else '>I', data[1:5])[0] for data in wkb]
+    failures += compare("ISO WKB几何类型码", type_codes, [1001, 1003, 1])
+    return failures
+
+
+def main():
+    """主函数"""
+    print("=" * 60)
+    print("导出格式测试（vector_export）")
+    print("=" * 60)
+    failures = test_detect_format() + test_field_kind() + test_geoparquet()
+    print("=" * 60)
+    if failures:
+        print(f"❌ {failures} 项检查失败")
+        sys.exit(1)
+    print("✅ 全部检查通过")
+
+
+if __name__ == '__main__':
+    main()
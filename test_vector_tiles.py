@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+矢量瓦片测试脚本
+验证 vector_tiles 模块的瓦片范围计算，以及typed存储模式的类型化列合并到瓦片要素属性中（不需要数据库）
+使用方法：python test_vector_tiles.py
+"""
+
+import sys
+
+from vector_query import properties_sql, typed_columns
+from vector_tiles import TileGenerator, tile_bbox, tile_range
+
+
+def compare(name, actual, expected):
+    """比较一项结果，返回失败数"""
+    if actual == expected:
+        print(f"  ✓ {name}")
+        return 0
+    print(f"  ✗ {name}: {actual} != {expected}")
+    return 1
+
+
+class CatalogResult:
+    """系统表查询结果"""
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    def __iter__(self):
+        return iter(self.rows)
+
+    def fetchall(self):
+        return list(self.rows)
+
+    def scalar(self):
+        return self.rows[0][0] if self.rows else None
+
+
+class CatalogConnection:
+    """代替数据库连接：pg_attribute查询返回给定的列名，其余系统表查询没有结果（非分区表、无伴随表）"""
+
+    def __init__(self, columns):
+        self.columns = columns
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, statement, params=None):
+        if 'pg_attribute a' in str(statement) and 'attgenerated' in str(statement):
+            return CatalogResult([(name,) for name in self.columns])
+        return CatalogResult([])
+
+
+class CatalogEngine:
+    """代替SQLAlchemy引擎"""
+
+    def __init__(self, columns):
+        self.columns = columns
+
+    def connect(self):
+        return CatalogConnection(self.columns)
+
+
+def test_tile_range():
+    """瓦片范围"""
+    failures = 0
+    covered = all(x_min <= x <= x_max and y_min <= y <= y_max
+                  for z, x, y in ((0, 0, 0), (6, 52, 24), (12, 3370, 1552))
+                  for x_min, x_max, y_min, y_max in [tile_range(tile_bbox(z, x, y, -0.01), z)])
+    failures += compare("瓦片经纬度范围内缩后只覆盖该瓦片", covered, True)
+    failures += compare("缓冲区外扩到相邻瓦片", tile_range(tile_bbox(6, 52, 24), 6, 0.1), (51, 53, 23, 25))
+    return failures
+
+
+def test_typed_tiles():
+    """typed存储模式的瓦片属性"""
+    failures = 0
+    columns = ['id', 'geometry', 'properties', 'metadata_id', 'created_at', 'updated_at',
+               'grid_cell', 'DM', 'XZQMC', 'mj']
+    failures += compare("类型化列不含固定列与分区键列",
+                        typed_columns(CatalogConnection(columns), 'typed_data'), ['DM', 'XZQMC', 'mj'])
+
+    generator = TileGenerator(CatalogEngine(columns), 'typed_data', cache=None, levels=[('typed_data_lod1', 0.01)])
+    typed_pairs = "jsonb_build_object('DM', {0}.\"DM\", 'XZQMC', {0}.\"XZQMC\", 'mj', {0}.\"mj\")"
+    base_sql = generator.tile_sql[(None, False)]
+    failures += compare("原始几何瓦片的属性合并类型化列",
+                        f"{properties_sql(generator.columns, 'g')} AS properties" in base_sql
+                        and typed_pairs.format('g') in base_sql, True)
+    lod_sql = generator.tile_sql[('typed_data_lod1', False)]
+    failures += compare("伴随表瓦片的类型化列取自矢量数据表",
+                        typed_pairs.format('t') in lod_sql and 'JOIN typed_data t ON t.id = g.id' in lod_sql, True)
+
+    jsonb_generator = TileGenerator(CatalogEngine(columns[:6]), 'jsonb_data', cache=None, levels=[])
+    jsonb_sql = jsonb_generator.tile_sql[(None, False)]
+    failures += compare("jsonb存储模式只输出properties",
+                        "COALESCE(g.properties, '{}'::jsonb) AS properties" in jsonb_sql
+                        and 'jsonb_build_object' not in jsonb_sql, True)
+
+    many = [f"f{i}" for i in range(120)]
+    failures += compare("类型化列按每50列一次jsonb_build_object合并（参数上限100）",
+                        properties_sql(many).count('jsonb_build_object('), 3)
+    return failures
+
+
+def main():
+    """主函数"""
+    print("=" * 60)
+    print("矢量瓦片测试（vector_tiles）")
+    print("=" * 60)
+    failures = test_tile_range() + test_typed_tiles()
+    print("=" * 60)
+    if failures:
+        print(f"❌ {failures} 项检查失败")
+        sys.exit(1)
+    print("✅ 全部检查通过")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+类型化列存储模式
+根据GeoDataFrame的字段类型推断PostgreSQL原生列类型（数值、文本、日期、布尔），
+属性写入独立的类型化列，无法映射的字段写入JSONB溢出列（properties）；
+数据以 COPY ... FROM STDIN 文本格式写入
+"""
+
+import datetime
+import io
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from pg_copy_writer import serialize_properties
+
+# 支持的存储模式：jsonb为全部属性写入properties，typed为写入类型化列
+STORAGE_MODES = ('jsonb', 'typed')
+
+# 矢量数据表的固定列，同名字段不能映射为类型化列
+RESERVED_COLUMNS = ('id', 'geometry', 'properties', 'metadata_id', 'created_at', 'updated_at')
+
+# PostgreSQL标识符最大字节数
+_MAX_IDENTIFIER_BYTES = 63
+
+# bigint列的取值范围
+_BIGINT_MIN = -2 ** 63
+_BIGINT_MAX = 2 ** 63 - 1
+
+# 类型名与PostgreSQL format_type()的输出一致，便于与已有列比较
+BIGINT = 'bigint'
+DOUBLE = 'double precision'
+TEXT = 'text'
+BOOLEAN = 'boolean'
+DATE = 'date'
+TIMESTAMP = 'timestamp without time zone'
+TIMESTAMPTZ = 'timestamp with time zone'
+
+# 热点属性支持的目标类型（从文本的转换为IMMUTABLE，可用于表达式索引与生成列）
+HOT_PROPERTY_TYPES = ('bigint', 'integer', 'double precision', 'numeric', 'text', 'boolean')
+
+# 热点属性的索引方式：index为btree表达式索引，generated为存储生成列 + btree索引
+HOT_PROPERTY_MODES = ('index', 'generated')
+
+# (已有列类型, 新数据类型)：新数据可直接写入已有列
+_COMPATIBLE_TYPES = {
+    (DOUBLE, BIGINT),
+    (TIMESTAMP, DATE),
+    (TIMESTAMPTZ, DATE),
+} | {(TEXT, t) for t in (BIGINT, DOUBLE, BOOLEAN, DATE, TIMESTAMP, TIMESTAMPTZ)}
+
+
+def quote_identifier(name: str) -> str:
+    """以双引号引用标识符，保留字段名的大小写与中文"""
+    return '"' + name.replace('"', '""') + '"'
+
+
+def sql_literal(value: str) -> str:
+    """字符串字面量（单引号转义）"""
+    return "'" + value.replace("'", "''") + "'"
+
+
+def property_expression(name: str, column_type: str) -> str:
+    """JSONB属性的类型转换表达式，与 CAST(properties->>'name' AS type) 等价"""
+    expression = f"(properties ->> {sql_literal(name)})"
+    if column_type == TEXT:
+        return expression
+    return f"({expression}::{column_type})"
+
+
+def _infer_object_type(values: pd.Series) -> Optional[str]:
+    """object列：全部非空值类型一致时才映射为类型化列"""
+    non_null = values.dropna()
+    if non_null.empty:
+        return TEXT
+    types = set(map(type, non_null.tolist()))
+    if types <= {str}:
+        return TEXT
+    if types <= {bool, np.bool_}:
+        return BOOLEAN
+    if all(issubclass(t, datetime.datetime) for t in types):
+        return TIMESTAMP
+    if all(issubclass(t, datetime.date) and not issubclass(t, datetime.datetime) for t in types):
+        return DATE
+    return None
+
+
+def infer_column_type(values: pd.Series) -> Optional[str]:
+    """
+    根据字段类型推断PostgreSQL列类型
+
+    Returns:
+        列类型，无法映射时（如混合类型、列表、字典）返回None
+    """
+    dtype = values.dtype
+    if pd.api.types.is_bool_dtype(dtype):
+        return BOOLEAN
+    if pd.api.types.is_integer_dtype(dtype):
+        return BIGINT
+    if pd.api.types.is_float_dtype(dtype):
+        return DOUBLE
+    if isinstance(dtype, pd.DatetimeTZDtype):
+        return TIMESTAMPTZ
+    if pd.api.types.is_datetime64_dtype(dtype):
+        return TIMESTAMP
+    if pd.api.types.is_string_dtype(dtype) and not pd.api.types.is_object_dtype(dtype):
+        return TEXT
+    if pd.api.types.is_object_dtype(dtype):
+        return _infer_object_type(values)
+    return None
+
+
+def infer_column_types(attributes: pd.DataFrame) -> Dict[str, Optional[str]]:
+    """
+    推断属性表每个字段的列类型
+
+    与固定列同名、或名称超过标识符长度上限的字段不映射（返回None）
+    """
+    column_types = {}
+    for col in attributes.columns:
+        name = str(col)
+        if name.lower() in RESERVED_COLUMNS or len(name.encode('utf-8')) > _MAX_IDENTIFIER_BYTES:
+            column_types[name] = None
+        else:
+            column_types[name] = infer_column_type(attributes[col])
+    return column_types
+
+
+def is_compatible(existing_type: str, new_type: str) -> bool:
+    """新数据类型能否直接写入已有列"""
+    return existing_type == new_type or (existing_type, new_type) in _COMPATIBLE_TYPES
+
+
+def fits_column(values: pd.Series, column_type: str) -> bool:
+    """
+    一列值能否写入已有类型的列（分块入库时列类型按首个分块推断，后续分块的值可能超出该类型）
+
+    bigint列要求值为整数（浮点列中为整数值）且不超出bigint范围；全为空值时总能写入
+    """
+    if values.isna().all():
+        return True
+    new_type = infer_column_type(values)
+    if column_type == BIGINT and new_type in (BIGINT, DOUBLE):
+        array = values.dropna().to_numpy()
+        if array.dtype.kind == 'f':
+            return bool(np.all(np.mod(array, 1) == 0) and np.all(np.abs(array) < 2.0 ** 63))
+        return _BIGINT_MIN <= int(array.min()) and int(array.max()) <= _BIGINT_MAX
+    return new_type is not None and is_compatible(column_type, new_type)
+
+
+def _escape_text(value: str) -> str:
+    """COPY文本格式转义：反斜杠、制表符、换行、回车"""
+    return (value.replace('\\', '\\\\').replace('\t', '\\t')
+            .replace('\n', '\\n').replace('\r', '\\r'))
+
+
+def _format_column(values: pd.Series, column_type: str) -> List[Optional[str]]:
+    """将一列值格式化为COPY文本格式的字段（None表示NULL）"""
+    missing = values.isna().to_numpy()
+
+    if column_type == BIGINT:
+        if pd.api.types.is_float_dtype(values.dtype):
+            array = values.to_numpy(dtype='float64')
+            if not np.all(np.mod(array[~missing], 1) == 0):
+                raise ValueError(f"字段 {values.name} 含有小数，无法写入bigint列")
+        fields = [str(int(v)) for v in values.to_numpy(dtype=object)[~missing].tolist()]
+    elif column_type == DOUBLE:
+        array = values.to_numpy(dtype='float64')[~missing]
+        fields = ['Infinity' if v == np.inf else '-Infinity' if v == -np.inf else repr(v)
+                  for v in array.tolist()]
+    elif column_type == BOOLEAN:
+        fields = ['t' if v else 'f' for v in values.to_numpy(dtype=object)[~missing].tolist()]
+    elif column_type in (TIMESTAMP, TIMESTAMPTZ, DATE) and (
+            pd.api.types.is_datetime64_any_dtype(values.dtype)):
+        pattern = '%Y-%m-%d' if column_type == DATE else '%Y-%m-%d %H:%M:%S.%f'
+        if isinstance(values.dtype, pd.DatetimeTZDtype):
+            pattern += '%z'
+        fields = values[~missing].dt.strftime(pattern).tolist()
+    elif column_type in (TIMESTAMP, TIMESTAMPTZ, DATE):
+        fields = [v.isoformat() for v in values.to_numpy(dtype=object)[~missing].tolist()]
+    else:
+        fields = [_escape_text(v if isinstance(v, str) else str(v))
+                  for v in values.to_numpy(dtype=object)[~missing].tolist()]
+
+    result: List[Optional[str]] = [None] * len(values)
+    for i, field in zip(np.flatnonzero(~missing), fields):
+        result[i] = field
+    return result
+
+
+def build_typed_text_buffer(geometries_hex: Sequence[Optional[str]], attributes: pd.DataFrame,
+                            column_types: Dict[str, str], overflow_columns: Sequence[str],
+                            metadata_id: int) -> io.StringIO:
+    """
+    构建类型化列的COPY文本格式数据缓冲区
+
+    列顺序与typed_copy_columns一致：geometry, properties, metadata_id, 类型化列...
+
+    Args:
+        geometries_hex: 十六进制WKB字符串列表
+        attributes: 不含几何列的属性DataFrame
+        column_types: 类型化字段及其列类型
+        overflow_columns: 写入properties溢出列的字段
+        metadata_id: 元数据ID
+
+    Returns:
+        已定位到开头的StringIO
+    """
+    row_count = len(attributes)
+    if overflow_columns:
+        overflow = [_escape_text(v) for v in serialize_properties(attributes[list(overflow_columns)])]
+    else:
+        overflow = [None] * row_count
+
+    columns = [list(geometries_hex), overflow, [str(metadata_id)] * row_count]
+    columns.extend(_format_column(attributes[name], column_type)
+                   for name, column_type in column_types.items())
+
+    buffer = io.StringIO()
+    for row in zip(*columns):
+        buffer.write('\t'.join('\\N' if field is None else field for field in row))
+        buffer.write('\n')
+    buffer.seek(0)
+    return buffer
+
+
+def typed_copy_columns(column_types: Dict[str, str]) -> List[str]:
+    """类型化存储模式的COPY写入列"""
+    return ['geometry', 'properties', 'metadata_id'] + [quote_identifier(name) for name in column_types]
@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+矢量数据表流式导出
+以服务端游标按批读取EWKB几何与属性（vector_query.VectorQuery），逐批写入：
+- GeoPackage：单次写入会话，关闭时由GDAL建立R-tree空间索引
+- FlatGeobuf：单次写入会话，关闭时由GDAL建立打包的Hilbert R-tree索引
+- GeoParquet：pyarrow ParquetWriter逐批写入行组，几何为ISO WKB（需要安装pyarrow）
+字段结构在导出前由服务端聚合得到，客户端内存只与批大小有关
+使用方法：python vector_export.py --vector_table nature_reserve_data --output exports/nature_reserve.gpkg
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+import fiona
+import shapely
+from shapely.geometry import mapping
+from sqlalchemy import create_engine
+
+from crs_cache import get_crs
+from vector_query import DEFAULT_ITERSIZE, VectorQuery
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # 未安装pyarrow时不支持GeoParquet
+    pa = None
+    pq = None
+
+# 支持的导出格式及对应的文件扩展名
+EXPORT_FORMATS = {
+    'gpkg': ('.gpkg',),
+    'fgb': ('.fgb',),
+    'parquet': ('.parquet', '.geoparquet'),
+}
+
+# 数据表几何列的坐标系
+EXPORT_CRS = 'EPSG:4326'
+
+# 导出要素的源表id与元数据ID字段
+ID_FIELDS = ('feature_id', 'metadata_id')
+
+# 每写出多少批记录一次进度
+_PROGRESS_BATCHES = 20
+
+# 属性类型到导出字段类型（其余类型按字符串导出）
+_FIELD_KINDS = {
+    'integer': 'int', 'bigint': 'int', 'smallint': 'int',
+    'number': 'float', 'double precision': 'float', 'real': 'float', 'numeric': 'float',
+    'boolean': 'bool', 'date': 'date',
+    'timestamp without time zone': 'datetime', 'timestamp with time zone': 'datetime',
+}
+
+# GeometryType() 到fiona几何类型
+_FIONA_GEOMETRY_TYPES = {
+    'POINT': 'Point', 'MULTIPOINT': 'MultiPoint', 'LINESTRING': 'LineString',
+    'MULTILINESTRING': 'MultiLineString', 'POLYGON': 'Polygon', 'MULTIPOLYGON': 'MultiPolygon',
+    'GEOMETRYCOLLECTION': 'GeometryCollection',
+}
+
+
+def detect_format(path: str) -> str:
+    """按扩展名判断导出格式"""
+    extension = os.path.splitext(path)[1].lower()
+    for export_format, extensions in EXPORT_FORMATS.items():
+        if extension in extensions:
+            return export_format
+    raise ValueError(f"无法由扩展名判断导出格式: {path}，可选: {', '.join(EXPORT_FORMATS)}")
+
+
+def field_kind(property_type: str) -> str:
+    """属性类型归类为 int / float / bool / date / datetime / str（其余类型按字符串导出）"""
+    if property_type.startswith('numeric'):
+        return 'float'
+    return _FIELD_KINDS.get(property_type, 'str')
+
+
+def _field_value(value: Any, kind: str) -> Any:
+    """按字段类型整理属性值：字符串字段中的对象、数组与其他类型的值序列化为文本"""
+    if value is None:
+        return None
+    if kind == 'str' and not isinstance(value, str):
+        return json.dumps(value, ensure_ascii=False) if isinstance(value, (dict, list)) else str(value)
+    if kind == 'float' and isinstance(value, str):
+        return float(value)
+    return value
+
+
+def _geoparquet_geometry_type(geometry_type: str) -> str:
+    """GeometryType（三维几何带" Z"后缀，如 POLYGON Z）转为GeoParquet几何类型（如 Polygon Z）"""
+    base, _, z = geometry_type.partition(' ')
+    name = _FIONA_GEOMETRY_TYPES.get(base, base.title())
+    return f"{name} Z" if z else name
+
+
+class _FionaWriter:
+    """GeoPackage / FlatGeobuf写入：整个导出在同一个OGR会话中完成，空间索引在关闭时建立"""
+
+    def __init__(self, path: str, export_format: str, layer: str,
+                 fields: Dict[str, str], geometry_type: str):
+        if export_format == 'fgb':
+            # FlatGeobuf不支持日期字段，按文本写出
+            fields = {name: 'str' if kind == 'date' else kind for name, kind in fields.items()}
+        self.fields = fields
+        properties = {name: 'int64' if kind == 'int' else kind for name, kind in fields.items()}
+        schema = {'geometry': geometry_type, 'properties': properties}
+        if export_format == 'gpkg':
+            self.collection = fiona.open(path, 'w', driver='GPKG', layer=layer, schema=schema,
+                                         crs=EXPORT_CRS, SPATIAL_INDEX='YES')
+        else:
+            self.collection = fiona.open(path, 'w', driver='FlatGeobuf', schema=schema,
+                                         crs=EXPORT_CRS, SPATIAL_INDEX='YES')
+
+    def write(self, features: List[Dict[str, Any]], geometries: Sequence):
+        records = []
+        for feature, geometry in zip(features, geometries):
+            properties = feature['properties']
+            records.append({
+                'geometry': mapping(geometry) if geometry is not None else None,
+                'properties': {name: _field_value(properties.get(name), kind)
+                               for name, kind in self.fields.items()},
+            })
+        self.collection.writerecords(records)
+
+    def close(self):
+        self.collection.close()
+
+
+class _ParquetWriter:
+    """GeoParquet写入：每批写为一个行组，几何为WKB列，文件级元数据按GeoParquet 1.0写入geo键"""
+
+    _ARROW_TYPES = {'int': 'int64', 'float': 'float64', 'bool': 'bool_'}
+
+    def __init__(self, path: str, fields: Dict[str, str], geometry_types: List[str]):
+        if pa is None:
+            raise ImportError("导出GeoParquet需要安装pyarrow")
+        self.fields = fields
+        arrow_fields = [pa.field(name, getattr(pa, self._ARROW_TYPES.get(kind, 'string'))())
+                        for name, kind in fields.items()]
+        arrow_fields.append(pa.field('geometry', pa.binary()))
+        geo = {
+            'version': '1.0.0',
+            'primary_column': 'geometry',
+            'columns': {'geometry': {
+                'encoding': 'WKB',
+                'geometry_types': [_geoparquet_geometry_type(t) for t in geometry_types],
+                'crs': get_crs(EXPORT_CRS).to_json_dict(),
+            }},
+        }
+        self.schema = pa.schema(arrow_fields, metadata={'geo': json.dumps(geo)})
+        self.writer = pq.ParquetWriter(path, self.schema)
+
+    def write(self, features: List[Dict[str, Any]], geometries: Sequence):
+        columns = {
+            name: [_field_value(feature['properties'].get(name), 'str' if kind in ('date', 'datetime') else kind)
+                   for feature in features]
+            for name, kind in self.fields.items()
+        }
+        # GeoParquet要求ISO WKB（三维几何的类型码为1000+，而非EWKB的Z标志位）
+        columns['geometry'] = list(shapely.to_wkb(geometries, flavor='iso'))
+        self.writer.write_table(pa.Table.from_pydict(columns, schema=self.schema))
+
+    def close(self):
+        self.writer.close()
+
+
+def export_features(query: VectorQuery, path: str, export_format: Optional[str] = None,
+                    layer: Optional[str] = None, itersize: int = DEFAULT_ITERSIZE,
+                    logger: Optional[logging.Logger] = None) -> Dict[str, Any]:
+    """
+    将查询结果流式导出到文件
+
+    Args:
+        query: 以output='wkb'构造的VectorQuery（过滤条件决定导出范围）
+        path: 输出文件路径（已存在时覆盖）
+        export_format: gpkg / fgb / parquet，默认按扩展名判断
+        layer: GeoPackage图层名，默认为表名
+        itersize: 每批读取与写入的要素数
+        logger: 日志记录器
+
+    Returns:
+        features / seconds / features_per_second / bytes / format
+    """
+    if query.output != 'wkb':
+        raise ValueError("导出需要以output='wkb'查询")
+    export_format = export_format or detect_format(path)
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"不支持的导出格式: {export_format}，可选: {', '.join(EXPORT_FORMATS)}")
+    logger = logger or logging.getLogger(__name__)
+
+    start = time.perf_counter()
+    property_types = query.property_types()
+    fields = {name: 'int' for name in ID_FIELDS}
+    for name, property_type in property_types.items():
+        if name in fields:
+            logger.warning(f"属性 {name} 与导出的ID字段同名，已忽略")
+            continue
+        fields[name] = field_kind(property_type)
+    geometry_types = query.geometry_types()
+    geometry_type = (_FIONA_GEOMETRY_TYPES.get(geometry_types[0], 'Unknown')
+                     if len(geometry_types) == 1 else 'Unknown')
+    logger.info(f"字段结构: {len(fields)} 个字段，几何类型 {geometry_types or '无'}，"
+                f"耗时 {time.perf_counter() - start:.2f}s")
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    if os.path.exists(path):
+        os.remove(path)
+
+    if export_format == 'parquet':
+        writer = _ParquetWriter(path, fields, query.geometry_types(with_z=True))
+    else:
+        writer = _FionaWriter(path, export_format, layer or query.vector_table, fields, geometry_type)
+
+    count = 0
+    try:
+        for i, batch in enumerate(query.iter_batches(itersize), 1):
+            geometries = shapely.from_wkb([feature['geometry'] for feature in batch])
+            for feature in batch:
+                feature['properties'] = dict(feature['properties'], feature_id=feature['id'],
+                                             metadata_id=feature['metadata_id'])
+            writer.write(batch, geometries)
+            count += len(batch)
+            if i % _PROGRESS_BATCHES == 0:
+                elapsed = time.perf_counter() - start
+                logger.info(f"已导出 {count} 个要素，{count / elapsed:.0f} 要素/秒")
+    finally:
+        writer.close()
+
+    elapsed = time.perf_counter() - start
+    stats = {
+        'format': export_format,
+        'features': count,
+        'seconds': round(elapsed, 2),
+        'features_per_second': round(count / elapsed, 1) if elapsed > 0 else None,
+        'bytes': os.path.getsize(path),
+    }
+    logger.info(f"导出完成: {stats}")
+    return stats
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='矢量数据表流式导出')
+    parser.add_argument('--vector_table', required=True, help='矢量数据表名')
+    parser.add_argument('--output', required=True, help='输出文件（.gpkg / .fgb / .parquet）')
+    parser.add_argument('--format', default=None, choices=list(EXPORT_FORMATS), help='导出格式，默认按扩展名判断')
+    parser.add_argument('--metadata_id', default=None, type=int, help='只导出该次入库的要素')
+    parser.add_argument('--bbox', nargs=4, type=float, metavar=('MINX', 'MINY', 'MAXX', 'MAXY'),
+                        help='只导出与范围相交的要素')
+    parser.add_argument('--layer', default=None, help='GeoPackage图层名，默认为表名')
+    parser.add_argument('--itersize', default=DEFAULT_ITERSIZE, type=int, help='每批读取与写入的要素数')
+    parser.add_argument('--config', default='config.json', help='数据库配置文件')
+    args = parser.parse_args()
+
+    try:
+        with open(args.config, 'r', encoding='utf-8') as f:
+            db_config = json.load(f)['database']
+    except Exception as e:
+        print(f"配置文件加载失败: {e}")
+        sys.exit(1)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    engine = create_engine(
+        f"postgresql://{db_config['username']}:{db_config['password']}"
+        f"@{db_config['host']}:{db_config['port']}/{db_config['database']}"
+    )
+    query = VectorQuery(engine, args.vector_table, bbox=args.bbox, metadata_id=args.metadata_id, output='wkb')
+    try:
+        stats = export_features(query, args.output, args.format, args.layer, args.itersize)
+    except (ValueError, ImportError) as e:
+        print(f"导出失败: {e}")
+        sys.exit(1)
+    print(f"导出完成: {stats['features']} 个要素，{stats['bytes'] / 1024 / 1024:.1f} MB，"
+          f"耗时 {stats['seconds']}s（{stats['features_per_second']} 要素/秒）")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,416 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+矢量数据表流式查询
+以服务端命名游标（psycopg2 named cursor）分批读取结果，或按id做键集分页（WHERE id > 上一页末尾id），
+客户端内存与结果总量无关；范围过滤使用几何列的空间索引，属性等值过滤使用properties的GIN索引（@>），
+结果输出为GeoJSON要素或WKB几何
+使用方法：python vector_query.py --vector_table nature_reserve_data --bbox 116 35 118 37 --output result.geojson
+"""
+
+import argparse
+import json
+import sys
+import time
+from typing import Any, Dict, Iterator, List, Optional, Sequence, TextIO, Tuple
+
+from sqlalchemy import create_engine, text
+
+from typed_schema import RESERVED_COLUMNS, quote_identifier, sql_literal
+from partitioning import GRID_COLUMN, PartitionLayout
+
+# 支持的几何输出格式：geojson为GeoJSON要素字典，wkb为EWKB字节串
+OUTPUT_FORMATS = ('geojson', 'wkb')
+
+# 键集分页的默认每页条数
+DEFAULT_PAGE_SIZE = 1000
+
+# 服务端游标每次取回的行数
+DEFAULT_ITERSIZE = 5000
+
+# jsonb_build_object的参数个数上限为100，每次最多合并50个类型化列
+_JSONB_BUILD_PAIRS = 50
+
+
+def typed_columns(conn, vector_table: str) -> List[str]:
+    """
+    矢量数据表的类型化列（typed存储模式），按列顺序排列
+
+    固定列、grid分区键列与由properties派生的生成列不计入
+    """
+    rows = conn.execute(text("""
+        SELECT a.attname FROM pg_attribute a
+        WHERE a.attrelid = to_regclass(:table) AND a.attnum > 0
+          AND NOT a.attisdropped AND a.attgenerated = ''
+        ORDER BY a.attnum
+    """), {'table': vector_table})
+    return [row[0] for row in rows if row[0] not in RESERVED_COLUMNS and row[0] != GRID_COLUMN]
+
+
+def properties_sql(columns: Sequence[str], alias: str = 't') -> str:
+    """
+    properties与类型化列合并为一个jsonb对象的SQL表达式
+
+    properties中的同名键优先：分块入库时值与列类型不一致的要素，该字段写入properties、类型化列为NULL
+
+    Args:
+        columns: 类型化列名（typed_columns的结果）
+        alias: 矢量数据表的别名
+
+    Returns:
+        SQL表达式，没有类型化列时即为properties本身
+    """
+    parts = []
+    for start in range(0, len(columns), _JSONB_BUILD_PAIRS):
+        pairs = ', '.join(f"{sql_literal(name)}, {alias}.{quote_identifier(name)}"
+                          for name in columns[start:start + _JSONB_BUILD_PAIRS])
+        parts.append(f"jsonb_build_object({pairs})")
+    parts.append(f"COALESCE({alias}.properties, '{{}}'::jsonb)")
+    return ' || '.join(parts)
+
+
+class VectorQuery:
+    """矢量数据表查询：过滤条件在构造时确定，结果以流式迭代或键集分页读取"""
+
+    def __init__(self, engine, vector_table: str,
+                 bbox: Optional[Sequence[float]] = None, bbox_srid: int = 4326,
+                 attributes: Optional[Dict[str, Any]] = None,
+                 metadata_id: Optional[int] = None,
+                 where: Optional[str] = None, params: Optional[Dict[str, Any]] = None,
+                 output: str = 'geojson',
+                 order_by: Optional[str] = None, descending: bool = False):
+        """
+        Args:
+            engine: SQLAlchemy引擎
+            vector_table: 矢量数据表名
+            bbox: 范围过滤 (minx, miny, maxx, maxy)，按外包框相交（&&）过滤，
+                  grid分区表另按分区键裁剪子分区
+            bbox_srid: bbox的坐标系
+            attributes: 属性等值过滤，如 {"XZQMC": "济南市"}；类型化列直接比较，其余以 properties @> 过滤
+            metadata_id: 只查询该次入库的要素
+            where: 附加的SQL条件（表别名为t），如 "(t.properties ->> 'mj')::double precision > :min_mj"
+            params: where中的绑定参数
+            output: 几何输出格式，geojson / wkb
+            order_by: 排序键的SQL表达式（表别名为t），如 "CAST(t.properties ->> 'mj' AS FLOAT)"；
+                      结果按 (排序键, id) 排序，排序键为NULL的要素排在最后；默认按id排序
+            descending: 是否降序
+        """
+        if output not in OUTPUT_FORMATS:
+            raise ValueError(f"不支持的输出格式: {output}，可选: {', '.join(OUTPUT_FORMATS)}")
+        self.engine = engine
+        self.vector_table = vector_table
+        self.output = output
+        self.order_by = order_by
+        self.descending = descending
+
+        with engine.connect() as conn:
+            self.columns = typed_columns(conn, vector_table)
+            # grid分区表：范围过滤附加分区键条件，只扫描可能命中的子分区
+            grid_cells = None
+            layout = PartitionLayout.detect(conn, vector_table) if bbox is not None else None
+            if layout is not None:
+                bbox_4326 = bbox
+                if bbox_srid != 4326:
+                    bbox_4326 = tuple(conn.execute(text("""
+                        SELECT ST_XMin(b), ST_YMin(b), ST_XMax(b), ST_YMax(b)
+                        FROM ST_Transform(ST_MakeEnvelope(:minx, :miny, :maxx, :maxy, :srid), 4326) b
+                    """), {'minx': bbox[0], 'miny': bbox[1], 'maxx': bbox[2], 'maxy': bbox[3],
+                           'srid': bbox_srid}).one())
+                grid_cells = layout.bbox_cells(bbox_4326)
+
+        conditions, self.params = [], dict(params or {})
+        if bbox is not None:
+            conditions.append("t.geometry && ST_Transform(ST_MakeEnvelope(:minx, :miny, :maxx, :maxy, :bbox_srid), 4326)")
+            self.params.update(minx=bbox[0], miny=bbox[1], maxx=bbox[2], maxy=bbox[3], bbox_srid=bbox_srid)
+        if grid_cells is not None:
+            conditions.append(f"t.{GRID_COLUMN} = ANY(:grid_cells)")
+            self.params['grid_cells'] = grid_cells
+        json_filter = {}
+        for i, (name, value) in enumerate((attributes or {}).items()):
+            if name in self.columns:
+                # 数值与布尔值以文本字面量绑定，由服务端按类型化列的类型转换（文本列同样可比较）；
+                # 值与列类型不一致而写入properties的要素另以 @> 匹配
+                conditions.append(f"(t.{quote_identifier(name)} = :attr_{i} "
+                                  f"OR t.properties @> CAST(:attr_json_{i} AS JSONB))")
+                self.params[f"attr_{i}"] = value if value is None or isinstance(value, str) else json.dumps(value)
+                self.params[f"attr_json_{i}"] = json.dumps({name: value}, ensure_ascii=False)
+            else:
+                json_filter[name] = value
+        if json_filter:
+            conditions.append("t.properties @> CAST(:json_filter AS JSONB)")
+            self.params['json_filter'] = json.dumps(json_filter, ensure_ascii=False)
+        if metadata_id is not None:
+            conditions.append("t.metadata_id = :metadata_id")
+            self.params['metadata_id'] = metadata_id
+        if where:
+            conditions.append(f"({where})")
+        self.conditions = conditions
+
+    def _select_sql(self, extra_conditions: Sequence[str] = (), suffix: str = "") -> str:
+        """查询SQL：几何按输出格式在服务端编码"""
+        geometry = "ST_AsGeoJSON(t.geometry)" if self.output == 'geojson' else "ST_AsEWKB(t.geometry)"
+        conditions = list(self.conditions) + list(extra_conditions)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        sort_key = f", {self.order_by} AS sort_key" if self.order_by else ""
+        return f"""
+            SELECT t.id, t.metadata_id, {geometry} AS geometry, {properties_sql(self.columns)} AS properties
+                   {sort_key}
+            FROM {self.vector_table} t
+            {where}
+            {suffix}
+        """
+
+    def _to_feature(self, row) -> Dict[str, Any]:
+        """将一行结果转换为要素字典"""
+        properties = row.properties if isinstance(row.properties, dict) else json.loads(row.properties)
+        if self.output == 'geojson':
+            return {
+                'type': 'Feature',
+                'id': row.id,
+                'geometry': json.loads(row.geometry) if row.geometry is not None else None,
+                'properties': properties,
+            }
+        return {
+            'id': row.id,
+            'metadata_id': row.metadata_id,
+            'geometry': bytes(row.geometry) if row.geometry is not None else None,
+            'properties': properties,
+        }
+
+    def count(self) -> int:
+        """满足条件的要素数"""
+        with self.engine.connect() as conn:
+            return conn.execute(text(f"SELECT COUNT(*) FROM {self.vector_table} t {self._where_sql()}"),
+                                self.params).scalar()
+
+    def _order_sql(self) -> str:
+        """排序子句：按 (排序键, id) 排序，排序键为NULL的要素排在最后"""
+        direction = "DESC" if self.descending else "ASC"
+        if not self.order_by:
+            return f"ORDER BY t.id {direction}"
+        return f"ORDER BY {self.order_by} {direction} NULLS LAST, t.id {direction}"
+
+    def _keyset_condition(self, after_id) -> str:
+        """键集分页的续读条件：排在上一页最后一个要素之后"""
+        operator = "<" if self.descending else ">"
+        if not self.order_by:
+            return f"t.id {operator} :after_id"
+        if after_id[0] is None:
+            # 上一页停在排序键为NULL的部分，只需在其中按id续读
+            return f"{self.order_by} IS NULL AND t.id {operator} :after_id"
+        return (f"({self.order_by} IS NULL OR "
+                f"({self.order_by}, t.id) {operator} (:after_key, :after_id))")
+
+    def _where_sql(self) -> str:
+        """过滤条件的WHERE子句"""
+        return f"WHERE {' AND '.join(self.conditions)}" if self.conditions else ""
+
+    def property_types(self) -> Dict[str, str]:
+        """
+        结果中各属性的值类型（服务端聚合，不取回要素）
+
+        properties中的键按jsonb_typeof归类：全为整数的number为integer，
+        同一键出现多种类型时为string，object / array为json；类型化列为其format_type类型，
+        同名键在properties中也有值（值与列类型不一致）时为string
+
+        Returns:
+            属性名到类型的映射，类型为 integer / number / string / boolean / json 或类型化列的类型
+        """
+        with self.engine.connect() as conn:
+            rows = conn.execute(text(f"""
+                SELECT e.key, jsonb_typeof(e.value) AS kind,
+                       bool_and(jsonb_typeof(e.value) <> 'number' OR e.value::text ~ '^-?[0-9]+$') AS integral
+                FROM {self.vector_table} t, jsonb_each(t.properties) e
+                {self._where_sql()}
+                GROUP BY e.key, jsonb_typeof(e.value)
+            """), self.params).fetchall()
+            column_types = dict(conn.execute(text("""
+                SELECT a.attname, format_type(a.atttypid, a.atttypmod)
+                FROM pg_attribute a
+                WHERE a.attrelid = to_regclass(:table) AND a.attnum > 0 AND NOT a.attisdropped
+            """), {'table': self.vector_table}).fetchall())
+
+        kinds: Dict[str, set] = {}
+        for key, kind, integral in rows:
+            if kind == 'null':
+                kinds.setdefault(key, set())
+                continue
+            if kind == 'number' and integral:
+                kind = 'integer'
+            elif kind in ('object', 'array'):
+                kind = 'json'
+            kinds.setdefault(key, set()).add(kind)
+
+        types = {}
+        for key in sorted(kinds):
+            found = kinds[key]
+            if found == {'integer', 'number'}:
+                types[key] = 'number'
+            elif len(found) == 1:
+                types[key] = found.pop()
+            else:
+                types[key] = 'string'
+        for name in self.columns:
+            types[name] = 'string' if kinds.get(name) else column_types[name]
+        return types
+
+    def geometry_types(self, with_z: bool = False) -> List[str]:
+        """
+        结果中的几何类型（GeometryType，如 MULTIPOLYGON）
+
+        Args:
+            with_z: 是否区分三维几何，为True时含Z坐标的类型附加" Z"（如 MULTIPOLYGON Z）
+        """
+        z_suffix = "|| CASE WHEN ST_Zmflag(t.geometry) IN (2, 3) THEN ' Z' ELSE '' END" if with_z else ""
+        with self.engine.connect() as conn:
+            return sorted(row[0] for row in conn.execute(text(f"""
+                SELECT DISTINCT GeometryType(t.geometry) {z_suffix} FROM {self.vector_table} t {self._where_sql()}
+            """), self.params) if row[0] is not None)
+
+    def iter_batches(self, itersize: int = DEFAULT_ITERSIZE) -> Iterator[List[Dict[str, Any]]]:
+        """
+        流式分批迭代全部结果（单个事务内的服务端游标，每批itersize行，指定order_by或descending时排序）
+
+        迭代期间保持一个连接与事务；需要中断后续读或避免长事务时使用iter_pages
+
+        Args:
+            itersize: 每次从服务端取回的行数
+
+        Yields:
+            一批要素字典
+        """
+        with self.engine.connect() as conn:
+            result = conn.execution_options(stream_results=True, max_row_buffer=itersize).execute(
+                text(self._select_sql(suffix=self._order_sql() if self.order_by or self.descending else "")),
+                self.params)
+            for rows in result.partitions(itersize):
+                yield [self._to_feature(row) for row in rows]
+
+    def iter_features(self, itersize: int = DEFAULT_ITERSIZE) -> Iterator[Dict[str, Any]]:
+        """逐要素流式迭代全部结果（见iter_batches）"""
+        for batch in self.iter_batches(itersize):
+            yield from batch
+
+    def page(self, after_id: Optional[Any] = None,
+             limit: int = DEFAULT_PAGE_SIZE) -> Tuple[List[Dict[str, Any]], Any]:
+        """
+        键集分页读取一页（按 (排序键, id) 续读，如 WHERE id > after_id，不使用OFFSET）
+
+        Args:
+            after_id: 上一页返回的续读位置，None为第一页；
+                      未指定order_by时为上一页最后一个要素的id，指定时为 (排序键, id)
+            limit: 每页条数
+
+        Returns:
+            (本页要素, 下一页的after_id)，已是最后一页时after_id为None
+        """
+        extra, params = [], dict(self.params, limit=limit)
+        if after_id is not None:
+            extra.append(self._keyset_condition(after_id))
+            if self.order_by:
+                params.update(after_key=after_id[0], after_id=after_id[1])
+            else:
+                params['after_id'] = after_id
+        with self.engine.connect() as conn:
+            rows = conn.execute(text(self._select_sql(extra, f"{self._order_sql()} LIMIT :limit")),
+                                params).fetchall()
+        features = [self._to_feature(row) for row in rows]
+        next_id = None
+        if len(rows) == limit:
+            next_id = (rows[-1].sort_key, rows[-1].id) if self.order_by else rows[-1].id
+        return features, next_id
+
+    def iter_pages(self, page_size: int = DEFAULT_PAGE_SIZE,
+                   after_id: Optional[Any] = None) -> Iterator[List[Dict[str, Any]]]:
+        """逐页迭代全部结果，每页一个短查询（可在页之间中断并从after_id继续）"""
+        while True:
+            features, after_id = self.page(after_id, page_size)
+            if features:
+                yield features
+            if after_id is None:
+                break
+
+    def write_geojson(self, stream: TextIO, itersize: int = DEFAULT_ITERSIZE) -> int:
+        """
+        以GeoJSON FeatureCollection流式写出全部结果（逐要素写入，不在内存中拼接）
+
+        Returns:
+            写出的要素数
+        """
+        if self.output != 'geojson':
+            raise ValueError("写出GeoJSON需要以output='geojson'查询")
+        stream.write('{"type": "FeatureCollection", "features": [\n')
+        count = 0
+        for feature in self.iter_features(itersize):
+            if count:
+                stream.write(',\n')
+            stream.write(json.dumps(feature, ensure_ascii=False, default=str))
+            count += 1
+        stream.write('\n]}\n')
+        return count
+
+
+def parse_attribute_filters(items: Sequence[str]) -> Dict[str, Any]:
+    """
+    解析命令行的 KEY=VALUE 属性过滤条件
+
+    值按JSON解析（如 DM=370100 为整数、FLAG=true 为布尔值，与properties中的数值/布尔值匹配），
+    不是合法JSON时按原字符串；需要按字符串匹配数字时写为 DM='"370100"'
+    """
+    filters = {}
+    for item in items:
+        key, sep, value = item.partition('=')
+        if not sep or not key:
+            raise ValueError(f"属性过滤条件格式应为 KEY=VALUE: {item}")
+        try:
+            filters[key] = json.loads(value)
+        except ValueError:
+            filters[key] = value
+    return filters
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='矢量数据表流式查询')
+    parser.add_argument('--vector_table', required=True, help='矢量数据表名')
+    parser.add_argument('--bbox', nargs=4, type=float, metavar=('MINX', 'MINY', 'MAXX', 'MAXY'),
+                        help='范围过滤')
+    parser.add_argument('--bbox_srid', default=4326, type=int, help='范围的坐标系')
+    parser.add_argument('--attr', action='append', default=[], metavar='KEY=VALUE',
+                        help='属性等值过滤，可重复指定')
+    parser.add_argument('--metadata_id', default=None, type=int, help='只查询该次入库的要素')
+    parser.add_argument('--output', default='-', help='输出的GeoJSON文件，默认输出到标准输出')
+    parser.add_argument('--count', action='store_true', help='只输出要素数')
+    parser.add_argument('--itersize', default=DEFAULT_ITERSIZE, type=int, help='服务端游标每次取回的行数')
+    parser.add_argument('--config', default='config.json', help='数据库配置文件')
+    args = parser.parse_args()
+
+    try:
+        with open(args.config, 'r', encoding='utf-8') as f:
+            db_config = json.load(f)['database']
+        attributes = parse_attribute_filters(args.attr)
+    except Exception as e:
+        print(f"参数或配置文件加载失败: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    engine = create_engine(
+        f"postgresql://{db_config['username']}:{db_config['password']}"
+        f"@{db_config['host']}:{db_config['port']}/{db_config['database']}"
+    )
+    query = VectorQuery(engine, args.vector_table, args.bbox, args.bbox_srid, attributes, args.metadata_id)
+    if args.count:
+        print(query.count())
+        return
+
+    start = time.perf_counter()
+    if args.output == '-':
+        count = query.write_geojson(sys.stdout, args.itersize)
+    else:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            count = query.write_geojson(f, args.itersize)
+    elapsed = time.perf_counter() - start
+    print(f"查询完成: {count} 个要素，耗时 {elapsed:.2f}s", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
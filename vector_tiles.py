@@ -0,0 +1,481 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+矢量瓦片（Mapbox Vector Tile）生成与本地瓦片缓存
+以 ST_AsMVT / ST_AsMVTGeom 从矢量数据表生成瓦片（可按metadata_id过滤），
+写入MBTiles（SQLite）或 {z}/{x}/{y}.pbf 目录；入库后按该次入库的范围失效并重建受影响的瓦片
+需要PostGIS 3.0及以上（ST_TileEnvelope）；矢量数据表有化简几何伴随表（LOD金字塔）时，
+化简误差在瓦片中不可见的缩放级别读取伴随表中的几何
+使用方法：python vector_tiles.py --vector_table nature_reserve_data --output tiles/nature_reserve.mbtiles --max_zoom 12
+"""
+
+import argparse
+import gzip
+import json
+import logging
+import os
+import sqlite3
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import create_engine, text
+
+from partitioning import GRID_COLUMN, PartitionLayout, tile_coordinates
+from lod_pyramid import choose_lod_level, lod_levels, tile_tolerance
+from vector_query import properties_sql, typed_columns
+
+# 支持的缓存格式
+TILE_CACHE_FORMATS = ('mbtiles', 'directory')
+
+# MVT坐标范围与瓦片缓冲区（瓦片坐标单位）
+DEFAULT_EXTENT = 4096
+DEFAULT_BUFFER = 64
+
+# Web墨卡托坐标范围（米）
+_WEB_MERCATOR_SIZE = 2 * 20037508.342789244
+
+
+def tile_range(bbox: Sequence[float], zoom: int,
+               margin_tiles: float = 0.0) -> Tuple[int, int, int, int]:
+    """
+    与经纬度范围相交的瓦片行列号范围
+
+    Args:
+        bbox: (minx, miny, maxx, maxy)，EPSG:4326
+        zoom: 缩放级别
+        margin_tiles: 按瓦片宽度计的外扩比例（覆盖瓦片缓冲区）
+
+    Returns:
+        (x_min, x_max, y_min, y_max)，均为闭区间
+    """
+    minx, miny, maxx, maxy = bbox
+    margin = 360.0 / (1 << zoom) * margin_tiles
+    tx, ty = tile_coordinates(np.array([minx - margin, maxx + margin]),
+                              np.array([maxy + margin, miny - margin]), zoom)
+    return int(tx[0]), int(tx[1]), int(ty[0]), int(ty[1])
+
+
+def tiles_in_bbox(bbox: Sequence[float], zoom: int, margin_tiles: float = 0.0) -> Iterator[Tuple[int, int]]:
+    """枚举与范围相交的瓦片 (x, y)"""
+    x_min, x_max, y_min, y_max = tile_range(bbox, zoom, margin_tiles)
+    for x in range(x_min, x_max + 1):
+        for y in range(y_min, y_max + 1):
+            yield x, y
+
+
+def tile_bbox(z: int, x: int, y: int, margin_tiles: float = 0.0) -> Tuple[float, float, float, float]:
+    """
+    瓦片的经纬度范围
+
+    Args:
+        z, x, y: 瓦片坐标
+        margin_tiles: 按瓦片宽度计的外扩比例（覆盖瓦片缓冲区）
+
+    Returns:
+        (minx, miny, maxx, maxy)，EPSG:4326
+    """
+    n = 1 << z
+    lon = (np.array([x - margin_tiles, x + 1 + margin_tiles]) / n) * 360.0 - 180.0
+    lat = np.degrees(np.arctan(np.sinh(np.pi * (1 - 2 * np.array([y + 1 + margin_tiles, y - margin_tiles]) / n))))
+    return float(lon[0]), float(lat[0]), float(lon[1]), float(lat[1])
+
+
+def _children(x: int, y: int) -> List[Tuple[int, int]]:
+    """下一级的4个子瓦片"""
+    return [(2 * x + dx, 2 * y + dy) for dx in (0, 1) for dy in (0, 1)]
+
+
+class MBTilesCache:
+    """MBTiles瓦片缓存（tile_row按TMS规范翻转，瓦片数据gzip压缩）"""
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.conn = sqlite3.connect(path, timeout=60)
+        self.conn.execute("CREATE TABLE IF NOT EXISTS metadata (name TEXT PRIMARY KEY, value TEXT)")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS tiles (
+                zoom_level INTEGER, tile_column INTEGER, tile_row INTEGER, tile_data BLOB,
+                PRIMARY KEY (zoom_level, tile_column, tile_row)
+            )
+        """)
+        self.conn.commit()
+
+    def get(self, z: int, x: int, y: int) -> Optional[bytes]:
+        """读取瓦片（解压后的MVT数据），不存在时返回None"""
+        row = self.conn.execute(
+            "SELECT tile_data FROM tiles WHERE zoom_level = ? AND tile_column = ? AND tile_row = ?",
+            (z, x, (1 << z) - 1 - y)
+        ).fetchone()
+        return gzip.decompress(row[0]) if row else None
+
+    def put(self, z: int, x: int, y: int, data: bytes):
+        """写入瓦片"""
+        self.conn.execute(
+            "INSERT OR REPLACE INTO tiles (zoom_level, tile_column, tile_row, tile_data) VALUES (?, ?, ?, ?)",
+            (z, x, (1 << z) - 1 - y, gzip.compress(data))
+        )
+
+    def delete_range(self, z: int, x_min: int, x_max: int, y_min: int, y_max: int) -> int:
+        """删除一个行列号范围内的瓦片，返回删除数量"""
+        last = (1 << z) - 1
+        return self.conn.execute(
+            "DELETE FROM tiles WHERE zoom_level = ? AND tile_column BETWEEN ? AND ? AND tile_row BETWEEN ? AND ?",
+            (z, x_min, x_max, last - y_max, last - y_min)
+        ).rowcount
+
+    def set_metadata(self, metadata: Dict[str, str]):
+        """写入metadata表"""
+        self.conn.executemany("INSERT OR REPLACE INTO metadata (name, value) VALUES (?, ?)",
+                              list(metadata.items()))
+
+    def commit(self):
+        self.conn.commit()
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
+
+
+class DirectoryTileCache:
+    """{z}/{x}/{y}.pbf 目录瓦片缓存（未压缩），元数据写入metadata.json"""
+
+    def __init__(self, path: str):
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+
+    def _tile_path(self, z: int, x: int, y: int) -> str:
+        return os.path.join(self.path, str(z), str(x), f"{y}.pbf")
+
+    def get(self, z: int, x: int, y: int) -> Optional[bytes]:
+        """读取瓦片，不存在时返回None"""
+        tile_path = self._tile_path(z, x, y)
+        if not os.path.exists(tile_path):
+            return None
+        with open(tile_path, 'rb') as f:
+            return f.read()
+
+    def put(self, z: int, x: int, y: int, data: bytes):
+        """写入瓦片（先写临时文件再替换，读者不会读到写了一半的瓦片）"""
+        tile_path = self._tile_path(z, x, y)
+        os.makedirs(os.path.dirname(tile_path), exist_ok=True)
+        temp_path = f"{tile_path}.tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, tile_path)
+
+    def delete_range(self, z: int, x_min: int, x_max: int, y_min: int, y_max: int) -> int:
+        """删除一个行列号范围内的瓦片，返回删除数量（只遍历已存在的列目录）"""
+        zoom_dir = os.path.join(self.path, str(z))
+        if not os.path.isdir(zoom_dir):
+            return 0
+        deleted = 0
+        for column in os.listdir(zoom_dir):
+            if not column.isdigit() or not x_min <= int(column) <= x_max:
+                continue
+            column_dir = os.path.join(zoom_dir, column)
+            for name in os.listdir(column_dir):
+                stem = name[:-len('.pbf')]
+                if name.endswith('.pbf') and stem.isdigit() and y_min <= int(stem) <= y_max:
+                    os.remove(os.path.join(column_dir, name))
+                    deleted += 1
+        return deleted
+
+    def set_metadata(self, metadata: Dict[str, str]):
+        """合并写入metadata.json"""
+        metadata_path = os.path.join(self.path, 'metadata.json')
+        existing = {}
+        if os.path.exists(metadata_path):
+            with open(metadata_path, 'r', encoding='utf-8') as f:
+                existing = json.load(f)
+        existing.update(metadata)
+        with open(metadata_path, 'w', encoding='utf-8') as f:
+            json.dump(existing, f, ensure_ascii=False, indent=2)
+
+    def commit(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def open_tile_cache(path: str, cache_format: Optional[str] = None):
+    """
+    打开瓦片缓存
+
+    Args:
+        path: .mbtiles文件或瓦片目录
+        cache_format: mbtiles / directory，默认按扩展名判断
+    """
+    cache_format = cache_format or ('mbtiles' if path.endswith('.mbtiles') else 'directory')
+    if cache_format not in TILE_CACHE_FORMATS:
+        raise ValueError(f"不支持的瓦片缓存格式: {cache_format}，可选: {', '.join(TILE_CACHE_FORMATS)}")
+    return MBTilesCache(path) if cache_format == 'mbtiles' else DirectoryTileCache(path)
+
+
+class TileGenerator:
+    """从矢量数据表生成MVT瓦片并写入缓存"""
+
+    def __init__(self, engine, vector_table: str, cache, layer: Optional[str] = None,
+                 metadata_id: Optional[int] = None, min_zoom: int = 0, max_zoom: int = 14,
+                 extent: int = DEFAULT_EXTENT, buffer: int = DEFAULT_BUFFER, workers: int = 4,
+                 logger: Optional[logging.Logger] = None,
+                 levels: Optional[Sequence[Tuple[str, float]]] = None,
+                 columns: Optional[Sequence[str]] = None):
+        """
+        Args:
+            engine: SQLAlchemy引擎
+            vector_table: 矢量数据表名
+            cache: 瓦片缓存（open_tile_cache的结果）
+            layer: MVT图层名，默认为表名
+            metadata_id: 只输出该次入库的要素，默认输出全表
+            min_zoom: 最小缩放级别
+            max_zoom: 最大缩放级别
+            extent: MVT坐标范围
+            buffer: 瓦片缓冲区
+            workers: 并行生成瓦片的连接数
+            logger: 日志记录器
+            levels: 化简几何伴随表 [(表名, 容差)]，默认读取该表已有的伴随表
+            columns: 类型化列（typed存储模式），默认读取该表的类型化列
+        """
+        self.engine = engine
+        self.vector_table = vector_table
+        self.cache = cache
+        self.layer = layer or vector_table
+        self.metadata_id = metadata_id
+        self.min_zoom = min_zoom
+        self.max_zoom = max_zoom
+        self.extent = extent
+        self.buffer = buffer
+        self.workers = workers
+        self.logger = logger or logging.getLogger(__name__)
+        if levels is None:
+            with engine.connect() as conn:
+                levels = lod_levels(conn, vector_table)
+        self.levels = list(levels)
+        with engine.connect() as conn:
+            self.layout = PartitionLayout.detect(conn, vector_table)
+            if columns is None:
+                columns = typed_columns(conn, vector_table)
+        self.columns = list(columns)
+        self.tile_sql = {(table, grid_filter): self._tile_sql(table, grid_filter)
+                         for table in [None] + [name for name, _ in self.levels]
+                         for grid_filter in (False, True)}
+        self.exists_sql = {grid_filter: self._exists_sql(grid_filter) for grid_filter in (False, True)}
+
+    def _tile_sql(self, source_table: Optional[str], grid_filter: bool = False) -> str:
+        """
+        生成瓦片的SQL，source_table为伴随表时几何取自伴随表、属性按要素id取自矢量数据表；
+        grid_filter为True时附加矢量数据表的分区键条件（grid分区表裁剪子分区）；
+        类型化列与properties合并为同一个jsonb列，在瓦片中均为要素属性
+        """
+        metadata_filter = "AND g.metadata_id = :metadata_id" if self.metadata_id is not None else ""
+        join = f"JOIN {self.vector_table} t ON t.id = g.id" if source_table else ""
+        properties = properties_sql(self.columns, 't' if source_table else 'g')
+        if grid_filter:
+            metadata_filter += f" AND {'t' if source_table else 'g'}.{GRID_COLUMN} = ANY(:grid_cells)"
+        # 用瓦片范围（含缓冲区）转回EPSG:4326过滤，命中几何列上的空间索引
+        return f"""
+            WITH bounds AS (SELECT ST_TileEnvelope(:z, :x, :y) AS geom)
+            SELECT ST_AsMVT(tile.*, :layer, :extent, 'geom', 'id')
+            FROM (
+                SELECT g.id, {properties} AS properties,
+                       ST_AsMVTGeom(ST_Transform(g.geometry, 3857), bounds.geom,
+                                    :extent, :buffer, true) AS geom
+                FROM {source_table or self.vector_table} g {join}, bounds
+                WHERE g.geometry && ST_Transform(ST_Expand(bounds.geom, :margin), 4326)
+                  {metadata_filter}
+            ) AS tile
+            WHERE tile.geom IS NOT NULL
+        """
+
+    def _exists_sql(self, grid_filter: bool = False) -> str:
+        """瓦片范围（含缓冲区）内是否有要素的SQL，只用空间索引判断，不生成瓦片"""
+        metadata_filter = "AND g.metadata_id = :metadata_id" if self.metadata_id is not None else ""
+        if grid_filter:
+            metadata_filter += f" AND g.{GRID_COLUMN} = ANY(:grid_cells)"
+        return f"""
+            SELECT EXISTS (
+                SELECT 1 FROM {self.vector_table} g
+                WHERE g.geometry && ST_Transform(ST_Expand(ST_TileEnvelope(:z, :x, :y), :margin), 4326)
+                  {metadata_filter}
+            )
+        """
+
+    def source_table(self, z: int) -> Optional[str]:
+        """缩放级别z读取的伴随表，化简误差大于一个瓦片坐标单位时返回None（读取原始几何）"""
+        return choose_lod_level(self.levels, tile_tolerance(z, self.extent))
+
+    def _tile_params(self, z: int, x: int, y: int) -> Tuple[Dict[str, Any], bool]:
+        """瓦片SQL的绑定参数，以及是否附加分区键条件"""
+        params = {
+            'z': z, 'x': x, 'y': y, 'layer': self.layer, 'extent': self.extent, 'buffer': self.buffer,
+            'margin': _WEB_MERCATOR_SIZE / (1 << z) * self.buffer / self.extent,
+            'metadata_id': self.metadata_id,
+        }
+        grid_cells = (self.layout.bbox_cells(tile_bbox(z, x, y, self._margin_tiles()))
+                      if self.layout is not None else None)
+        if grid_cells is not None:
+            params['grid_cells'] = grid_cells
+        return params, grid_cells is not None
+
+    def render_tile(self, z: int, x: int, y: int) -> bytes:
+        """生成一个瓦片，范围内没有要素时返回空字节串"""
+        params, grid_filter = self._tile_params(z, x, y)
+        sql = self.tile_sql[(self.source_table(z), grid_filter)]
+        with self.engine.connect() as conn:
+            data = conn.execute(text(sql), params).scalar()
+        return bytes(data) if data else b''
+
+    def has_features(self, z: int, x: int, y: int) -> bool:
+        """瓦片范围（含缓冲区）内是否有要素（小比例尺下要素可能小于一个瓦片坐标单位，瓦片为空但仍有要素）"""
+        params, grid_filter = self._tile_params(z, x, y)
+        with self.engine.connect() as conn:
+            return bool(conn.execute(text(self.exists_sql[grid_filter]), params).scalar())
+
+    def _margin_tiles(self) -> float:
+        """缓冲区占瓦片宽度的比例"""
+        return self.buffer / self.extent
+
+    def invalidate(self, bbox: Sequence[float]) -> int:
+        """删除与范围（含缓冲区）相交的全部缓存瓦片，返回删除数量"""
+        deleted = 0
+        for z in range(self.min_zoom, self.max_zoom + 1):
+            deleted += self.cache.delete_range(z, *tile_range(bbox, z, self._margin_tiles()))
+        self.cache.commit()
+        return deleted
+
+    def build(self, bbox: Sequence[float]) -> Dict[str, Any]:
+        """
+        生成与范围相交的瓦片
+
+        逐级生成：非空瓦片的子瓦片进入下一级；瓦片为空时再用空间索引判断范围内是否有要素
+        （小范围的入库在小比例尺下渲染为空），有要素时仍向下细分，没有要素的区域不再细分
+
+        Args:
+            bbox: (minx, miny, maxx, maxy)，EPSG:4326
+
+        Returns:
+            tiles（写入数）/ empty（空瓦片数）/ bytes / seconds
+        """
+        start = time.perf_counter()
+        margin_tiles = self._margin_tiles()
+        x_min, x_max, y_min, y_max = tile_range(bbox, self.min_zoom, margin_tiles)
+        level_tiles = [(x, y) for x in range(x_min, x_max + 1) for y in range(y_min, y_max + 1)]
+        stats = {'tiles': 0, 'empty': 0, 'bytes': 0}
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for z in range(self.min_zoom, self.max_zoom + 1):
+                if not level_tiles:
+                    break
+                results = list(executor.map(lambda tile: self.render_tile(z, *tile), level_tiles))
+                refine = [bool(data) for data in results]
+                if z < self.max_zoom:
+                    x_min, x_max, y_min, y_max = tile_range(bbox, z + 1, margin_tiles)
+                    empty_tiles = [tile for tile, data in zip(level_tiles, results) if not data]
+                    empty_refine = iter(executor.map(lambda tile: self.has_features(z, *tile), empty_tiles))
+                    refine = [flag or next(empty_refine) for flag in refine]
+                next_tiles = []
+                for (x, y), data, descend in zip(level_tiles, results, refine):
+                    if data:
+                        self.cache.put(z, x, y, data)
+                        stats['tiles'] += 1
+                        stats['bytes'] += len(data)
+                    else:
+                        stats['empty'] += 1
+                    if descend:
+                        next_tiles.extend((cx, cy) for cx, cy in _children(x, y)
+                                          if x_min <= cx <= x_max and y_min <= cy <= y_max)
+                self.cache.commit()
+                self.logger.info(f"缩放级别 {z} 瓦片生成完成，累计 {stats['tiles']} 个")
+                level_tiles = next_tiles
+
+        stats['seconds'] = round(time.perf_counter() - start, 2)
+        return stats
+
+    def refresh(self, bbox: Sequence[float]) -> Dict[str, Any]:
+        """失效并重建与范围相交的瓦片（入库、合并或删除一次入库后调用）"""
+        deleted = self.invalidate(bbox)
+        stats = self.build(bbox)
+        stats['invalidated'] = deleted
+        self.write_metadata(bbox)
+        return stats
+
+    def write_metadata(self, bbox: Sequence[float]):
+        """写入瓦片集元数据（MBTiles metadata表 / metadata.json）"""
+        self.cache.set_metadata({
+            'name': self.layer,
+            'format': 'pbf',
+            'minzoom': str(self.min_zoom),
+            'maxzoom': str(self.max_zoom),
+            'bounds': ','.join(str(round(v, 6)) for v in bbox),
+            'json': json.dumps({'vector_layers': [{'id': self.layer, 'fields': {},
+                                                   'minzoom': self.min_zoom, 'maxzoom': self.max_zoom}]}),
+            'updated_at': datetime.now().isoformat(timespec='seconds'),
+        })
+        self.cache.commit()
+
+
+def table_extent(engine, vector_table: str, metadata_id: Optional[int] = None) -> Optional[Tuple[float, ...]]:
+    """矢量数据表（或一次入库）的外包框，没有要素时返回None"""
+    metadata_filter = "WHERE metadata_id = :metadata_id" if metadata_id is not None else ""
+    with engine.connect() as conn:
+        row = conn.execute(text(f"""
+            SELECT ST_XMin(e), ST_YMin(e), ST_XMax(e), ST_YMax(e)
+            FROM (SELECT ST_Extent(geometry) AS e FROM {vector_table} {metadata_filter}) AS extent
+        """), {'metadata_id': metadata_id}).fetchone()
+    if row is None or row[0] is None:
+        return None
+    return tuple(row)
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='矢量瓦片生成')
+    parser.add_argument('--vector_table', required=True, help='矢量数据表名')
+    parser.add_argument('--output', required=True, help='输出的.mbtiles文件或瓦片目录')
+    parser.add_argument('--metadata_id', default=None, type=int, help='只输出该次入库的要素')
+    parser.add_argument('--layer', default=None, help='MVT图层名，默认为表名')
+    parser.add_argument('--min_zoom', default=0, type=int, help='最小缩放级别')
+    parser.add_argument('--max_zoom', default=14, type=int, help='最大缩放级别')
+    parser.add_argument('--workers', default=4, type=int, help='并行生成瓦片的连接数')
+    parser.add_argument('--config', default='config.json', help='数据库配置文件')
+    args = parser.parse_args()
+
+    try:
+        with open(args.config, 'r', encoding='utf-8') as f:
+            db_config = json.load(f)['database']
+    except Exception as e:
+        print(f"配置文件加载失败: {e}")
+        sys.exit(1)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    engine = create_engine(
+        f"postgresql://{db_config['username']}:{db_config['password']}"
+        f"@{db_config['host']}:{db_config['port']}/{db_config['database']}",
+        pool_size=args.workers, max_overflow=0
+    )
+    bbox = table_extent(engine, args.vector_table, args.metadata_id)
+    if bbox is None:
+        print("表中没有要素")
+        sys.exit(1)
+
+    cache = open_tile_cache(args.output)
+    generator = TileGenerator(engine, args.vector_table, cache, args.layer, args.metadata_id,
+                              args.min_zoom, args.max_zoom, workers=args.workers)
+    try:
+        stats = generator.refresh(bbox)
+    finally:
+        cache.close()
+    print(f"瓦片生成完成: {stats['tiles']} 个瓦片，{stats['bytes'] / 1024 / 1024:.1f} MB，"
+          f"空瓦片 {stats['empty']} 个，耗时 {stats['seconds']}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -7,14 +7,21 @@
 """
 
 import os
+import re
+import sqlite3
 import sys
 import logging
 import argparse
+import itertools
+import time
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from datetime import datetime
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Iterator, Iterable, Callable, Tuple
 import json
 
 import geopandas as gpd
+import numpy as np
 import pandas as pd
 from sqlalchemy import create_engine, text
 from sqlalchemy.exc import SQLAlchemyError
@@ -26,6 +33,48 @@ from shapely.ops import transform
 import pyproj
 from pyproj import CRS, Transformer
 
+try:
+    import pyogrio
+except ImportError:  # 未安装pyogrio时使用fiona逐要素迭代分块
+    pyogrio = None
+
+try:
+    import pyarrow
+except ImportError:  # 未安装pyarrow时不能使用pyogrio的Arrow流式读取
+    pyarrow = None
+
+from pg_copy_writer import (
+    COPY_COLUMNS, LOAD_METHODS, encode_geometries, serialize_properties,
+    build_csv_buffer, build_binary_buffer, copy_rows
+)
+from metadata_accumulator import MetadataAccumulator
+from import_checkpoint import ImportCheckpoint
+from fingerprint import check_fingerprint, file_stats, with_content_hash
+from parallel_reproject import reproject_geodataframe
+from typed_schema import (
+    STORAGE_MODES, RESERVED_COLUMNS, HOT_PROPERTY_TYPES, HOT_PROPERTY_MODES, BIGINT, DOUBLE, TEXT,
+    build_typed_text_buffer, fits_column, infer_column_type, infer_column_types, is_compatible,
+    property_expression, quote_identifier, typed_copy_columns
+)
+from crs_cache import crs_equals, get_crs
+from spatial_order import SPATIAL_ORDERS, crs_extent, sort_geodataframe, spatial_sort_keys
+from index_strategy import (
+    SPATIAL_INDEX_METHODS, PROPERTY_INDEX_METHODS, PROFILE_SAMPLE_SIZE, choose_index_plan, profile_layer,
+    revise_index_plan, table_statistics
+)
+from vector_tiles import TileGenerator, open_tile_cache
+from lod_pyramid import (
+    LOD_CHUNK_SIZE, LOD_COLUMNS, build_lod_buffer, ensure_lod_table, iter_geometry_chunks,
+    lod_levels, simplify_chunks
+)
+from subdivide import has_subdivided_table, subdivide_import, subdivided_max_vertices, subdivided_table_name
+from partitioning import (
+    PARTITION_SCHEMES, GRID_COLUMN, DEFAULT_GRID_LEVEL, PartitionLayout, partition_column
+)
+
+# 经暂存表入库时暂存表中的空间排序编码列（发布时不写入目标表）
+STAGING_SORT_COLUMN = '_spatial_sort_key'
+
 
 class VectorToPostGIS:
     """矢量数据入库PostGIS工具类"""
@@ -38,6 +87,8 @@ class VectorToPostGIS:
             config: 配置字典，包含数据库连接等信息
         """
         self.config = config
+        # 一次入库期间复用的坐标转换进程池（见reproject_pool）
+        self._reproject_executor: Optional[ProcessPoolExecutor] = None
         self.setup_logging()
         self.setup_database_connection()
         
@@ -108,6 +159,19 @@ class VectorToPostGIS:
             return format_mapping[file_ext] in supported_formats
         return False
         
+    def _csv_to_geodataframe(self, df: pd.DataFrame) -> gpd.GeoDataFrame:
+        """将CSV读取结果转换为GeoDataFrame"""
+        # 假设有geometry列或经纬度列
+        if 'geometry' in df.columns:
+            return gpd.GeoDataFrame(df, geometry='geometry')
+        elif 'longitude' in df.columns and 'latitude' in df.columns:
+            return gpd.GeoDataFrame(
+                df, 
+                geometry=gpd.points_from_xy(df.longitude, df.latitude)
+            )
+        else:
+            raise ValueError("CSV文件必须包含geometry列或longitude/latitude列")
+            
     def read_vector_data(self, file_path: str, encoding: str = 'utf-8') -> gpd.GeoDataFrame:
         """
         读取矢量数据
@@ -128,16 +192,7 @@ class VectorToPostGIS:
             if file_ext == '.csv':
                 # CSV文件需要特殊处理
                 df = pd.read_csv(file_path, encoding=encoding)
-                # 假设有geometry列或经纬度列
-                if 'geometry' in df.columns:
-                    gdf = gpd.GeoDataFrame(df, geometry='geometry')
-                elif 'longitude' in df.columns and 'latitude' in df.columns:
-                    gdf = gpd.GeoDataFrame(
-                        df, 
-                        geometry=gpd.points_from_xy(df.longitude, df.latitude)
-                    )
-                else:
-                    raise ValueError("CSV文件必须包含geometry列或longitude/latitude列")
+                gdf = self._csv_to_geodataframe(df)
             else:
                 # 其他格式使用geopandas读取
                 gdf = gpd.read_file(file_path, encoding=encoding)
@@ -149,6 +204,82 @@ class VectorToPostGIS:
             self.logger.error(f"文件读取失败: {e}")
             raise
             
+    def read_vector_data_chunks(self, file_path: str, encoding: str = 'utf-8',
+                                chunk_size: int = 50000,
+                                skip_features: int = 0) -> Iterator[gpd.GeoDataFrame]:
+        """
+        分块流式读取矢量数据，每次只在内存中保留一个分块
+        
+        Args:
+            file_path: 文件路径
+            encoding: 文件编码
+            chunk_size: 每个分块的要素数量
+            skip_features: 跳过开头的要素数（续传时从检查点偏移量开始读取）
+            
+        Yields:
+            不超过chunk_size条记录的GeoDataFrame
+        """
+        try:
+            self.logger.info(f"开始分块读取文件: {file_path}，分块大小: {chunk_size}")
+            if skip_features:
+                self.logger.info(f"跳过前{skip_features}条记录")
+            
+            file_ext = os.path.splitext(file_path)[1].lower()
+            
+            if file_ext == '.csv':
+                skiprows = range(1, skip_features + 1) if skip_features else None
+                for df in pd.read_csv(file_path, encoding=encoding, chunksize=chunk_size,
+                                      skiprows=skiprows):
+                    yield self._csv_to_geodataframe(df)
+                    
+            elif pyogrio is not None and pyarrow is not None:
+                # pyogrio以Arrow流一次打开文件顺序读取，skip_features只在开始时定位一次
+                with pyogrio.raw.open_arrow(file_path, encoding=encoding, skip_features=skip_features,
+                                            batch_size=chunk_size) as (meta, reader):
+                    geometry_name = meta['geometry_name'] or 'wkb_geometry'
+                    for batch in reader:
+                        table = pyarrow.Table.from_batches([batch])
+                        geometries = gpd.GeoSeries.from_wkb(
+                            table.column(geometry_name).to_numpy(zero_copy_only=False), crs=meta['crs'])
+                        df = table.drop_columns([geometry_name]).to_pandas()
+                        yield gpd.GeoDataFrame(df, geometry=geometries.values, crs=meta['crs'])
+                    
+            else:
+                # fiona逐要素迭代，攒满一个分块后构建GeoDataFrame
+                with fiona.open(file_path, encoding=encoding) as src:
+                    crs = src.crs
+                    columns = list(src.schema['properties'].keys()) + ['geometry']
+                    features = []
+                    for feature in src.values(skip_features, None):
+                        features.append(feature)
+                        if len(features) >= chunk_size:
+                            yield gpd.GeoDataFrame.from_features(features, crs=crs, columns=columns)
+                            features = []
+                    if features:
+                        yield gpd.GeoDataFrame.from_features(features, crs=crs, columns=columns)
+                        
+        except Exception as e:
+            self.logger.error(f"文件分块读取失败: {e}")
+            raise
+            
+    @contextmanager
+    def reproject_pool(self):
+        """
+        在一次入库期间持有坐标转换进程池，分块入库的各块复用同一个池
+        
+        配置reproject_workers不大于1或已在池中时不创建
+        """
+        workers = self.config.get('reproject_workers', 1)
+        if workers <= 1 or self._reproject_executor is not None:
+            yield
+            return
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            self._reproject_executor = executor
+            try:
+                yield
+            finally:
+                self._reproject_executor = None
+                
     def transform_coordinate_system(self, gdf: gpd.GeoDataFrame, 
                                   source_crs: str, target_crs: str) -> gpd.GeoDataFrame:
         """
@@ -167,12 +298,20 @@ class VectorToPostGIS:
             
             # 设置源坐标系
             if gdf.crs is None:
-                gdf.set_crs(source_crs, inplace=True)
-            elif str(gdf.crs) != source_crs:
+                gdf.set_crs(get_crs(source_crs), inplace=True)
+            elif not crs_equals(gdf.crs, source_crs):
                 self.logger.warning(f"文件坐标系({gdf.crs})与指定源坐标系({source_crs})不一致")
                 
-            # 执行坐标系转换
-            gdf_transformed = gdf.to_crs(target_crs)
+            # 坐标系等价时无需转换，直接返回原数据
+            if crs_equals(gdf.crs, target_crs):
+                self.logger.info("源坐标系与目标坐标系等价，跳过坐标转换")
+                return gdf
+                
+            # 执行坐标系转换：Transformer按坐标系对缓存，
+            # 配置reproject_workers大于1时多进程并行转换坐标
+            gdf_transformed = reproject_geodataframe(gdf, target_crs,
+                                                     self.config.get('reproject_workers', 1),
+                                                     self._reproject_executor)
             
             self.logger.info("坐标系转换完成")
             return gdf_transformed
@@ -181,14 +320,141 @@ class VectorToPostGIS:
             self.logger.error(f"坐标系转换失败: {e}")
             raise
             
-    def create_tables(self, vector_table: str, metadata_table: str):
+    def _index_statements(self, vector_table: str,
+                          index_plan: Optional[Dict[str, Any]] = None) -> Dict[str, str]:
+        """
+        矢量数据表的索引定义：索引名 -> 建索引语句
+        
+        index_plan为choose_index_plan的结果，未指定时几何列GIST、properties列GIN
+        """
+        index_plan = index_plan or {}
+        geometry_method = index_plan.get('geometry', 'gist')
+        properties_method = index_plan.get('properties', 'gin')
+        
+        if geometry_method == 'brin':
+            pages_per_range = int(self.config.get('brin_pages_per_range', 32))
+            geometry_index = f"USING BRIN (geometry) WITH (pages_per_range = {pages_per_range})"
+        else:
+            geometry_index = f"USING {geometry_method.upper()} (geometry)"
+        statements = {
+            # 空间索引
+            f"idx_{vector_table}_geometry":
+                f"CREATE INDEX IF NOT EXISTS idx_{vector_table}_geometry "
+                f"ON {vector_table} {geometry_index}",
+        }
+        if properties_method != 'none':
+            # JSONB索引
+            opclass = " jsonb_path_ops" if properties_method == 'gin_path' else ""
+            statements[f"idx_{vector_table}_properties"] = (
+                f"CREATE INDEX IF NOT EXISTS idx_{vector_table}_properties "
+                f"ON {vector_table} USING GIN (properties{opclass})"
+            )
+        # 外键索引
+        statements[f"idx_{vector_table}_metadata_id"] = (
+            f"CREATE INDEX IF NOT EXISTS idx_{vector_table}_metadata_id "
+            f"ON {vector_table} (metadata_id)"
+        )
+        return statements
+        
+    def plan_indexes(self, gdf: gpd.GeoDataFrame, feature_count: Optional[int] = None,
+                     storage_mode: Optional[str] = None) -> Dict[str, Any]:
+        """
+        根据图层画像选择索引类型（配置项index_plan可覆盖geometry / properties）
+        
+        properties索引按写入properties列的属性选择：typed存储模式下只有无法映射为原生列的字段，
+        热点属性（配置项hot_properties）另建btree索引，不计入
+        
+        Args:
+            gdf: 图层数据或样本
+            feature_count: 图层要素总数，默认为gdf的条数
+            storage_mode: 存储模式，jsonb / typed
+            
+        Returns:
+            索引计划
+        """
+        attributes = gdf.drop(columns=gdf.geometry.name)
+        property_columns = list(attributes.columns)
+        if self._resolve_storage_mode(storage_mode) == 'typed':
+            column_types = infer_column_types(attributes)
+            property_columns = [col for col in property_columns if column_types[str(col)] is None]
+            if not self.config.get('jsonb_overflow', True):
+                property_columns = []
+        hot_properties = self.config.get('hot_properties') or {}
+        property_columns = [col for col in property_columns if col not in hot_properties]
+        profile = profile_layer(gdf, feature_count, property_columns)
+        index_plan = choose_index_plan(profile, self.config.get('index_plan'))
+        self.logger.info(f"索引计划: 几何 {index_plan['geometry']}，属性 {index_plan['properties']}，"
+                         f"依据: {index_plan['reason'] or '默认'}，画像: {profile}")
+        return index_plan
+        
+    def _count_features(self, file_path: str, encoding: str = 'utf-8') -> Optional[int]:
+        """文件要素数（只读取图层信息），CSV返回None"""
+        if os.path.splitext(file_path)[1].lower() == '.csv':
+            return None
+        if pyogrio is not None:
+            return pyogrio.read_info(file_path, encoding=encoding, force_feature_count=True)['features']
+        with fiona.open(file_path, encoding=encoding) as src:
+            return len(src)
+            
+    def _sample_index_plan(self, file_path: str, encoding: str = 'utf-8',
+                           storage_mode: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """分块入库时以文件开头的样本分块选择索引类型，文件中没有要素时返回None"""
+        chunks = self.read_vector_data_chunks(file_path, encoding, PROFILE_SAMPLE_SIZE)
+        try:
+            sample = next(chunks, None)
+        finally:
+            chunks.close()
+        if sample is None:
+            return None
+        return self.plan_indexes(sample, self._count_features(file_path, encoding), storage_mode)
+        
+    def _applied_index_plan(self, vector_table: str, index_plan: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        对照表上已有的索引，返回实际生效的索引类型（applied）
+        
+        表上已有同名索引时保留已有索引，不按新计划重建
+        """
+        with self.engine.connect() as conn:
+            existing = dict(conn.execute(text("""
+                SELECT c.relname, am.amname
+                FROM pg_index i
+                JOIN pg_class c ON c.oid = i.indexrelid
+                JOIN pg_am am ON am.oid = c.relam
+                WHERE i.indrelid = to_regclass(:table)
+            """), {'table': vector_table}).fetchall())
+            
+        applied = {}
+        for role in ('geometry', 'properties'):
+            planned = index_plan[role]
+            actual = existing.get(f"idx_{vector_table}_{role}")
+            if actual is None or (planned == 'gin_path' and actual == 'gin'):
+                applied[role] = planned
+            else:
+                applied[role] = actual
+                if planned != actual:
+                    self.logger.warning(f"表 {vector_table} 已有{role}索引({actual})，与计划({planned})不同，保留已有索引")
+        return dict(index_plan, applied=applied)
+        
+    def create_tables(self, vector_table: str, metadata_table: str,
+                      defer_indexes: bool = False,
+                      partition_by: Optional[str] = None,
+                      index_plan: Optional[Dict[str, Any]] = None) -> bool:
         """
         创建数据表和元数据表
         
         Args:
             vector_table: 矢量数据表名
             metadata_table: 元数据表名
+            defer_indexes: 是否推迟建索引到数据入库之后（仅对空表生效，
+                           向已有数据的表追加时仍保留索引）
+            partition_by: 新建矢量数据表的分区方式，metadata_id / grid，
+                          默认取配置项partition_by（未配置时不分区）；已有表保持原有结构
+            index_plan: 索引计划（plan_indexes的结果），未指定时几何列GIST、properties列GIN
+            
+        Returns:
+            索引是否被推迟，为True时需在入库后调用build_indexes
         """
+        partition_by = partition_by or self.config.get('partition_by')
         try:
             with self.engine.connect() as conn:
                 # 先创建元数据表（如果不存在）
@@ -225,49 +491,448 @@ class VectorToPostGIS:
                 );
                 """
                 
-                # 执行表创建
+                if partition_by:
+                    # 分区表的主键需包含分区键；子分区在入库时按需创建
+                    column = partition_column(partition_by)
+                    grid_column = f"{GRID_COLUMN} TEXT NOT NULL," if partition_by == 'grid' else ""
+                    vector_table_sql = f"""
+                    CREATE TABLE IF NOT EXISTS {vector_table} (
+                        id SERIAL,
+                        geometry GEOMETRY(GEOMETRY, 4326),
+                        properties JSONB,
+                        metadata_id INTEGER NOT NULL,
+                        {grid_column}
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        PRIMARY KEY (id, {column})
+                    ) PARTITION BY LIST ({column});
+                    """
+                    
+                # 执行表创建：同一矢量数据表的建表语句在事务级咨询锁下串行执行，
+                # 避免并行入库的任务同时建表、加约束
+                conn.execute(text("SELECT pg_advisory_xact_lock(hashtext(:key))"),
+                             {'key': f"{vector_table}:ddl"})
                 conn.execute(text(metadata_table_sql))
+                table_exists = conn.execute(
+                    text("SELECT to_regclass(:table) IS NOT NULL"), {'table': vector_table}
+                ).scalar()
                 conn.execute(text(vector_table_sql))
                 
-                # 添加外键约束（如果不存在）
-                try:
-                    fk_sql = f"""
+                if partition_by and table_exists:
+                    layout = PartitionLayout.detect(conn, vector_table)
+                    if layout is None or layout.scheme != partition_by:
+                        existing = layout.scheme if layout else '不分区'
+                        raise ValueError(f"表 {vector_table} 已存在且分区方式为 {existing}，"
+                                         f"不能按 {partition_by} 分区")
+                
+                # 添加外键约束（如果不存在；先查询而不是捕获错误回滚，回滚会释放咨询锁）
+                fk_exists = conn.execute(text("""
+                    SELECT EXISTS (SELECT 1 FROM pg_constraint
+                                   WHERE conname = :name AND conrelid = to_regclass(:table))
+                """), {'name': f"fk_{vector_table}_metadata_id", 'table': vector_table}).scalar()
+                if not fk_exists:
+                    conn.execute(text(f"""
                     ALTER TABLE {vector_table} 
                     ADD CONSTRAINT fk_{vector_table}_metadata_id 
                     FOREIGN KEY (metadata_id) REFERENCES {metadata_table}(id);
-                    """
-                    conn.execute(text(fk_sql))
-                except Exception as e:
-                    # 如果外键已存在，忽略错误并回滚事务
-                    self.logger.info(f"外键约束可能已存在: {e}")
-                    conn.rollback()
-                    # 重新开始事务
-                    conn.begin()
-                
-                # 创建索引
-                index_sql = f"""
-                -- 创建空间索引
-                CREATE INDEX IF NOT EXISTS idx_{vector_table}_geometry 
-                ON {vector_table} USING GIST (geometry);
-                
-                -- 创建JSONB索引
-                CREATE INDEX IF NOT EXISTS idx_{vector_table}_properties 
-                ON {vector_table} USING GIN (properties);
-                
-                -- 创建外键索引
-                CREATE INDEX IF NOT EXISTS idx_{vector_table}_metadata_id 
-                ON {vector_table} (metadata_id);
-                """
-                conn.execute(text(index_sql))
+                    """))
+                else:
+                    self.logger.info(f"外键约束已存在: fk_{vector_table}_metadata_id")
+                
+                index_statements = self._index_statements(vector_table, index_plan)
+                
+                if defer_indexes:
+                    is_populated = conn.execute(
+                        text(f"SELECT EXISTS (SELECT 1 FROM {vector_table})")
+                    ).scalar()
+                    if is_populated:
+                        self.logger.info(f"表 {vector_table} 已有数据，保留索引不推迟")
+                        defer_indexes = False
+                        
+                if defer_indexes:
+                    # 空表：删除已有索引，入库完成后再统一重建
+                    for index_name in index_statements:
+                        conn.execute(text(f"DROP INDEX IF EXISTS {index_name}"))
+                    self.logger.info(f"索引推迟到入库后创建: {vector_table}")
+                else:
+                    # 创建索引
+                    for index_sql in index_statements.values():
+                        conn.execute(text(index_sql))
                 
                 conn.commit()
                 
             self.logger.info(f"数据表创建成功: {vector_table}, {metadata_table}")
+            return defer_indexes
             
         except SQLAlchemyError as e:
             self.logger.error(f"数据表创建失败: {e}")
             raise
             
+    @contextmanager
+    def _import_lock(self, vector_table: str, exclusive: bool = False):
+        """
+        在独立连接上持有矢量数据表的会话级咨询锁，直到入库与推迟的索引重建完成
+        
+        推迟索引的入库需要删除并重建索引，持有排他锁：等待同表正在写入的任务结束，
+        期间其他任务不能开始写入；普通入库持有共享锁，可与同表的其他普通入库并行
+        
+        Args:
+            vector_table: 矢量数据表名
+            exclusive: 是否持有排他锁
+        """
+        suffix = '' if exclusive else '_shared'
+        with self.engine.connect() as conn:
+            conn.execute(text(f"SELECT pg_advisory_lock{suffix}(hashtext(:key))"), {'key': vector_table})
+            conn.commit()
+            try:
+                yield
+            finally:
+                conn.execute(text(f"SELECT pg_advisory_unlock{suffix}(hashtext(:key))"),
+                             {'key': vector_table})
+                conn.commit()
+                
+    def _build_index(self, index_sql: str, maintenance_work_mem: str) -> float:
+        """在独立连接中以调高的maintenance_work_mem建一个索引，返回耗时"""
+        start = time.perf_counter()
+        with self.engine.connect() as conn:
+            conn.execute(text(f"SET maintenance_work_mem = '{maintenance_work_mem}'"))
+            conn.execute(text(index_sql))
+            conn.commit()
+        return time.perf_counter() - start
+        
+    def build_indexes(self, vector_table: str, parallel: bool = True,
+                      index_plan: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        """
+        数据入库后创建索引（与create_tables(defer_indexes=True)配合使用）
+        
+        各索引在独立连接中并行创建，maintenance_work_mem取配置项
+        maintenance_work_mem（默认1GB）；几何索引未由配置指定时，
+        先按ANALYZE后的全表要素数与写入顺序空间局部性判断是否改用BRIN
+        
+        Args:
+            vector_table: 矢量数据表名
+            parallel: 是否并行创建各索引
+            index_plan: 索引计划，应与create_tables时一致
+            
+        Returns:
+            实际使用的索引计划
+        """
+        maintenance_work_mem = self.config.get('maintenance_work_mem', '1GB')
+        if index_plan is not None and not (self.config.get('index_plan') or {}).get('geometry'):
+            pages_per_range = int(self.config.get('brin_pages_per_range', 32))
+            with self.engine.connect() as conn:
+                statistics = table_statistics(conn, vector_table, pages_per_range)
+                conn.commit()
+            index_plan = revise_index_plan(index_plan, statistics)
+            self.logger.info(f"全表统计: {statistics}，几何索引: {index_plan['geometry']}")
+        index_statements = self._index_statements(vector_table, index_plan)
+        self.logger.info(f"开始创建索引: {list(index_statements)}，maintenance_work_mem={maintenance_work_mem}")
+        start = time.perf_counter()
+        
+        try:
+            max_workers = len(index_statements) if parallel else 1
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                futures = {
+                    executor.submit(self._build_index, index_sql, maintenance_work_mem): index_name
+                    for index_name, index_sql in index_statements.items()
+                }
+                for future in as_completed(futures):
+                    self.logger.info(f"索引 {futures[future]} 创建完成，耗时 {future.result():.2f}s")
+                    
+            with self.engine.connect() as conn:
+                conn.execute(text(f"ANALYZE {vector_table}"))
+                conn.commit()
+                
+            self.logger.info(f"索引创建完成，总耗时 {time.perf_counter() - start:.2f}s")
+            return index_plan
+            
+        except SQLAlchemyError as e:
+            self.logger.error(f"索引创建失败: {e}")
+            raise
+            
+    def create_hot_property_indexes(self, vector_table: str,
+                                    hot_properties: Optional[Dict[str, str]] = None,
+                                    mode: Optional[str] = None) -> Dict[str, str]:
+        """
+        为常用于过滤和排序的属性创建btree索引（入库后调用，已存在时跳过）
+        
+        index模式创建表达式索引 ((properties ->> 'mj')::double precision)，
+        查询中的 CAST(properties->>'mj' AS FLOAT) 可直接命中；
+        generated模式添加存储生成列 prop_<属性名> 并为其建索引（会重写一次表）；
+        typed存储模式下属性已是原生列时直接为该列建索引
+        
+        Args:
+            vector_table: 矢量数据表名
+            hot_properties: 属性名到目标类型的映射，如 {"mj": "double precision"}，
+                            默认取配置项hot_properties
+            mode: index / generated，默认取配置项hot_property_mode（未配置时为index）
+            
+        Returns:
+            属性名到索引名的映射（创建失败的属性不包含在内）
+        """
+        hot_properties = hot_properties or self.config.get('hot_properties') or {}
+        mode = mode or self.config.get('hot_property_mode', 'index')
+        if not hot_properties:
+            return {}
+        if mode not in HOT_PROPERTY_MODES:
+            raise ValueError(f"不支持的热点属性索引方式: {mode}，可选: {', '.join(HOT_PROPERTY_MODES)}")
+        for name, column_type in hot_properties.items():
+            if column_type not in HOT_PROPERTY_TYPES:
+                raise ValueError(f"热点属性 {name} 的类型 {column_type} 不支持，可选: {', '.join(HOT_PROPERTY_TYPES)}")
+                
+        maintenance_work_mem = self.config.get('maintenance_work_mem', '1GB')
+        with self.engine.connect() as conn:
+            existing_columns = self._table_columns(conn, vector_table)
+            
+        created = {}
+        for name, column_type in hot_properties.items():
+            suffix = re.sub(r'[^0-9a-zA-Z_]', '_', name).lower()
+            index_name = f"idx_{vector_table}_prop_{suffix}"
+            expression = property_expression(name, column_type)
+            try:
+                start = time.perf_counter()
+                if name.lower() not in RESERVED_COLUMNS and name in existing_columns:
+                    index_sql = f"CREATE INDEX IF NOT EXISTS {index_name} ON {vector_table} ({quote_identifier(name)})"
+                elif mode == 'generated':
+                    column = f"prop_{suffix}"
+                    with self.engine.connect() as conn:
+                        conn.execute(text(f"""
+                            ALTER TABLE {vector_table} ADD COLUMN IF NOT EXISTS {column} {column_type}
+                            GENERATED ALWAYS AS ({expression}) STORED
+                        """))
+                        conn.commit()
+                    index_sql = f"CREATE INDEX IF NOT EXISTS {index_name} ON {vector_table} ({column})"
+                else:
+                    index_sql = f"CREATE INDEX IF NOT EXISTS {index_name} ON {vector_table} ({expression})"
+                self._build_index(index_sql, maintenance_work_mem)
+                created[name] = index_name
+                self.logger.info(f"热点属性索引 {index_name} 就绪，耗时 {time.perf_counter() - start:.2f}s")
+            except SQLAlchemyError as e:
+                # 属性值无法转换为目标类型等情况只记录，不影响已完成的入库
+                self.logger.warning(f"热点属性 {name} 索引创建失败: {e}")
+                
+        if created:
+            # 表达式索引需要ANALYZE收集表达式的统计信息
+            with self.engine.connect() as conn:
+                conn.execute(text(f"ANALYZE {vector_table}"))
+                conn.commit()
+        return created
+        
+    def cluster_table(self, vector_table: str):
+        """
+        按空间索引物理重排整张表（CLUSTER），随后ANALYZE
+        
+        CLUSTER重写全表（含此前各次入库的数据）并在执行期间持有ACCESS EXCLUSIVE锁，
+        适合在批量入库完成后执行一次；之后新写入的数据不保持该顺序
+        
+        Args:
+            vector_table: 矢量数据表名
+        """
+        maintenance_work_mem = self.config.get('maintenance_work_mem', '1GB')
+        self.logger.info(f"开始按空间索引重排表: {vector_table}")
+        start = time.perf_counter()
+        try:
+            with self.engine.connect() as conn:
+                # BRIN / SP-GiST索引不支持CLUSTER
+                method = conn.execute(text("""
+                    SELECT am.amname FROM pg_class c JOIN pg_am am ON am.oid = c.relam
+                    WHERE c.oid = to_regclass(:index)
+                """), {'index': f"idx_{vector_table}_geometry"}).scalar()
+                if method != 'gist':
+                    self.logger.warning(f"空间索引类型为 {method}，不支持CLUSTER，跳过表重排")
+                    return
+                conn.execute(text(f"SET maintenance_work_mem = '{maintenance_work_mem}'"))
+                conn.execute(text(f"CLUSTER {vector_table} USING idx_{vector_table}_geometry"))
+                conn.execute(text(f"ANALYZE {vector_table}"))
+                conn.commit()
+            self.logger.info(f"表重排完成，耗时 {time.perf_counter() - start:.2f}s")
+        except SQLAlchemyError as e:
+            self.logger.error(f"表重排失败: {e}")
+            raise
+            
+    def build_lod_pyramid(self, vector_table: str, metadata_table: str, metadata_id: int,
+                          tolerances: Optional[List[float]] = None,
+                          workers: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        为一次入库的要素生成多级化简几何（LOD金字塔），写入伴随表 {vector_table}_lod{n}
+        
+        几何以服务端游标分块读出，在进程池中做保持拓扑的化简后COPY写入各级伴随表
+        （各级都从原始几何化简，与原始几何的偏差不超过该级容差）；
+        该次入库已有的化简几何先删除再重建（增量合并后调用即可刷新），
+        各级的表名、容差与顶点数记录在元数据additional_info的lod_levels中
+        
+        Args:
+            vector_table: 矢量数据表名
+            metadata_table: 元数据表名
+            metadata_id: 元数据ID
+            tolerances: 化简容差（度），默认取配置项lod_tolerances，未配置时不生成
+            workers: 化简进程数，默认取配置项lod_workers（未配置时为CPU核数）
+            
+        Returns:
+            各级的 level / table / tolerance / vertices / vertex_ratio
+        """
+        tolerances = tolerances or self.config.get('lod_tolerances')
+        if not tolerances:
+            return []
+        tolerances = sorted(float(tolerance) for tolerance in tolerances)
+        if tolerances[0] <= 0:
+            raise ValueError(f"化简容差必须大于0: {tolerances[0]}")
+        workers = workers or self.config.get('lod_workers') or os.cpu_count() or 1
+        chunk_size = self.config.get('lod_chunk_size', LOD_CHUNK_SIZE)
+        
+        self.logger.info(f"开始生成化简几何: {vector_table}，元数据ID {metadata_id}，容差 {tolerances}")
+        start = time.perf_counter()
+        try:
+            with self.engine.connect() as conn:
+                # 伴随表的建表与容差检查在矢量数据表的建表咨询锁下串行执行并单独提交，
+                # 避免并行入库的任务同时建同一张伴随表
+                conn.execute(text("SELECT pg_advisory_xact_lock(hashtext(:key))"),
+                             {'key': f"{vector_table}:ddl"})
+                tables = [ensure_lod_table(conn, vector_table, level, tolerance)
+                          for level, tolerance in enumerate(tolerances, 1)]
+                conn.commit()
+                for table in tables:
+                    conn.execute(text(f"DELETE FROM {table} WHERE metadata_id = :metadata_id"),
+                                 {'metadata_id': metadata_id})
+                    
+                # 读取使用独立连接：服务端游标在读取完成前不能随写入一起提交
+                raw_connection = conn.connection
+                read_connection = self.engine.raw_connection()
+                vertices = [0] * (len(tolerances) + 1)
+                try:
+                    chunks = iter_geometry_chunks(read_connection, vector_table, metadata_id, chunk_size)
+                    for ids, levels, counts in simplify_chunks(chunks, tolerances, workers):
+                        for table, geometries in zip(tables, levels):
+                            copy_rows(raw_connection, table, LOD_COLUMNS,
+                                      build_lod_buffer(ids, geometries, metadata_id), 'text')
+                        vertices = [total + int(count) for total, count in zip(vertices, counts)]
+                    read_connection.rollback()
+                finally:
+                    read_connection.close()
+                    
+                source_vertices = vertices[0]
+                summary = [
+                    {
+                        'level': level,
+                        'table': table,
+                        'tolerance': tolerance,
+                        'vertices': count,
+                        'vertex_ratio': round(count / source_vertices, 4) if source_vertices else None,
+                    }
+                    for level, (table, tolerance, count) in enumerate(zip(tables, tolerances, vertices[1:]), 1)
+                ]
+                self._update_additional_info(conn, metadata_table, metadata_id,
+                                             lod_levels=summary, lod_source_vertices=source_vertices)
+                self._commit(conn)
+                
+                for table in tables:
+                    conn.execute(text(f"ANALYZE {table}"))
+                conn.commit()
+        except SQLAlchemyError as e:
+            self.logger.error(f"化简几何生成失败: {e}")
+            raise
+            
+        ratios = ', '.join(f"{item['table']} {item['vertex_ratio']}" for item in summary)
+        self.logger.info(f"化简几何生成完成，原始顶点 {source_vertices}，各级顶点比例: {ratios}，"
+                         f"耗时 {time.perf_counter() - start:.2f}s")
+        return summary
+        
+    def subdivide_geometries(self, vector_table: str, metadata_table: str, metadata_id: int,
+                             max_vertices: Optional[int] = None) -> int:
+        """
+        将一次入库的要素以ST_Subdivide切分写入伴随表 {vector_table}_subdivided
+        
+        顶点数很多的面要素被切成外包框紧凑的小块，subdivide模块的query_intersects /
+        query_contains先在小块上判断；该次入库已有的小块先删除再重建
+        
+        Args:
+            vector_table: 矢量数据表名
+            metadata_table: 元数据表名
+            metadata_id: 元数据ID
+            max_vertices: 每块的最大顶点数，默认取配置项subdivide_max_vertices；
+                          未配置时若已有伴随表则按其表注释中的max_vertices切分，否则不切分
+            
+        Returns:
+            写入的小块数
+        """
+        max_vertices = max_vertices or self.config.get('subdivide_max_vertices')
+        if not max_vertices:
+            # 伴随表已存在时每次入库都需切分，否则查询辅助函数只能回到原始几何判断该次入库
+            with self.engine.connect() as conn:
+                max_vertices = subdivided_max_vertices(conn, vector_table)
+            if not max_vertices:
+                return 0
+        self.logger.info(f"开始切分几何: {vector_table}，元数据ID {metadata_id}，每块最多 {max_vertices} 个顶点")
+        start = time.perf_counter()
+        table = subdivided_table_name(vector_table)
+        try:
+            with self.engine.connect() as conn:
+                pieces = subdivide_import(conn, vector_table, metadata_id, max_vertices)
+                self._update_additional_info(conn, metadata_table, metadata_id,
+                                             subdivided={'table': table, 'max_vertices': max_vertices,
+                                                         'pieces': pieces})
+                conn.commit()
+                conn.execute(text(f"ANALYZE {table}"))
+                conn.commit()
+        except SQLAlchemyError as e:
+            self.logger.error(f"几何切分失败: {e}")
+            raise
+        self.logger.info(f"几何切分完成，共 {pieces} 块，耗时 {time.perf_counter() - start:.2f}s")
+        return pieces
+        
+    def _import_bbox(self, metadata_table: str, metadata_id: int) -> Optional[Tuple[float, ...]]:
+        """元数据记录中一次入库的外包框，无记录或无范围时返回None"""
+        with self.engine.connect() as conn:
+            row = conn.execute(text(f"""
+                SELECT bbox_minx, bbox_miny, bbox_maxx, bbox_maxy FROM {metadata_table} WHERE id = :metadata_id
+            """), {'metadata_id': metadata_id}).fetchone()
+        if row is None or any(value is None for value in row):
+            return None
+        return tuple(row)
+        
+    def refresh_tile_cache(self, vector_table: str,
+                           *bboxes: Optional[Tuple[float, ...]]) -> Optional[Dict[str, Any]]:
+        """
+        失效并重建瓦片缓存中与给定范围相交的瓦片（配置项tile_cache未设置时不处理）
+        
+        tile_cache配置示例：{"path": "tiles/{vector_table}.mbtiles", "min_zoom": 0, "max_zoom": 12,
+        "workers": 4, "rebuild": true}；rebuild为false时只删除受影响的瓦片
+        瓦片刷新失败只记录警告，不影响已完成的入库
+        
+        Args:
+            vector_table: 矢量数据表名
+            bboxes: 受影响的范围（EPSG:4326），多个范围时取并集
+            
+        Returns:
+            瓦片刷新统计，未刷新时返回None
+        """
+        tile_config = self.config.get('tile_cache')
+        bboxes = [bbox for bbox in bboxes if bbox is not None]
+        if not tile_config or not bboxes:
+            return None
+        bbox = (min(b[0] for b in bboxes), min(b[1] for b in bboxes),
+                max(b[2] for b in bboxes), max(b[3] for b in bboxes))
+        
+        try:
+            cache = open_tile_cache(tile_config['path'].format(vector_table=vector_table),
+                                    tile_config.get('format'))
+            generator = TileGenerator(self.engine, vector_table, cache, tile_config.get('layer'),
+                                      min_zoom=tile_config.get('min_zoom', 0),
+                                      max_zoom=tile_config.get('max_zoom', 14),
+                                      workers=tile_config.get('workers', 4), logger=self.logger)
+            try:
+                if tile_config.get('rebuild', True):
+                    stats = generator.refresh(bbox)
+                else:
+                    stats = {'invalidated': generator.invalidate(bbox)}
+            finally:
+                cache.close()
+        except (SQLAlchemyError, OSError, sqlite3.Error) as e:
+            self.logger.warning(f"瓦片缓存刷新失败: {e}")
+            return None
+        self.logger.info(f"瓦片缓存已刷新: {stats}")
+        return stats
+        
     def extract_metadata(self, gdf: gpd.GeoDataFrame, file_path: str, 
                         source_crs: str, target_crs: str) -> Dict[str, Any]:
         """
@@ -283,51 +948,754 @@ class VectorToPostGIS:
             元数据字典
         """
         try:
-            # 获取文件信息
-            file_stat = os.stat(file_path)
-            
-            # 获取几何信息
-            bbox = gdf.total_bounds  # [minx, miny, maxx, maxy]
-            geometry_types = gdf.geometry.geom_type.unique()
-            
-            # 获取属性字段信息
-            properties_schema = {}
-            null_counts = {}
-            for col in gdf.columns:
-                if col != 'geometry':
-                    properties_schema[col] = str(gdf[col].dtype)
-                    null_counts[col] = int(gdf[col].isnull().sum())
-                    
-            metadata = {
-                'file_name': os.path.basename(file_path),
-                'file_path': file_path,
-                'file_size': int(file_stat.st_size),
-                'file_format': os.path.splitext(file_path)[1].lower(),
-                'source_crs': source_crs,
-                'target_crs': target_crs,
-                'feature_count': int(len(gdf)),
-                'geometry_type': ','.join(geometry_types),
-                'bbox_minx': float(bbox[0]),
-                'bbox_miny': float(bbox[1]),
-                'bbox_maxx': float(bbox[2]),
-                'bbox_maxy': float(bbox[3]),
-                'properties_schema': json.dumps(properties_schema, ensure_ascii=False),
-                'additional_info': json.dumps({
-                    'crs_info': str(gdf.crs),
-                    'memory_usage': int(gdf.memory_usage(deep=True).sum()),
-                    'null_counts': null_counts
-                }, ensure_ascii=False)
+            accumulator = MetadataAccumulator(file_path, source_crs, target_crs, deep_memory=True)
+            return accumulator.update(gdf).to_metadata()
+            
+        except Exception as e:
+            self.logger.error(f"元数据提取失败: {e}")
+            raise
+            
+    def _serialize_properties(self, batch_gdf: gpd.GeoDataFrame) -> List[str]:
+        """
+        将一批要素的属性序列化为JSON字符串（按列向量化，NaN转换为null）
+        
+        Args:
+            batch_gdf: 批次GeoDataFrame
+            
+        Returns:
+            与批次等长的JSON字符串列表
+        """
+        return serialize_properties(batch_gdf.drop(columns='geometry'))
+        
+    def _insert_batch(self, conn, batch_gdf: gpd.GeoDataFrame, vector_table: str,
+                      metadata_id: int, commit: bool = True) -> int:
+        """使用多行INSERT写入一个批次，返回写入条数"""
+        properties_json = self._serialize_properties(batch_gdf)
+        geometries = encode_geometries(batch_gdf.geometry, hex=True)
+        batch_data = [
+            {
+                'geometry': geometry,
+                'properties': properties,
+                'metadata_id': metadata_id
             }
+            for geometry, properties in zip(geometries, properties_json)
+        ]
+        
+        if batch_data:
+            insert_sql = f"""
+            INSERT INTO {vector_table} (geometry, properties, metadata_id)
+            VALUES (:geometry, :properties, :metadata_id);
+            """
+            
+            conn.execute(text(insert_sql), batch_data)
+            if commit:
+                conn.commit()
+        return len(batch_data)
+        
+    def _copy_batch(self, conn, batch_gdf: gpd.GeoDataFrame, vector_table: str,
+                    metadata_id: int, load_method: str, commit: bool = True) -> int:
+        """使用 COPY ... FROM STDIN 写入一个批次，返回写入条数"""
+        properties_json = self._serialize_properties(batch_gdf)
+        if load_method == 'copy_binary':
+            geometries = encode_geometries(batch_gdf.geometry)
+            buffer = build_binary_buffer(geometries, properties_json, metadata_id)
+            copy_format = 'binary'
+        else:
+            geometries = encode_geometries(batch_gdf.geometry, hex=True)
+            buffer = build_csv_buffer(geometries, properties_json, metadata_id)
+            copy_format = 'csv'
+        
+        # COPY走psycopg2原生连接，由原生连接直接提交
+        raw_connection = conn.connection
+        copy_rows(raw_connection, vector_table, COPY_COLUMNS, buffer, copy_format)
+        if commit:
+            raw_connection.commit()
+        return len(properties_json)
+        
+    def _copy_typed_batch(self, conn, batch_gdf: gpd.GeoDataFrame, vector_table: str,
+                          metadata_id: int, column_types: Dict[str, str], commit: bool = True) -> int:
+        """类型化存储模式：以COPY文本格式写入类型化列与properties溢出列，返回写入条数"""
+        attributes = batch_gdf.drop(columns='geometry')
+        overflow_columns = [col for col in attributes.columns if col not in column_types]
+        geometries = encode_geometries(batch_gdf.geometry, hex=True)
+        buffer = build_typed_text_buffer(geometries, attributes, column_types,
+                                         overflow_columns, metadata_id)
+        
+        raw_connection = conn.connection
+        copy_rows(raw_connection, vector_table, typed_copy_columns(column_types), buffer, 'text')
+        if commit:
+            raw_connection.commit()
+        return len(attributes)
+        
+    def _table_columns(self, conn, table: str) -> Dict[str, str]:
+        """表的现有列及其类型（format_type格式）"""
+        return dict(conn.execute(text("""
+            SELECT a.attname, format_type(a.atttypid, a.atttypmod)
+            FROM pg_attribute a
+            WHERE a.attrelid = to_regclass(:table) AND a.attnum > 0 AND NOT a.attisdropped
+        """), {'table': table}).fetchall())
+        
+    def _prepare_typed_columns(self, conn, vector_table: str,
+                               gdf: gpd.GeoDataFrame) -> Dict[str, str]:
+        """
+        类型化存储模式：按字段类型为矢量数据表补充原生列（DDL单独提交）
+        
+        已有同名列时沿用其类型（bigint列遇到小数时放宽为double precision）；
+        无法映射或与已有列类型冲突的字段写入properties溢出列，
+        配置jsonb_overflow为false时无法映射的字段存为text列
+        
+        Args:
+            conn: 数据库连接
+            vector_table: 矢量数据表名
+            gdf: 用于推断字段类型的数据（分块入库时为首个分块）
+            
+        Returns:
+            写入类型化列的字段及列类型
+        """
+        jsonb_overflow = self.config.get('jsonb_overflow', True)
+        existing_types = self._table_columns(conn, vector_table)
+        
+        column_types = {}
+        for name, column_type in infer_column_types(gdf.drop(columns='geometry')).items():
+            if column_type is None:
+                if jsonb_overflow:
+                    continue
+                if name.lower() in RESERVED_COLUMNS:
+                    raise ValueError(f"字段 {name} 与固定列同名，需启用jsonb_overflow写入properties")
+                column_type = TEXT
+                
+            existing_type = existing_types.get(name)
+            column = quote_identifier(name)
+            if existing_type is None:
+                conn.execute(text(f"ALTER TABLE {vector_table} ADD COLUMN IF NOT EXISTS {column} {column_type}"))
+                column_types[name] = column_type
+            elif is_compatible(existing_type, column_type):
+                column_types[name] = existing_type
+            elif (existing_type, column_type) == (BIGINT, DOUBLE):
+                self.logger.warning(f"列 {name} 由bigint放宽为double precision")
+                conn.execute(text(f"ALTER TABLE {vector_table} ALTER COLUMN {column} TYPE {DOUBLE}"))
+                column_types[name] = DOUBLE
+            elif jsonb_overflow:
+                self.logger.warning(f"字段 {name}({column_type}) 与已有列类型({existing_type})不一致，写入properties")
+            else:
+                raise ValueError(f"字段 {name}({column_type}) 与已有列类型({existing_type})不一致")
+        conn.commit()
+        
+        overflow_count = len(gdf.columns) - 1 - len(column_types)
+        self.logger.info(f"类型化列 {len(column_types)} 个，写入properties溢出列的字段 {overflow_count} 个")
+        return column_types
+        
+    def _fit_typed_columns(self, conn, tables: List[str], chunk: gpd.GeoDataFrame,
+                           column_types: Dict[str, str]) -> Dict[str, str]:
+        """
+        分块入库：检查当前分块的值能否写入类型化列（列类型按首个分块推断，不提交）
+        
+        bigint列遇到小数或超出范围的整数时放宽为double precision（同时更新column_types）；
+        其他类型不一致的字段在该分块中写入properties溢出列，不中断入库
+        
+        Args:
+            conn: 数据库连接
+            tables: 需放宽列类型的表（经暂存表入库时为暂存表，目标表在发布时放宽）
+            chunk: 当前分块
+            column_types: 类型化字段及列类型
+            
+        Returns:
+            该分块写入类型化列的字段及列类型
+        """
+        chunk_types = {}
+        for name, column_type in list(column_types.items()):
+            if name not in chunk.columns:
+                continue
+            values = chunk[name]
+            if fits_column(values, column_type):
+                chunk_types[name] = column_type
+            elif column_type == BIGINT and infer_column_type(values) in (BIGINT, DOUBLE):
+                self.logger.warning(f"列 {name} 由bigint放宽为double precision")
+                for table in tables:
+                    # 同表的其他入库任务可能已放宽该列
+                    if self._table_columns(conn, table).get(name) == BIGINT:
+                        conn.execute(text(f"ALTER TABLE {table} ALTER COLUMN {quote_identifier(name)} TYPE {DOUBLE}"))
+                column_types[name] = chunk_types[name] = DOUBLE
+            else:
+                self.logger.warning(f"字段 {name} 在当前分块中的值无法写入{column_type}列，写入properties")
+        return chunk_types
+        
+    def _with_sort_key(self, chunk: gpd.GeoDataFrame, spatial_order: str,
+                       sort_bounds: Optional[Tuple[float, float, float, float]]) -> gpd.GeoDataFrame:
+        """为分块附加空间排序编码列（空几何的编码为空值）"""
+        keys = spatial_sort_keys(chunk.geometry.values, spatial_order, sort_bounds)
+        values = pd.Series(keys.astype('int64'), index=chunk.index, dtype='Int64')
+        return chunk.assign(**{STAGING_SORT_COLUMN: values.mask(keys == np.iinfo(np.uint64).max)})
+        
+    def _insert_metadata(self, conn, metadata: Dict[str, Any], metadata_table: str,
+                         metadata_id: Optional[int] = None, commit: bool = True) -> int:
+        """插入元数据记录，返回元数据ID（metadata_id为预留的ID时按该ID插入）"""
+        id_column = "id, " if metadata_id is not None else ""
+        id_value = ":metadata_id, " if metadata_id is not None else ""
+        metadata_sql = f"""
+        INSERT INTO {metadata_table} (
+            {id_column}file_name, file_path, file_size, file_format, source_crs, target_crs,
+            feature_count, geometry_type, bbox_minx, bbox_miny, bbox_maxx, bbox_maxy,
+            properties_schema, additional_info
+        ) VALUES (
+            {id_value}:file_name, :file_path, :file_size, :file_format, :source_crs, :target_crs,
+            :feature_count, :geometry_type, :bbox_minx, :bbox_miny, :bbox_maxx, :bbox_maxy,
+            :properties_schema, :additional_info
+        ) RETURNING id;
+        """
+        
+        result = conn.execute(text(metadata_sql), dict(metadata, metadata_id=metadata_id))
+        metadata_id = result.fetchone()[0]
+        if commit:
+            conn.commit()
+        
+        self.logger.info(f"元数据插入成功，ID: {metadata_id}")
+        return metadata_id
+        
+    def _update_metadata(self, conn, metadata_id: int, metadata: Dict[str, Any],
+                         metadata_table: str):
+        """用最终统计结果更新元数据记录（分块入库完成后调用）"""
+        update_sql = f"""
+        UPDATE {metadata_table} SET
+            feature_count = :feature_count, geometry_type = :geometry_type,
+            bbox_minx = :bbox_minx, bbox_miny = :bbox_miny,
+            bbox_maxx = :bbox_maxx, bbox_maxy = :bbox_maxy,
+            properties_schema = :properties_schema, additional_info = :additional_info
+        WHERE id = :metadata_id;
+        """
+        conn.execute(text(update_sql), dict(metadata, metadata_id=metadata_id))
+        conn.commit()
+        
+    def _write_features(self, conn, gdf: gpd.GeoDataFrame, vector_table: str,
+                        metadata_id: int, batch_size: int, load_method: str,
+                        commit: bool = True,
+                        checkpoint: Optional[ImportCheckpoint] = None,
+                        column_types: Optional[Dict[str, str]] = None,
+                        layout: Optional[PartitionLayout] = None) -> int:
+        """
+        按批次写入要素，返回写入条数（commit为False时不逐批提交）
+        
+        指定checkpoint时，每批数据与检查点偏移量在同一事务中提交；
+        指定column_types时按类型化存储模式写入；
+        指定layout时每批按子分区分组后直接写入各子分区，缺少的子分区随该批一起创建
+        """
+        total_features = len(gdf)
+        inserted_count = 0
+        batch_commit = commit and checkpoint is None
+        
+        for i in range(0, total_features, batch_size):
+            batch_gdf = gdf.iloc[i:i+batch_size]
+            if layout is not None:
+                targets = layout.route(conn, vector_table, batch_gdf, metadata_id)
+            else:
+                targets = [(vector_table, batch_gdf)]
+                
+            batch_count = 0
+            if layout is not None and not layout.unlogged:
+                # grid分区：记录最大要素外包框半边长（与该批数据一起提交），供查询裁剪分区
+                layout.record_margin(conn, vector_table)
+            for target_table, target_gdf in targets:
+                if column_types is not None:
+                    batch_count += self._copy_typed_batch(conn, target_gdf, target_table,
+                                                          metadata_id, column_types, commit=False)
+                elif load_method == 'insert':
+                    batch_count += self._insert_batch(conn, target_gdf, target_table,
+                                                      metadata_id, commit=False)
+                else:
+                    batch_count += self._copy_batch(conn, target_gdf, target_table,
+                                                    metadata_id, load_method, commit=False)
+            if batch_commit:
+                self._commit(conn)
+            inserted_count += batch_count
+            if checkpoint is not None:
+                checkpoint.advance(conn, batch_count)
+                self._commit(conn)
+            self.logger.info(f"已插入 {inserted_count}/{total_features} 条记录")
+        return inserted_count
+        
+    def _resolve_load_method(self, load_method: Optional[str]) -> str:
+        """确定入库方式，未指定时取配置项load_method"""
+        load_method = load_method or self.config.get('load_method', 'insert')
+        if load_method not in LOAD_METHODS:
+            raise ValueError(f"不支持的入库方式: {load_method}，可选: {', '.join(LOAD_METHODS)}")
+        return load_method
+        
+    def _resolve_storage_mode(self, storage_mode: Optional[str]) -> str:
+        """确定存储模式，未指定时取配置项storage_mode"""
+        storage_mode = storage_mode or self.config.get('storage_mode', 'jsonb')
+        if storage_mode not in STORAGE_MODES:
+            raise ValueError(f"不支持的存储模式: {storage_mode}，可选: {', '.join(STORAGE_MODES)}")
+        return storage_mode
+        
+    def _resolve_spatial_order(self, spatial_order: Optional[str]) -> Optional[str]:
+        """确定空间排序方式，未指定时取配置项spatial_order，none表示不排序"""
+        spatial_order = spatial_order or self.config.get('spatial_order')
+        if not spatial_order or spatial_order == 'none':
+            return None
+        if spatial_order not in SPATIAL_ORDERS:
+            raise ValueError(f"不支持的空间排序方式: {spatial_order}，可选: {', '.join(SPATIAL_ORDERS)}")
+        return spatial_order
+        
+    def _partition_layout(self, conn, vector_table: str) -> Optional[PartitionLayout]:
+        """读取矢量数据表的分区方式（每次入库新建，子分区缓存只在本次入库内有效）"""
+        return PartitionLayout.detect(conn, vector_table,
+                                      self.config.get('partition_grid_level', DEFAULT_GRID_LEVEL))
+        
+    def detach_import(self, vector_table: str, metadata_id: int) -> str:
+        """
+        将一次入库的数据从按metadata_id分区的矢量数据表中分离为独立的表（可归档或导出）
+        
+        Args:
+            vector_table: 矢量数据表名
+            metadata_id: 元数据ID
+            
+        Returns:
+            分离出的表名
+        """
+        with self.engine.connect() as conn:
+            layout = self._partition_layout(conn, vector_table)
+            if layout is None or layout.scheme != 'metadata_id':
+                raise ValueError(f"表 {vector_table} 不是按metadata_id分区的表")
+            partition = layout.partition_name(vector_table, metadata_id)
+            conn.execute(text(f"ALTER TABLE {vector_table} DETACH PARTITION {partition}"))
+            conn.commit()
+        self.logger.info(f"分区已分离: {partition}")
+        return partition
+        
+    def drop_import(self, vector_table: str, metadata_table: str, metadata_id: int) -> int:
+        """
+        删除一次入库的全部要素及其元数据记录
+        
+        按metadata_id分区的表直接DETACH并DROP该分区，不逐行删除；
+        其他表以DELETE删除（按metadata_id索引定位）；化简几何与切分伴随表中的对应要素一并删除
+        
+        Args:
+            vector_table: 矢量数据表名
+            metadata_table: 元数据表名
+            metadata_id: 元数据ID
             
+        Returns:
+            删除的要素条数
+        """
+        bbox = self._import_bbox(metadata_table, metadata_id)
+        with self.engine.connect() as conn:
+            layout = self._partition_layout(conn, vector_table)
+            if layout is not None and layout.scheme == 'metadata_id':
+                partition = layout.partition_name(vector_table, metadata_id)
+                exists = conn.execute(
+                    text("SELECT to_regclass(:table) IS NOT NULL"), {'table': partition}
+                ).scalar()
+                deleted = 0
+                if exists:
+                    deleted = conn.execute(text(f"SELECT COUNT(*) FROM {partition}")).scalar()
+                    conn.execute(text(f"ALTER TABLE {vector_table} DETACH PARTITION {partition}"))
+                    conn.execute(text(f"DROP TABLE {partition}"))
+            else:
+                deleted = conn.execute(text(f"DELETE FROM {vector_table} WHERE metadata_id = :metadata_id"),
+                                       {'metadata_id': metadata_id}).rowcount
+            companion_tables = [table for table, _ in lod_levels(conn, vector_table)]
+            if has_subdivided_table(conn, vector_table):
+                companion_tables.append(subdivided_table_name(vector_table))
+            for table in companion_tables:
+                conn.execute(text(f"DELETE FROM {table} WHERE metadata_id = :metadata_id"),
+                             {'metadata_id': metadata_id})
+            conn.execute(text(f"DELETE FROM {metadata_table} WHERE id = :metadata_id"),
+                         {'metadata_id': metadata_id})
+            conn.commit()
+        self.logger.info(f"已删除元数据ID {metadata_id} 的 {deleted} 条要素")
+        self.refresh_tile_cache(vector_table, bbox)
+        return deleted
+        
+    def _commit(self, conn):
+        """提交事务：SQLAlchemy事务与COPY使用的原生连接事务一并提交"""
+        conn.commit()
+        conn.connection.commit()
+        
+    def _rollback(self, conn):
+        """回滚事务：SQLAlchemy事务与COPY使用的原生连接事务一并回滚"""
+        conn.rollback()
+        conn.connection.rollback()
+        
+    def _with_additional_info(self, metadata: Dict[str, Any], **items) -> Dict[str, Any]:
+        """将文件指纹、类型化列等信息写入元数据的additional_info（值为None的项忽略）"""
+        items = {key: value for key, value in items.items() if value is not None}
+        if not items:
             return metadata
+        additional_info = json.loads(metadata.get('additional_info') or '{}')
+        additional_info.update(items)
+        return dict(metadata, additional_info=json.dumps(additional_info, ensure_ascii=False))
+        
+    def _update_additional_info(self, conn, metadata_table: str, metadata_id: int, **items):
+        """将入库后生成的信息合并到已有元数据记录的additional_info（不提交）"""
+        conn.execute(text(f"""
+            UPDATE {metadata_table}
+            SET additional_info = COALESCE(additional_info, '{{}}'::jsonb) || CAST(:items AS JSONB)
+            WHERE id = :metadata_id
+        """), {'items': json.dumps(items, ensure_ascii=False), 'metadata_id': metadata_id})
+        
+    def _record_index_plan(self, metadata_table: str, metadata_id: int, index_plan: Dict[str, Any]):
+        """入库后修订的索引计划写入元数据additional_info"""
+        with self.engine.connect() as conn:
+            self._update_additional_info(conn, metadata_table, metadata_id, index_plan=index_plan)
+            conn.commit()
             
-        except Exception as e:
-            self.logger.error(f"元数据提取失败: {e}")
+    def _find_previous_import(self, file_path: str, source_crs: str, target_crs: str,
+                              vector_table: str, metadata_table: str):
+        """
+        查找同一文件以相同坐标系最近一次完整入库的元数据记录
+        
+        指纹只在入库完成时写入元数据，因此中断的入库不会被视为已入库
+        
+        Returns:
+            包含id与fingerprint的记录，未入库过时返回None
+        """
+        with self.engine.connect() as conn:
+            tables_exist = conn.execute(
+                text("SELECT to_regclass(:metadata_table) IS NOT NULL AND to_regclass(:vector_table) IS NOT NULL"),
+                {'metadata_table': metadata_table, 'vector_table': vector_table}
+            ).scalar()
+            if not tables_exist:
+                return None
+                
+            row = conn.execute(text(f"""
+                SELECT m.id, m.additional_info -> 'fingerprint' AS fingerprint
+                FROM {metadata_table} m
+                WHERE m.file_path = :file_path
+                  AND m.source_crs = :source_crs AND m.target_crs = :target_crs
+                  AND m.additional_info -> 'fingerprint' IS NOT NULL
+                  AND EXISTS (SELECT 1 FROM {vector_table} v WHERE v.metadata_id = m.id)
+                ORDER BY m.id DESC
+                LIMIT 1
+            """), {'file_path': file_path, 'source_crs': source_crs, 'target_crs': target_crs}).fetchone()
+        return row
+        
+    def _find_unchanged_import(self, file_path: str, source_crs: str, target_crs: str,
+                               vector_table: str, metadata_table: str) -> Tuple[Optional[int], Dict[str, Any]]:
+        """
+        查找同一文件以相同坐标系完整入库、且文件未变化的元数据记录
+        
+        Returns:
+            (元数据ID, 当前文件指纹)，文件有变化或未入库过时元数据ID为None；
+            内容哈希只在大小与上次入库一致、修改时间不同时计算
+        """
+        row = self._find_previous_import(file_path, source_crs, target_crs,
+                                         vector_table, metadata_table)
+        unchanged, fingerprint = check_fingerprint(row.fingerprint if row is not None else None, file_path)
+        return (row.id if unchanged else None), fingerprint
+        
+    def _find_checkpoint(self, conn, file_path: str, vector_table: str,
+                         metadata_table: str) -> Optional[ImportCheckpoint]:
+        """续传时查找未完成的检查点（文件指纹不一致时视为新文件重新入库）"""
+        checkpoint_table = f"{metadata_table}_checkpoint"
+        ImportCheckpoint.ensure_table(conn, checkpoint_table)
+        conn.commit()
+        checkpoint = ImportCheckpoint.find(conn, checkpoint_table, file_path, vector_table,
+                                           file_stats(file_path))
+        if checkpoint is None:
+            self.logger.info("未找到可续传的检查点，从头开始入库")
+        else:
+            self.logger.info(f"从检查点续传，元数据ID: {checkpoint.metadata_id}，"
+                             f"已提交 {checkpoint.rows_committed} 条记录")
+        return checkpoint
+        
+    def _start_checkpointed_import(self, conn, metadata: Dict[str, Any], file_path: str,
+                                   vector_table: str, metadata_table: str) -> ImportCheckpoint:
+        """插入元数据记录并新建检查点，两者在同一事务中提交"""
+        metadata_id = self._insert_metadata(conn, metadata, metadata_table, commit=False)
+        checkpoint = ImportCheckpoint.create(conn, f"{metadata_table}_checkpoint", metadata_id,
+                                             file_path, vector_table, file_stats(file_path))
+        conn.commit()
+        return checkpoint
+        
+    def _load_via_staging(self, conn, chunks: Iterable[gpd.GeoDataFrame], vector_table: str,
+                          metadata_table: str, metadata_factory: Callable[[], Dict[str, Any]],
+                          batch_size: int, load_method: str,
+                          column_types: Optional[Dict[str, str]] = None,
+                          spatial_order: Optional[str] = None,
+                          sort_bounds: Optional[Tuple[float, float, float, float]] = None) -> Tuple[int, int]:
+        """
+        经UNLOGGED暂存表入库，校验条数后在单个事务中发布
+        
+        暂存表不建索引、不写WAL、不逐批提交；发布事务内插入元数据并
+        INSERT ... SELECT 到目标表，读者不会看到部分数据或孤立的元数据记录
+        
+        Args:
+            conn: 数据库连接
+            chunks: 已完成坐标转换的GeoDataFrame序列
+            vector_table: 矢量数据表名
+            metadata_table: 元数据表名
+            metadata_factory: 全部分块写入后调用，返回最终元数据字典
+            batch_size: 批量写入大小
+            load_method: 入库方式
+            column_types: 类型化存储模式的字段列类型（需在调用前补充到目标表）
+            spatial_order: 空间排序方式，hilbert / zorder；各分块的编码随要素写入暂存表，
+                           发布时按编码整体排序后写入目标表
+            sort_bounds: 编码网格范围，各分块使用同一范围使编码可比较
+            
+        Returns:
+            (发布的要素条数, 元数据ID)
+        """
+        staging_table = f"{vector_table}_staging_{os.getpid()}_{int(time.time())}"
+        layout = self._partition_layout(conn, vector_table)
+        staging_layout = None
+        if layout is not None and layout.scheme == 'grid':
+            # grid分区：暂存表同样按瓦片分区（子分区为UNLOGGED），写入时带上分区键
+            staging_layout = PartitionLayout('grid', layout.grid_level, unlogged=True)
+            conn.execute(text(
+                f"CREATE TABLE {staging_table} (LIKE {vector_table} INCLUDING DEFAULTS) "
+                f"PARTITION BY LIST ({GRID_COLUMN})"
+            ))
+        else:
+            conn.execute(text(
+                f"CREATE UNLOGGED TABLE {staging_table} (LIKE {vector_table} INCLUDING DEFAULTS)"
+            ))
+        if spatial_order:
+            # 空间排序编码只存在于暂存表，发布时不写入目标表
+            conn.execute(text(f"ALTER TABLE {staging_table} ADD COLUMN {STAGING_SORT_COLUMN} bigint"))
+        # 预留元数据ID（不提交元数据记录），暂存数据直接使用该ID
+        metadata_id = conn.execute(text(
+            f"SELECT nextval(pg_get_serial_sequence('{metadata_table}', 'id'))"
+        )).scalar()
+        self._commit(conn)
+        self.logger.info(f"暂存表创建成功: {staging_table}，预留元数据ID: {metadata_id}")
+        
+        try:
+            inserted_count = 0
+            for chunk in chunks:
+                chunk_types = None
+                if column_types is not None:
+                    chunk_types = self._fit_typed_columns(conn, [staging_table], chunk, column_types)
+                if spatial_order:
+                    # 编码作为类型化列写入（jsonb存储模式下属性全部写入properties）
+                    chunk = self._with_sort_key(chunk, spatial_order, sort_bounds)
+                    chunk_types = {**(chunk_types or {}), STAGING_SORT_COLUMN: BIGINT}
+                inserted_count += self._write_features(conn, chunk, staging_table, metadata_id,
+                                                       batch_size, load_method, commit=False,
+                                                       column_types=chunk_types,
+                                                       layout=staging_layout)
+            self._commit(conn)
+            
+            # 校验暂存数据条数
+            metadata = metadata_factory()
+            staged_count = conn.execute(text(f"SELECT COUNT(*) FROM {staging_table}")).scalar()
+            if staged_count != inserted_count or staged_count != metadata['feature_count']:
+                raise ValueError(
+                    f"暂存数据条数校验失败: 暂存表{staged_count}条，写入{inserted_count}条，"
+                    f"元数据{metadata['feature_count']}条"
+                )
+                
+            # 单个事务中发布：元数据 + 要素数据
+            self._insert_metadata(conn, metadata, metadata_table, metadata_id, commit=False)
+            partition_columns = []
+            if layout is not None:
+                # 目标表缺少的子分区在发布事务中创建，INSERT ... SELECT 由服务端按分区键路由
+                if layout.scheme == 'grid':
+                    partition_columns = [GRID_COLUMN]
+                    cells = conn.execute(text(f"SELECT DISTINCT {GRID_COLUMN} FROM {staging_table}")).scalars()
+                    for cell in cells.all():
+                        layout.ensure_partition(conn, vector_table, cell)
+                    layout.record_margin(conn, vector_table, staging_layout.observed_margin)
+                else:
+                    layout.ensure_partition(conn, vector_table, metadata_id)
+            if column_types:
+                # 暂存期间放宽过的列（bigint -> double precision）在发布事务中同样放宽目标表
+                target_types = self._table_columns(conn, vector_table)
+                for name, column_type in column_types.items():
+                    if (target_types.get(name), column_type) == (BIGINT, DOUBLE):
+                        self.logger.warning(f"列 {name} 由bigint放宽为double precision")
+                        conn.execute(text(
+                            f"ALTER TABLE {vector_table} ALTER COLUMN {quote_identifier(name)} TYPE {DOUBLE}"
+                        ))
+            columns = ', '.join(['id', 'geometry', 'properties', 'metadata_id', 'created_at', 'updated_at']
+                                + partition_columns
+                                + [quote_identifier(name) for name in column_types or {}])
+            # 空几何没有编码（NULL），升序排序时排在最后
+            order_clause = f"ORDER BY {STAGING_SORT_COLUMN}" if spatial_order else ""
+            conn.execute(text(f"""
+                INSERT INTO {vector_table} ({columns})
+                SELECT {columns}
+                FROM {staging_table}
+                {order_clause}
+            """))
+            conn.execute(text(f"DROP TABLE {staging_table}"))
+            conn.commit()
+            self.logger.info(f"暂存数据发布完成: {staging_table} -> {vector_table}，{staged_count} 条记录")
+            return staged_count, metadata_id
+            
+        except Exception:
+            self._rollback(conn)
+            conn.execute(text(f"DROP TABLE IF EXISTS {staging_table}"))
+            conn.commit()
+            raise
+            
+    def _feature_hash_sql(self, alias: str) -> str:
+        """要素哈希表达式：几何WKB与属性JSONB文本的md5"""
+        return (f"md5(COALESCE(ST_AsBinary({alias}.geometry), ''::bytea) || "
+                f"convert_to(COALESCE({alias}.properties::text, ''), 'UTF8'))")
+        
+    def _merge_via_temp_table(self, conn, chunks: Iterable[gpd.GeoDataFrame], vector_table: str,
+                              metadata_id: int, merge_key: str, batch_size: int,
+                              load_method: str) -> Dict[str, int]:
+        """
+        按稳定要素ID增量合并到已入库的数据（不提交，由调用方与元数据更新一起提交）
+        
+        新数据先写入临时表，再以集合操作只执行需要的更新、删除与插入；
+        要素哈希（几何WKB与属性的md5）一致的要素不改写
+        
+        Args:
+            conn: 数据库连接
+            chunks: 已完成坐标转换的GeoDataFrame序列
+            vector_table: 矢量数据表名
+            metadata_id: 合并目标的元数据ID
+            merge_key: 作为要素ID的属性字段名
+            batch_size: 批量写入大小
+            load_method: 入库方式
+            
+        Returns:
+            inserted / updated / deleted / unchanged 条数
+        """
+        key_sql = "properties ->> '{}'".format(merge_key.replace("'", "''"))
+        temp_table = f"merge_{os.getpid()}_{int(time.time())}"
+        conn.execute(text(f"""
+            CREATE TEMP TABLE {temp_table} ON COMMIT DROP AS
+            SELECT geometry, properties, metadata_id FROM {vector_table} WITH NO DATA
+        """))
+        
+        staged_count = 0
+        for chunk in chunks:
+            staged_count += self._write_features(conn, chunk, temp_table, metadata_id,
+                                                 batch_size, load_method, commit=False)
+        conn.execute(text(f"CREATE INDEX ON {temp_table} (({key_sql}))"))
+        conn.execute(text(f"ANALYZE {temp_table}"))
+        
+        # 要素ID必须非空且唯一
+        null_keys, duplicate_keys = conn.execute(text(f"""
+            SELECT COUNT(*) - COUNT({key_sql}), COUNT({key_sql}) - COUNT(DISTINCT {key_sql})
+            FROM {temp_table}
+        """)).fetchone()
+        if null_keys or duplicate_keys:
+            raise ValueError(f"要素ID字段 {merge_key} 存在 {null_keys} 个空值、{duplicate_keys} 个重复值，无法合并")
+            
+        params = {'metadata_id': metadata_id}
+        updated = conn.execute(text(f"""
+            UPDATE {vector_table} t
+            SET geometry = s.geometry, properties = s.properties, updated_at = CURRENT_TIMESTAMP
+            FROM {temp_table} s
+            WHERE t.metadata_id = :metadata_id
+              AND t.{key_sql} = s.{key_sql}
+              AND {self._feature_hash_sql('t')} <> {self._feature_hash_sql('s')}
+        """), params).rowcount
+        deleted = conn.execute(text(f"""
+            DELETE FROM {vector_table} t
+            WHERE t.metadata_id = :metadata_id
+              AND NOT EXISTS (SELECT 1 FROM {temp_table} s WHERE s.{key_sql} = t.{key_sql})
+        """), params).rowcount
+        inserted = conn.execute(text(f"""
+            INSERT INTO {vector_table} (geometry, properties, metadata_id)
+            SELECT s.geometry, s.properties, :metadata_id
+            FROM {temp_table} s
+            WHERE NOT EXISTS (
+                SELECT 1 FROM {vector_table} t
+                WHERE t.metadata_id = :metadata_id AND t.{key_sql} = s.{key_sql}
+            )
+        """), params).rowcount
+        
+        return {
+            'inserted': inserted,
+            'updated': updated,
+            'deleted': deleted,
+            'unchanged': staged_count - inserted - updated,
+        }
+        
+    def merge_data(self, file_path: str, source_crs: str, target_crs: str,
+                   vector_table: str, metadata_table: str, metadata_id: int, merge_key: str,
+                   encoding: str = 'utf-8', batch_size: int = 1000,
+                   load_method: Optional[str] = None, chunk_size: Optional[int] = None,
+                   fingerprint: Optional[Dict[str, Any]] = None) -> Dict[str, int]:
+        """
+        将文件按要素ID增量合并到已入库的数据，合并与元数据更新在单个事务中提交
+        
+        Args:
+            file_path: 文件路径
+            source_crs: 源坐标系
+            target_crs: 目标坐标系
+            vector_table: 矢量数据表名
+            metadata_table: 元数据表名
+            metadata_id: 合并目标（该文件上次入库）的元数据ID
+            merge_key: 作为要素ID的属性字段名，如OBJECTID
+            encoding: 文件编码
+            batch_size: 批量写入大小
+            load_method: 入库方式，insert / copy_csv / copy_binary
+            chunk_size: 分块读取的分块大小，不指定时整体读取文件
+            fingerprint: 文件指纹，合并完成时写入元数据additional_info
+            
+        Returns:
+            inserted / updated / deleted / unchanged 条数
+        """
+        load_method = self._resolve_load_method(load_method)
+        self.logger.info(f"开始增量合并，要素ID字段: {merge_key}，合并目标元数据ID: {metadata_id}")
+        
+        # 要素ID字段上的表达式索引，供合并时按ID关联
+        key_index = f"idx_{vector_table}_key_{re.sub(r'[^0-9a-zA-Z_]', '_', merge_key).lower()}"
+        with self.engine.connect() as conn:
+            layout = self._partition_layout(conn, vector_table)
+            if layout is not None and layout.scheme == 'grid':
+                # 更新几何可能改变要素所在瓦片，合并只支持按metadata_id分区或不分区的表
+                raise ValueError("增量合并不支持按grid分区的表")
+            conn.execute(text(f"""
+                CREATE INDEX IF NOT EXISTS {key_index}
+                ON {vector_table} (metadata_id, (properties ->> '{merge_key.replace("'", "''")}'))
+            """))
+            conn.commit()
+            
+        try:
+            with self.engine.connect() as conn:
+                accumulator = MetadataAccumulator(file_path, source_crs, target_crs)
+                
+                def transformed_chunks():
+                    if chunk_size:
+                        chunks = self.read_vector_data_chunks(file_path, encoding, chunk_size)
+                    else:
+                        chunks = [self.read_vector_data(file_path, encoding)]
+                    for chunk in chunks:
+                        chunk = self.transform_coordinate_system(chunk, source_crs, target_crs)
+                        accumulator.update(chunk)
+                        yield chunk
+                        
+                start_time = time.perf_counter()
+                try:
+                    counts = self._merge_via_temp_table(conn, transformed_chunks(), vector_table,
+                                                        metadata_id, merge_key, batch_size, load_method)
+                    last_merge = dict(counts, merge_key=merge_key,
+                                      merged_at=datetime.now().isoformat(timespec='seconds'))
+                    metadata = self._with_additional_info(accumulator.to_metadata(),
+                                                          fingerprint=fingerprint, last_merge=last_merge)
+                    self._update_metadata(conn, metadata_id, metadata, metadata_table)
+                except Exception:
+                    self._rollback(conn)
+                    raise
+                    
+                self.logger.info(
+                    f"增量合并完成: 新增 {counts['inserted']}，更新 {counts['updated']}，"
+                    f"删除 {counts['deleted']}，未变化 {counts['unchanged']}，"
+                    f"耗时 {time.perf_counter() - start_time:.2f}s"
+                )
+                return counts
+                
+        except SQLAlchemyError as e:
+            self.logger.error(f"增量合并失败: {e}")
+            raise
+        except psycopg2.Error as e:
+            self.logger.error(f"COPY数据写入失败: {e}")
             raise
             
     def insert_data(self, gdf: gpd.GeoDataFrame, vector_table: str, 
                    metadata: Dict[str, Any], metadata_table: str,
-                   batch_size: int = 1000):
+                   batch_size: int = 1000, load_method: Optional[str] = None,
+                   staging: bool = False, resume: bool = False,
+                   fingerprint: Optional[Dict[str, Any]] = None,
+                   storage_mode: Optional[str] = None,
+                   spatial_order: Optional[str] = None) -> int:
         """
         插入数据到数据库
         
@@ -337,85 +1705,297 @@ class VectorToPostGIS:
             metadata: 元数据字典
             metadata_table: 元数据表名
             batch_size: 批量插入大小
+            load_method: 入库方式，insert / copy_csv / copy_binary，
+                         默认取配置项load_method（未配置时为insert）
+            staging: 是否经暂存表入库并在单个事务中发布
+            resume: 是否记录检查点，并从同一文件未完成的检查点续传
+            fingerprint: 文件指纹，入库完成时写入元数据additional_info
+            storage_mode: 存储模式，jsonb / typed，默认取配置项storage_mode（未配置时为jsonb）
+            spatial_order: 写入前按几何外包框中心的空间填充曲线排序，hilbert / zorder，
+                           默认取配置项spatial_order（未配置时按文件顺序写入）
+            
+        Returns:
+            元数据ID
         """
+        load_method = self._resolve_load_method(load_method)
+        storage_mode = self._resolve_storage_mode(storage_mode)
+        spatial_order = self._resolve_spatial_order(spatial_order)
+        if staging and resume:
+            self.logger.warning("暂存表入库失败时不保留已写入数据，忽略续传参数")
+            resume = False
+            
         try:
-            self.logger.info("开始数据入库...")
+            self.logger.info(f"开始数据入库，入库方式: {load_method}")
             
             with self.engine.connect() as conn:
-                # 插入元数据
-                metadata_sql = f"""
-                INSERT INTO {metadata_table} (
-                    file_name, file_path, file_size, file_format, source_crs, target_crs,
-                    feature_count, geometry_type, bbox_minx, bbox_miny, bbox_maxx, bbox_maxy,
-                    properties_schema, additional_info
-                ) VALUES (
-                    :file_name, :file_path, :file_size, :file_format, :source_crs, :target_crs,
-                    :feature_count, :geometry_type, :bbox_minx, :bbox_miny, :bbox_maxx, :bbox_maxy,
-                    :properties_schema, :additional_info
-                ) RETURNING id;
-                """
-                
-                result = conn.execute(text(metadata_sql), metadata)
-                metadata_id = result.fetchone()[0]
-                conn.commit()
-                
-                self.logger.info(f"元数据插入成功，ID: {metadata_id}")
-                
                 # 记录属性字段统计信息
                 total_fields = len(gdf.columns) - 1  # 减去geometry列
                 self.logger.info(f"属性字段数量: {total_fields}")
                 self.logger.info(f"属性字段列表: {list(gdf.columns.drop('geometry'))}")
                 
-                # 批量插入矢量数据
-                total_features = len(gdf)
+                column_types = None
+                if storage_mode == 'typed':
+                    column_types = self._prepare_typed_columns(conn, vector_table, gdf)
+                    metadata = self._with_additional_info(metadata, typed_columns=column_types)
+                    
+                if spatial_order:
+                    # 整体排序：排序结果对同一数据确定，续传时按相同顺序跳过已提交的要素
+                    sort_start = time.perf_counter()
+                    gdf = sort_geodataframe(gdf, spatial_order)
+                    self.logger.info(f"要素已按{spatial_order}顺序排序，耗时 {time.perf_counter() - sort_start:.2f}s")
+                    
+                layout = self._partition_layout(conn, vector_table)
+                
+                start_time = time.perf_counter()
+                if staging:
+                    inserted_count, metadata_id = self._load_via_staging(
+                        conn, [gdf], vector_table, metadata_table,
+                        lambda: self._with_additional_info(metadata, fingerprint=fingerprint),
+                        batch_size, load_method, column_types
+                    )
+                elif resume:
+                    file_path = metadata['file_path']
+                    checkpoint = self._find_checkpoint(conn, file_path, vector_table, metadata_table)
+                    if checkpoint is None:
+                        checkpoint = self._start_checkpointed_import(conn, metadata, file_path,
+                                                                     vector_table, metadata_table)
+                    
+                    # 跳过检查点之前已提交的要素
+                    skipped_count = checkpoint.rows_committed
+                    metadata_id = checkpoint.metadata_id
+                    inserted_count = self._write_features(conn, gdf.iloc[skipped_count:], vector_table,
+                                                          metadata_id, batch_size, load_method,
+                                                          checkpoint=checkpoint, column_types=column_types,
+                                                          layout=layout)
+                    checkpoint.complete(conn)
+                    conn.commit()
+                else:
+                    # 插入元数据
+                    metadata_id = self._insert_metadata(conn, metadata, metadata_table)
+                    
+                    # 批量插入矢量数据
+                    inserted_count = self._write_features(conn, gdf, vector_table, metadata_id,
+                                                          batch_size, load_method,
+                                                          column_types=column_types,
+                                                          layout=layout)
+                    
+                if fingerprint is not None and not staging:
+                    # 全部要素写入后才记录指纹
+                    self._update_metadata(conn, metadata_id,
+                                          self._with_additional_info(metadata, fingerprint=fingerprint),
+                                          metadata_table)
+                
+                elapsed = time.perf_counter() - start_time
+                rows_per_second = inserted_count / elapsed if elapsed > 0 else 0.0
+                self.logger.info(
+                    f"数据入库完成，共插入 {inserted_count} 条记录，"
+                    f"耗时 {elapsed:.2f}s，{rows_per_second:.0f} 条/秒"
+                )
+                return metadata_id
+                
+        except SQLAlchemyError as e:
+            self.logger.error(f"数据插入失败: {e}")
+            raise
+        except psycopg2.Error as e:
+            self.logger.error(f"COPY数据写入失败: {e}")
+            raise
+            
+    def insert_data_streaming(self, file_path: str, source_crs: str, target_crs: str,
+                              vector_table: str, metadata_table: str,
+                              encoding: str = 'utf-8', batch_size: int = 1000,
+                              load_method: Optional[str] = None,
+                              chunk_size: int = 50000, staging: bool = False,
+                              resume: bool = False,
+                              fingerprint: Optional[Dict[str, Any]] = None,
+                              storage_mode: Optional[str] = None,
+                              spatial_order: Optional[str] = None,
+                              index_plan: Optional[Dict[str, Any]] = None) -> Optional[int]:
+        """
+        分块流式入库：读取、坐标转换、元数据统计与写入逐块进行，
+        峰值内存由chunk_size决定而与文件大小无关
+        
+        Args:
+            file_path: 文件路径
+            source_crs: 源坐标系
+            target_crs: 目标坐标系
+            vector_table: 矢量数据表名
+            metadata_table: 元数据表名
+            encoding: 文件编码
+            batch_size: 批量插入大小
+            load_method: 入库方式，insert / copy_csv / copy_binary
+            chunk_size: 每个读取分块的要素数量
+            staging: 是否经暂存表入库并在单个事务中发布
+            resume: 是否记录检查点，并从同一文件未完成的检查点续传
+            fingerprint: 文件指纹，入库完成时写入元数据additional_info
+            storage_mode: 存储模式，jsonb / typed（字段类型按首个分块推断，后续分块的值超出时
+                          bigint列放宽为double precision，其他不一致的值写入properties）
+            spatial_order: 空间排序方式，hilbert / zorder；编码按目标坐标系适用范围计算，
+                           经暂存表入库时发布时按编码整体排序，否则各分块分别排序（续传时不排序）
+            index_plan: 索引计划，写入元数据additional_info
+            
+        Returns:
+            元数据ID，文件中没有要素时返回None
+        """
+        load_method = self._resolve_load_method(load_method)
+        storage_mode = self._resolve_storage_mode(storage_mode)
+        spatial_order = self._resolve_spatial_order(spatial_order)
+        if staging and resume:
+            self.logger.warning("暂存表入库失败时不保留已写入数据，忽略续传参数")
+            resume = False
+        
+        try:
+            self.logger.info(f"开始分块入库，入库方式: {load_method}，分块大小: {chunk_size}")
+            
+            with self.engine.connect() as conn:
+                # 元数据随分块单遍累计，不做deep内存扫描
+                accumulator = MetadataAccumulator(file_path, source_crs, target_crs)
+                metadata_id = None
+                column_types = None
                 inserted_count = 0
+                start_time = time.perf_counter()
                 
-                for i in range(0, total_features, batch_size):
-                    batch_gdf = gdf.iloc[i:i+batch_size]
+                if staging:
+                    def transformed_chunks():
+                        for chunk in self.read_vector_data_chunks(file_path, encoding, chunk_size):
+                            chunk = self.transform_coordinate_system(chunk, source_crs, target_crs)
+                            accumulator.update(chunk)
+                            yield chunk
+                            
+                    chunks = transformed_chunks()
+                    if storage_mode == 'typed':
+                        # 暂存表按目标表结构创建，需先按首个分块补充类型化列
+                        first_chunk = next(chunks, None)
+                        if first_chunk is not None:
+                            column_types = self._prepare_typed_columns(conn, vector_table, first_chunk)
+                            chunks = itertools.chain([first_chunk], chunks)
+                            
+                    inserted_count, metadata_id = self._load_via_staging(
+                        conn, chunks, vector_table, metadata_table,
+                        lambda: self._with_additional_info(accumulator.to_metadata(),
+                                                           fingerprint=fingerprint,
+                                                           typed_columns=column_types,
+                                                           index_plan=index_plan),
+                        batch_size, load_method, column_types,
+                        spatial_order=spatial_order,
+                        sort_bounds=crs_extent(target_crs) if spatial_order else None
+                    )
+                    self.logger.info(f"数据入库完成，共发布 {inserted_count} 条记录，"
+                                     f"耗时 {time.perf_counter() - start_time:.2f}s")
+                    return metadata_id
                     
-                    # 准备批量插入数据
-                    batch_data = []
-                    for idx, row in batch_gdf.iterrows():
-                        # 提取几何和属性
-                        geometry = row.geometry
-                        properties = row.drop('geometry').to_dict()
-                        
-                        # 保留NaN值，但转换为None以便JSON序列化
-                        processed_properties = {}
-                        for k, v in properties.items():
-                            if pd.isna(v):
-                                processed_properties[k] = None
-                            else:
-                                processed_properties[k] = v
-                        
-                        batch_data.append({
-                            'geometry': geometry.wkt,
-                            'properties': json.dumps(processed_properties, ensure_ascii=False),
-                            'metadata_id': metadata_id
-                        })
+                checkpoint = None
+                start_offset = 0
+                skip_in_chunk = 0
+                if resume:
+                    checkpoint = self._find_checkpoint(conn, file_path, vector_table, metadata_table)
+                if checkpoint is not None:
+                    # 累加器状态保存在分块边界：从该边界重新读取以补齐统计，
+                    # 边界之后已提交的要素只统计不重复写入
+                    metadata_id = checkpoint.metadata_id
+                    if checkpoint.accumulator_state:
+                        accumulator = MetadataAccumulator.from_state(
+                            file_path, source_crs, target_crs, checkpoint.accumulator_state)
+                    start_offset = checkpoint.accumulated_rows
+                    skip_in_chunk = checkpoint.rows_committed - checkpoint.accumulated_rows
+                    inserted_count = checkpoint.rows_committed
                     
-                    # 批量插入
-                    if batch_data:
-                        insert_sql = f"""
-                        INSERT INTO {vector_table} (geometry, properties, metadata_id)
-                        VALUES (:geometry, :properties, :metadata_id);
-                        """
+                layout = self._partition_layout(conn, vector_table)
+                sort_bounds = None
+                if spatial_order and resume:
+                    # 续传按分块内的行偏移跳过已提交要素，分块大小变化时排序结果不一致
+                    self.logger.warning("续传模式下不对分块做空间排序")
+                    spatial_order = None
+                elif spatial_order:
+                    # 各分块使用相同的编码网格范围，编码在分块之间可比较
+                    sort_bounds = crs_extent(target_crs)
+                    
+                for chunk_index, chunk in enumerate(
+                        self.read_vector_data_chunks(file_path, encoding, chunk_size, start_offset)):
+                    chunk = self.transform_coordinate_system(chunk, source_crs, target_crs)
+                    accumulator.update(chunk)
+                    
+                    chunk_types = None
+                    if storage_mode == 'typed':
+                        if column_types is None:
+                            column_types = self._prepare_typed_columns(conn, vector_table, chunk)
+                        # 后续分块的值可能超出首个分块推断的列类型
+                        chunk_types = self._fit_typed_columns(conn, [vector_table], chunk, column_types)
+                        self._commit(conn)
                         
-                        conn.execute(text(insert_sql), batch_data)
+                    if metadata_id is None:
+                        # 首个分块时插入元数据记录，入库完成后更新为全量统计
+                        metadata = self._with_additional_info(accumulator.to_metadata(),
+                                                              typed_columns=column_types,
+                                                              index_plan=index_plan)
+                        if resume:
+                            checkpoint = self._start_checkpointed_import(
+                                conn, metadata, file_path, vector_table, metadata_table)
+                            metadata_id = checkpoint.metadata_id
+                        else:
+                            metadata_id = self._insert_metadata(conn, metadata, metadata_table)
+                    
+                    if skip_in_chunk:
+                        # 续传前分块大小可能不同，已提交的要素可能跨越多个分块
+                        skipped = min(skip_in_chunk, len(chunk))
+                        chunk = chunk.iloc[skipped:]
+                        skip_in_chunk -= skipped
+                    if spatial_order:
+                        chunk = sort_geodataframe(chunk, spatial_order, sort_bounds)
+                    inserted_count += self._write_features(conn, chunk, vector_table, metadata_id,
+                                                           batch_size, load_method,
+                                                           checkpoint=checkpoint,
+                                                           column_types=chunk_types,
+                                                           layout=layout)
+                    if checkpoint is not None and not skip_in_chunk:
+                        checkpoint.save_accumulator(conn, accumulator.to_state())
                         conn.commit()
-                        
-                        inserted_count += len(batch_data)
-                        self.logger.info(f"已插入 {inserted_count}/{total_features} 条记录")
-                        
-                self.logger.info(f"数据入库完成，共插入 {inserted_count} 条记录")
+                    self.logger.info(f"分块 {chunk_index + 1} 入库完成，累计 {inserted_count} 条记录")
+                    del chunk
+                    
+                if metadata_id is None:
+                    self.logger.warning(f"文件中没有要素: {file_path}")
+                    return None
+                    
+                # 全量统计与文件指纹在全部要素写入后才写入元数据
+                self._update_metadata(conn, metadata_id,
+                                      self._with_additional_info(accumulator.to_metadata(),
+                                                                 fingerprint=fingerprint,
+                                                                 typed_columns=column_types,
+                                                                 index_plan=index_plan),
+                                      metadata_table)
+                if checkpoint is not None:
+                    checkpoint.complete(conn)
+                    conn.commit()
+                
+                elapsed = time.perf_counter() - start_time
+                rows_per_second = inserted_count / elapsed if elapsed > 0 else 0.0
+                self.logger.info(
+                    f"数据入库完成，共插入 {inserted_count} 条记录，"
+                    f"耗时 {elapsed:.2f}s，{rows_per_second:.0f} 条/秒"
+                )
+                return metadata_id
                 
         except SQLAlchemyError as e:
             self.logger.error(f"数据插入失败: {e}")
             raise
+        except psycopg2.Error as e:
+            self.logger.error(f"COPY数据写入失败: {e}")
+            raise
             
     def process_vector_data(self, file_path: str, source_crs: str, target_crs: str,
                           vector_table: str, metadata_table: str, 
-                          encoding: str = 'utf-8', batch_size: int = 1000):
+                          encoding: str = 'utf-8', batch_size: int = 1000,
+                          load_method: Optional[str] = None,
+                          chunk_size: Optional[int] = None,
+                          defer_indexes: Optional[bool] = None,
+                          staging: Optional[bool] = None,
+                          resume: Optional[bool] = None,
+                          skip_unchanged: Optional[bool] = None,
+                          merge_key: Optional[str] = None,
+                          storage_mode: Optional[str] = None,
+                          spatial_order: Optional[str] = None,
+                          cluster: Optional[bool] = None,
+                          partition_by: Optional[str] = None) -> Dict[str, Any]:
         """
         处理矢量数据入库的主流程
         
@@ -427,34 +2007,172 @@ class VectorToPostGIS:
             metadata_table: 元数据表名
             encoding: 文件编码
             batch_size: 批量插入大小
+            load_method: 入库方式，insert / copy_csv / copy_binary
+            chunk_size: 分块流式入库的分块大小，默认取配置项chunk_size，
+                        未配置时整体读取文件
+            defer_indexes: 是否先入库后建索引，默认取配置项defer_indexes
+            staging: 是否经UNLOGGED暂存表入库并原子发布，默认取配置项staging
+            resume: 是否记录检查点并从未完成的检查点续传，默认取配置项resume
+            skip_unchanged: 文件自上次完整入库后未变化时是否跳过，
+                            默认取配置项skip_unchanged（未配置时为True）
+            merge_key: 作为稳定要素ID的属性字段名，指定且该文件已入库过时按要素增量合并，
+                       默认取配置项merge_key
+            storage_mode: 存储模式，jsonb为属性全部写入properties，typed为按字段类型写入原生列
+                          （无法映射的字段写入properties），默认取配置项storage_mode
+            spatial_order: 写入前按空间填充曲线排序，hilbert / zorder，默认取配置项spatial_order
+            cluster: 入库后是否按空间索引CLUSTER整张表，默认取配置项cluster
+            partition_by: 新建矢量数据表时的分区方式，metadata_id / grid，默认取配置项partition_by
+            
+        Returns:
+            处理结果：status为imported / merged / skipped，metadata_id为对应的元数据ID，
+            merged时另含inserted / updated / deleted / unchanged条数
         """
+        chunk_size = chunk_size or self.config.get('chunk_size')
+        if defer_indexes is None:
+            defer_indexes = self.config.get('defer_indexes', False)
+        if staging is None:
+            staging = self.config.get('staging', False)
+        if resume is None:
+            resume = self.config.get('resume', False)
+        if skip_unchanged is None:
+            skip_unchanged = self.config.get('skip_unchanged', True)
+        merge_key = merge_key or self.config.get('merge_key')
+        storage_mode = self._resolve_storage_mode(storage_mode)
+        spatial_order = self._resolve_spatial_order(spatial_order)
+        if cluster is None:
+            cluster = self.config.get('cluster', False)
+        if merge_key and storage_mode == 'typed':
+            raise ValueError("增量合并按properties比较要素，不支持typed存储模式")
         try:
-            self.logger.info("=" * 50)
-            self.logger.info(f"开始处理文件: {file_path}")
-            self.logger.info("=" * 50)
+            # 坐标转换进程池在整个入库期间复用
+            with self.reproject_pool():
+                self.logger.info("=" * 50)
+                self.logger.info(f"开始处理文件: {file_path}")
+                self.logger.info("=" * 50)
+            
+                # 1. 验证文件格式
+                if not self.validate_file_format(file_path):
+                    raise ValueError(f"不支持的文件格式: {file_path}")
+                
+                # 文件未变化时跳过（大小与修改时间一致时无需读取文件内容）
+                # 指纹先比较大小与修改时间，只在无法据此判断时计算内容哈希
+                if skip_unchanged:
+                    metadata_id, fingerprint = self._find_unchanged_import(file_path, source_crs, target_crs,
+                                                                           vector_table, metadata_table)
+                    if metadata_id is not None:
+                        self.logger.info(f"文件未变化，跳过入库（已入库元数据ID: {metadata_id}）")
+                        return {'status': 'skipped', 'metadata_id': metadata_id}
+                else:
+                    fingerprint = {'files': file_stats(file_path)}
+                # 入库完成时记录的指纹含内容哈希，之后仅touch过的文件可凭哈希跳过
+                fingerprint = with_content_hash(fingerprint, file_path)
+            
+                # 增量合并：该文件已入库过时只写入变化的要素，否则按全量入库
+                if merge_key:
+                    previous = self._find_previous_import(file_path, source_crs, target_crs,
+                                                          vector_table, metadata_table)
+                    if previous is not None:
+                        # 合并前后的范围都需要刷新瓦片（要素可能被删除或移动）
+                        previous_bbox = self._import_bbox(metadata_table, previous.id)
+                        with self._import_lock(vector_table):
+                            counts = self.merge_data(file_path, source_crs, target_crs, vector_table,
+                                                     metadata_table, previous.id, merge_key, encoding,
+                                                     batch_size, load_method, chunk_size, fingerprint)
+                        self.create_hot_property_indexes(vector_table)
+                        self.build_lod_pyramid(vector_table, metadata_table, previous.id)
+                        self.subdivide_geometries(vector_table, metadata_table, previous.id)
+                        self.refresh_tile_cache(vector_table, previous_bbox,
+                                                self._import_bbox(metadata_table, previous.id))
+                        self.logger.info("=" * 50)
+                        self.logger.info("数据处理完成")
+                        self.logger.info("=" * 50)
+                        return dict(counts, status='merged', metadata_id=previous.id)
+                    self.logger.info("该文件尚未入库，按全量方式入库")
+                
+                if chunk_size:
+                    # 分块流式入库：读取、转换、元数据统计、写入逐块完成
+                    # 索引类型按文件开头的样本与文件要素数选择
+                    index_plan = self._sample_index_plan(file_path, encoding, storage_mode)
+                    # 建表、写入与推迟的索引重建在表级咨询锁下进行（推迟索引时排他）
+                    with self._import_lock(vector_table, defer_indexes):
+                        indexes_deferred = self.create_tables(vector_table, metadata_table, defer_indexes,
+                                                              partition_by, index_plan)
+                        if index_plan is not None:
+                            index_plan = self._applied_index_plan(vector_table, index_plan)
+                        try:
+                            metadata_id = self.insert_data_streaming(file_path, source_crs, target_crs,
+                                                                     vector_table, metadata_table, encoding,
+                                                                     batch_size, load_method, chunk_size,
+                                                                     staging, resume, fingerprint, storage_mode,
+                                                                     spatial_order, index_plan)
+                        finally:
+                            if indexes_deferred:
+                                built_plan = self.build_indexes(vector_table, index_plan=index_plan)
+                    if indexes_deferred and metadata_id is not None and built_plan != index_plan:
+                        self._record_index_plan(metadata_table, metadata_id, built_plan)
+                    self.create_hot_property_indexes(vector_table)
+                    if cluster:
+                        self.cluster_table(vector_table)
+                    if metadata_id is not None:
+                        self.build_lod_pyramid(vector_table, metadata_table, metadata_id)
+                        self.subdivide_geometries(vector_table, metadata_table, metadata_id)
+                        self.refresh_tile_cache(vector_table, self._import_bbox(metadata_table, metadata_id))
+                    self.logger.info("=" * 50)
+                    self.logger.info("数据处理完成")
+                    self.logger.info("=" * 50)
+                    return {'status': 'imported', 'metadata_id': metadata_id}
+                
+                # 2. 读取数据
+                gdf = self.read_vector_data(file_path, encoding)
+            
+                # 3. 坐标系转换
+                gdf_transformed = self.transform_coordinate_system(gdf, source_crs, target_crs)
             
-            # 1. 验证文件格式
-            if not self.validate_file_format(file_path):
-                raise ValueError(f"不支持的文件格式: {file_path}")
+                # 4. 按图层画像选择索引类型并创建数据表
+                #    建表、写入与推迟的索引重建在表级咨询锁下进行（推迟索引时排他）
+                index_plan = self.plan_indexes(gdf_transformed, storage_mode=storage_mode)
+                with self._import_lock(vector_table, defer_indexes):
+                    indexes_deferred = self.create_tables(vector_table, metadata_table, defer_indexes,
+                                                          partition_by, index_plan)
+                    index_plan = self._applied_index_plan(vector_table, index_plan)
                 
-            # 2. 读取数据
-            gdf = self.read_vector_data(file_path, encoding)
+                    try:
+                        # 5. 提取元数据
+                        metadata = self.extract_metadata(gdf_transformed, file_path, source_crs, target_crs)
+                        metadata = self._with_additional_info(metadata, index_plan=index_plan)
+                    
+                        # 6. 插入数据
+                        metadata_id = self.insert_data(gdf_transformed, vector_table, metadata, metadata_table,
+                                                       batch_size, load_method, staging, resume, fingerprint,
+                                                       storage_mode, spatial_order)
+                    finally:
+                        # 7. 推迟的索引在入库后统一创建（入库失败时也重建，保证表结构完整）
+                        if indexes_deferred:
+                            built_plan = self.build_indexes(vector_table, index_plan=index_plan)
+                # 入库后按全表统计改用的索引类型更新到元数据
+                if indexes_deferred and built_plan != index_plan:
+                    self._record_index_plan(metadata_table, metadata_id, built_plan)
             
-            # 3. 坐标系转换
-            gdf_transformed = self.transform_coordinate_system(gdf, source_crs, target_crs)
+                # 8. 热点属性索引
+                self.create_hot_property_indexes(vector_table)
             
-            # 4. 创建数据表
-            self.create_tables(vector_table, metadata_table)
+                # 9. 按空间索引物理重排
+                if cluster:
+                    self.cluster_table(vector_table)
+                
+                # 10. 生成多级化简几何（配置了lod_tolerances时）
+                self.build_lod_pyramid(vector_table, metadata_table, metadata_id)
             
-            # 5. 提取元数据
-            metadata = self.extract_metadata(gdf_transformed, file_path, source_crs, target_crs)
+                # 11. 切分大面要素（配置了subdivide_max_vertices时）
+                self.subdivide_geometries(vector_table, metadata_table, metadata_id)
             
-            # 6. 插入数据
-            self.insert_data(gdf_transformed, vector_table, metadata, metadata_table, batch_size)
+                # 12. 刷新瓦片缓存中受本次入库影响的瓦片
+                self.refresh_tile_cache(vector_table, self._import_bbox(metadata_table, metadata_id))
             
-            self.logger.info("=" * 50)
-            self.logger.info("数据处理完成")
-            self.logger.info("=" * 50)
+                self.logger.info("=" * 50)
+                self.logger.info("数据处理完成")
+                self.logger.info("=" * 50)
+                return {'status': 'imported', 'metadata_id': metadata_id}
             
         except Exception as e:
             self.logger.error(f"数据处理失败: {e}")
@@ -484,11 +2202,60 @@ def main():
     # 其他参数
     parser.add_argument('--encoding', default='utf-8', help='文件编码')
     parser.add_argument('--batch_size', default=1000, type=int, help='批量插入大小')
+    parser.add_argument('--load_method', default='insert', choices=LOAD_METHODS,
+                        help='入库方式: insert(多行INSERT) / copy_csv / copy_binary(COPY流式写入)')
+    parser.add_argument('--chunk_size', default=None, type=int,
+                        help='分块流式读取的分块要素数，不指定时整体读取文件')
+    parser.add_argument('--defer_indexes', action='store_true', default=None,
+                        help='先入库后建索引（仅对空表生效）')
+    parser.add_argument('--staging', action='store_true', default=None,
+                        help='经UNLOGGED暂存表入库，校验后在单个事务中发布')
+    parser.add_argument('--resume', action='store_true', default=None,
+                        help='记录检查点，中断后以相同参数重新运行时从断点续传')
+    parser.add_argument('--storage_mode', default=None, choices=STORAGE_MODES,
+                        help='存储模式: jsonb(属性写入properties) / typed(按字段类型写入原生列)')
+    parser.add_argument('--merge_key', default=None,
+                        help='稳定要素ID字段（如OBJECTID），文件已入库过时只合并变化的要素')
+    parser.add_argument('--force', action='store_true',
+                        help='忽略文件指纹，文件未变化时也重新入库')
+    parser.add_argument('--reproject_workers', default=1, type=int,
+                        help='坐标转换进程数，大于1时对坐标点较多的数据多进程并行转换')
+    parser.add_argument('--spatial_order', default=None, choices=SPATIAL_ORDERS,
+                        help='写入前按空间填充曲线排序要素，使空间相近的要素位于相邻数据页')
+    parser.add_argument('--cluster', action='store_true', default=None,
+                        help='入库后按空间索引CLUSTER整张表（重写全表并加排他锁）')
+    parser.add_argument('--partition_by', default=None, choices=PARTITION_SCHEMES,
+                        help='新建矢量数据表的分区方式：metadata_id为每次入库一个分区，grid为按要素所在瓦片分区')
+    parser.add_argument('--partition_grid_level', default=DEFAULT_GRID_LEVEL, type=int,
+                        help='grid分区的瓦片层级')
+    parser.add_argument('--geometry_index', default=None, choices=SPATIAL_INDEX_METHODS,
+                        help='几何列索引类型，默认按图层画像自动选择')
+    parser.add_argument('--properties_index', default=None, choices=PROPERTY_INDEX_METHODS,
+                        help='properties列索引类型，默认按图层画像自动选择')
+    parser.add_argument('--hot_property', action='append', default=[], metavar='NAME:TYPE',
+                        help='为常用于过滤和排序的属性建索引，可重复指定 (如: mj:double precision)')
+    parser.add_argument('--hot_property_mode', default='index', choices=HOT_PROPERTY_MODES,
+                        help='热点属性索引方式：index为表达式索引，generated为存储生成列')
+    parser.add_argument('--lod_tolerance', action='append', default=[], type=float,
+                        help='生成化简几何伴随表的容差（度），可重复指定 (如: 0.001)')
+    parser.add_argument('--lod_workers', default=None, type=int,
+                        help='化简几何的进程数，默认为CPU核数')
+    parser.add_argument('--subdivide_max_vertices', default=None, type=int,
+                        help='入库后以ST_Subdivide切分要素写入伴随表，每块的最大顶点数 (如: 256)')
+    parser.add_argument('--maintenance_work_mem', default='1GB',
+                        help='推迟建索引时使用的maintenance_work_mem')
     parser.add_argument('--log_level', default='INFO', help='日志级别')
     parser.add_argument('--log_dir', default='logs', help='日志目录')
     
     args = parser.parse_args()
     
+    hot_properties = {}
+    for item in args.hot_property:
+        name, _, column_type = item.rpartition(':')
+        if not name:
+            parser.error(f"--hot_property 格式应为 NAME:TYPE: {item}")
+        hot_properties[name] = column_type.strip()
+    
     # 构建配置字典
     config = {
         'database': {
@@ -499,7 +2266,17 @@ def main():
             'password': args.db_password
         },
         'log_level': args.log_level,
-        'log_dir': args.log_dir
+        'log_dir': args.log_dir,
+        'maintenance_work_mem': args.maintenance_work_mem,
+        'reproject_workers': args.reproject_workers,
+        'partition_grid_level': args.partition_grid_level,
+        'index_plan': {key: value for key, value in (('geometry', args.geometry_index),
+                                                     ('properties', args.properties_index)) if value},
+        'hot_properties': hot_properties,
+        'hot_property_mode': args.hot_property_mode,
+        'lod_tolerances': args.lod_tolerance,
+        'lod_workers': args.lod_workers,
+        'subdivide_max_vertices': args.subdivide_max_vertices
     }
     
     try:
@@ -507,17 +2284,34 @@ def main():
         tool = VectorToPostGIS(config)
         
         # 处理数据
-        tool.process_vector_data(
+        result = tool.process_vector_data(
             file_path=args.file_path,
             source_crs=args.source_crs,
             target_crs=args.target_crs,
             vector_table=args.vector_table,
             metadata_table=args.metadata_table,
             encoding=args.encoding,
-            batch_size=args.batch_size
+            batch_size=args.batch_size,
+            load_method=args.load_method,
+            chunk_size=args.chunk_size,
+            defer_indexes=args.defer_indexes,
+            staging=args.staging,
+            resume=args.resume,
+            skip_unchanged=False if args.force else None,
+            merge_key=args.merge_key,
+            storage_mode=args.storage_mode,
+            spatial_order=args.spatial_order,
+            cluster=args.cluster,
+            partition_by=args.partition_by
         )
         
-        print("数据入库成功！")
+        if result['status'] == 'skipped':
+            print(f"文件未变化，已跳过（元数据ID: {result['metadata_id']}）")
+        elif result['status'] == 'merged':
+            print(f"增量合并成功！新增 {result['inserted']}，更新 {result['updated']}，"
+                  f"删除 {result['deleted']}")
+        else:
+            print("数据入库成功！")
         
     except Exception as e:
         print(f"数据入库失败: {e}")